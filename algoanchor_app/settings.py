@@ -84,6 +84,55 @@ DATABASES = {
     }
 }
 
+# Shared by the web process and the backtest worker (e.g. cached legs and bootstrap intervals),
+# so it must live outside process memory
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'django',
+    },
+    # Price history frames and their per-symbol range index; switch to
+    # FileBasedCache (or a shared cache server) to share them between processes
+    'prices': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'algoanchor-prices',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# Price cache on the alias above: LRU eviction past the byte budget (0 disables)
+PRICE_CACHE_ALIAS = 'prices'
+PRICE_CACHE_MAX_BYTES = int(os.getenv('PRICE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+# In-process cache of rolling indicator arrays shared by the strategies of a
+# batch and the strategy charts, evicted LRU past the byte budget (0 disables)
+INDICATOR_CACHE_MAX_BYTES = int(os.getenv('INDICATOR_CACHE_MAX_BYTES', 128 * 1024 * 1024))
+
+# Per-symbol backtest legs and bootstrap intervals, cached by a content hash that
+# includes the engine version on this alias (shared by web and worker); '' disables
+LEG_CACHE_ALIAS = os.getenv('LEG_CACHE_ALIAS', 'default')
+LEG_CACHE_TIMEOUT = int(os.getenv('LEG_CACHE_TIMEOUT', 7 * 24 * 60 * 60))
+
+# Market data source: 'yahoo' downloads from Yahoo Finance, 'file' reads
+# per-symbol CSV/Parquet files from MARKET_DATA_DIR (offline)
+MARKET_DATA_PROVIDER = os.getenv('MARKET_DATA_PROVIDER', 'yahoo')
+MARKET_DATA_DIR = os.getenv('MARKET_DATA_DIR', str(BASE_DIR / 'dataset'))
+
+# Ticker info lookups (symbol validation) run on a bounded thread pool, and each
+# lookup gives up after TICKER_INFO_TIMEOUT seconds
+TICKER_INFO_WORKERS = int(os.getenv('TICKER_INFO_WORKERS', 8))
+TICKER_INFO_TIMEOUT = float(os.getenv('TICKER_INFO_TIMEOUT', 5))
+
+# Memory-mapped per-symbol price arrays shared by all processes (rebuilt from
+# PriceData by the backtest worker as it grows, or with build_price_cache);
+# set to '' to disable
+PRICE_ARRAY_DIR = os.getenv('PRICE_ARRAY_DIR', str(BASE_DIR / '.cache' / 'prices'))
+
+# Stationary block bootstrap run after every backtest (0 resamples disables);
+# a fixed seed makes the confidence intervals reproducible
+BOOTSTRAP_RESAMPLES = int(os.getenv('BOOTSTRAP_RESAMPLES', 5000))
+BOOTSTRAP_SEED = int(os.getenv('BOOTSTRAP_SEED', 42))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -4,7 +4,10 @@ from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.db.models import Count, Avg
-from .models import Security, Strategy, PriceData, BacktestResult, TradeLog
+from .models import (
+    Security, Strategy, PriceData, BacktestResult, TradeLog, BacktestJob,
+    WalkForwardRun, WalkForwardFold
+)
 
 
 # Admin Site Configuration
@@ -29,17 +32,15 @@ deactivate_securities.short_description = "Deactivate selected securities"
 def rerun_backtests(modeladmin, request, queryset):
     """Bulk action to rerun backtests for selected strategies"""
     from .services.backtest_engine import run_comprehensive_backtest
+    from .services.result_writer import save_backtest_results
     
     count = 0
     for strategy in queryset:
         try:
-            # Delete existing backtest result
-            if hasattr(strategy, 'backtestresult'):
-                strategy.backtestresult.delete()
-            
-            # Rerun backtest
+            # Rerun backtest; the writer replaces the existing result atomically
             results = run_comprehensive_backtest(strategy)
             if results:
+                save_backtest_results(strategy, results, notes="Re-run from admin")
                 count += 1
         except Exception as e:
             pass  # Continue with other strategies
@@ -60,7 +61,10 @@ class SecurityAdmin(admin.ModelAdmin):
     ]
     search_fields = ['symbol', 'name', 'sector', 'industry']
     list_editable = ['is_active']
-    readonly_fields = ['market_cap_category', 'last_updated', 'created_at']
+    readonly_fields = [
+        'market_cap_category', 'price_history_start', 'price_history_end',
+        'last_updated', 'created_at'
+    ]
     actions = [activate_securities, deactivate_securities]
     
     fieldsets = (
@@ -70,6 +74,10 @@ class SecurityAdmin(admin.ModelAdmin):
         ('Company Details', {
             'fields': ('sector', 'industry', 'market_cap', 'market_cap_category')
         }),
+        ('Price History', {
+            'fields': ('price_history_start', 'price_history_end'),
+            'classes': ('collapse',)
+        }),
         ('Timestamps', {
             'fields': ('created_at', 'last_updated'),
             'classes': ('collapse',)
@@ -99,11 +107,11 @@ class SecurityAdmin(admin.ModelAdmin):
 @admin.register(Strategy)
 class StrategyAdmin(admin.ModelAdmin):
     list_display = [
-        'name', 'user', 'tickers_display', 'lookback_days', 
+        'name', 'user', 'tickers_display', 'strategy_type', 'lookback_days',
         'entry_threshold', 'has_backtest', 'performance_summary', 'created_at'
     ]
     list_filter = [
-        'user', 'lookback_days', 'created_at', 'tickers__sector'
+        'user', 'strategy_type', 'lookback_days', 'created_at', 'tickers__sector'
     ]
     search_fields = ['name', 'user__username', 'tickers__symbol']
     filter_horizontal = ['tickers']
@@ -152,34 +160,12 @@ class StrategyAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('user').prefetch_related('tickers', 'backtestresult')
-    
-    # Custom Admin Actions
-    def rerun_backtests(modeladmin, request, queryset):
-        """Bulk action to rerun backtests for selected strategies"""
-        from .services.backtest_engine import run_comprehensive_backtest
-        
-        count = 0
-        for strategy in queryset:
-            try:
-                # Delete existing backtest result
-                if hasattr(strategy, 'backtestresult'):
-                    strategy.backtestresult.delete()
-                
-                # Rerun backtest
-                results = run_comprehensive_backtest(strategy)
-                if results:
-                    count += 1
-            except Exception as e:
-                pass  # Continue with other strategies
-        
-        modeladmin.message_user(request, f'Backtests rerun for {count} strategies.')
-    rerun_backtests.short_description = "Rerun backtests for selected strategies"
 
 
 # PriceData Admin
 @admin.register(PriceData)
 class PriceDataAdmin(admin.ModelAdmin):
-    list_display = ['security', 'date', 'close']
+    list_display = ['security', 'date', 'open', 'high', 'low', 'close', 'volume']
     list_filter = ['security', 'date']
     search_fields = ['security__symbol', 'security__name']
     date_hierarchy = 'date'
@@ -378,6 +364,46 @@ class TradeLogAdmin(admin.ModelAdmin):
         )
 
 
+# BacktestJob Admin
+@admin.register(BacktestJob)
+class BacktestJobAdmin(admin.ModelAdmin):
+    list_display = [
+        'id', 'strategy', 'status', 'stage', 'progress',
+        'worker', 'created_at', 'started_at', 'finished_at'
+    ]
+    list_filter = ['status', 'created_at']
+    search_fields = ['strategy__name', 'strategy__user__username']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+    list_per_page = 50
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('strategy')
+
+
+# Walk-forward Admin
+class WalkForwardFoldInline(admin.TabularInline):
+    model = WalkForwardFold
+    extra = 0
+    fields = [
+        'index', 'train_start', 'train_end', 'test_start', 'test_end', 'lookback_days',
+        'entry_threshold', 'train_score', 'cumulative_return', 'sharpe_ratio', 'max_drawdown', 'total_trades'
+    ]
+    readonly_fields = fields
+    can_delete = False
+
+
+@admin.register(WalkForwardRun)
+class WalkForwardRunAdmin(admin.ModelAdmin):
+    list_display = ['id', 'strategy', 'train_days', 'test_days', 'rank_by', 'start_date', 'end_date', 'created_at']
+    list_filter = ['rank_by', 'created_at']
+    search_fields = ['strategy__name', 'strategy__user__username']
+    readonly_fields = ['summary', 'seconds', 'created_at']
+    inlines = [WalkForwardFoldInline]
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('strategy')
+
+
 # Enhanced User Admin
 class UserProfileInline(admin.StackedInline):
     """Inline for user profile information"""
@@ -0,0 +1,5 @@
+"""
+Offline benchmark suite for AlgoAnchor
+Times the engine, metrics, persistence and view hot paths on synthetic data;
+run it with ``python manage.py run_benchmarks``.
+"""
@@ -0,0 +1,71 @@
+"""
+Benchmark Reports for AlgoAnchor
+JSON report format and regression checks against a saved baseline.
+"""
+
+import json
+import platform
+from datetime import datetime
+from typing import Dict, List
+
+import django
+import numpy as np
+import pandas as pd
+
+
+def build_report(timings: Dict[str, Dict], params: Dict) -> Dict:
+    """Machine-readable report for a suite run"""
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'django': django.get_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+        },
+        'params': params,
+        'benchmarks': timings,
+    }
+
+
+def save_report(report: Dict, path: str):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load_report(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_reports(current: Dict, baseline: Dict, tolerance: float = 0.2) -> List[Dict]:
+    """
+    Per-benchmark comparison of best times against a baseline report.
+
+    A benchmark regressed when its best time is more than ``tolerance``
+    (a fraction) slower than the baseline's. Benchmarks missing from either
+    report are skipped, as are runs with different suite parameters, whose
+    timings are not comparable.
+    """
+    if current.get('params') != baseline.get('params'):
+        raise ValueError(
+            f"Baseline was run with different parameters: {baseline.get('params')}"
+        )
+
+    rows = []
+    for name, timing in current['benchmarks'].items():
+        base = baseline['benchmarks'].get(name)
+        if not base or not base.get('best'):
+            continue
+
+        ratio = timing['best'] / base['best']
+        rows.append({
+            'name': name,
+            'baseline': base['best'],
+            'current': timing['best'],
+            'ratio': ratio,
+            'regressed': ratio > 1 + tolerance,
+        })
+
+    return rows
@@ -0,0 +1,270 @@
+"""
+Benchmark Suite for AlgoAnchor
+Times the backtest engine stages, metrics, result persistence and the main
+views on synthetic data. Database benchmarks expect to run against a test
+database (see the run_benchmarks command).
+"""
+
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+import logging
+import time
+
+import numpy as np
+
+from core.benchmarks.synthetic import synthetic_prices, synthetic_symbols
+from core.services.backtest_engine import BacktestEngine, run_comprehensive_backtest
+from core.services.bootstrap import bootstrap_confidence_intervals
+from core.services.market_data import FixtureMarketDataProvider, set_provider
+from core.services.pairs import screen_pairs
+from core.services.portfolio import PricePanel, aggregate_returns, portfolio_weights
+from core.services.position_engine import mean_reversion_positions, mean_reversion_signals
+from core.services.rolling import RollingWindowStats
+
+logger = logging.getLogger(__name__)
+
+
+class BenchmarkSuite:
+    """
+    Runs each benchmark ``repeat`` times and keeps the best and mean wall time.
+
+    ``items`` (bars, trades, rows...) turns a timing into a throughput so runs
+    of different sizes stay readable.
+    """
+
+    def __init__(self, bars: int = 2520, symbols: int = 5, lookback: int = 20,
+                 entry_threshold: float = 1.0, repeat: int = 5, seed: int = 42):
+        self.bars = bars
+        self.symbols = synthetic_symbols(symbols)
+        self.lookback = lookback
+        self.entry_threshold = entry_threshold
+        self.repeat = max(repeat, 1)
+        self.seed = seed
+        self.prices = synthetic_prices(self.symbols, bars, seed=seed)
+        self.timings = {}
+
+    @property
+    def params(self) -> Dict:
+        """Parameters that make two reports comparable"""
+        return {
+            'bars': self.bars,
+            'symbols': len(self.symbols),
+            'lookback': self.lookback,
+            'entry_threshold': self.entry_threshold,
+            'seed': self.seed,
+        }
+
+    def timed(self, name: str, fn: Callable, items: Optional[int] = None,
+              setup: Optional[Callable] = None) -> Dict:
+        """Time ``fn`` (after ``setup`` on every run, untimed) and record the result"""
+        runs = []
+        for _ in range(self.repeat):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            fn()
+            runs.append(time.perf_counter() - start)
+
+        best = min(runs)
+        timing = {
+            'best': best,
+            'mean': float(np.mean(runs)),
+            'runs': len(runs),
+            'items': items,
+            'items_per_second': items / best if items and best > 0 else None,
+        }
+        self.timings[name] = timing
+        logger.info(f"Benchmark {name}: best {best:.6f}s over {len(runs)} runs")
+        return timing
+
+    def _frames(self) -> Dict:
+        frames = {}
+        for symbol, data in self.prices.items():
+            data = data.copy()
+            data['Returns'] = data['Close'].pct_change()
+            frames[symbol] = data
+        return frames
+
+    def run_engine(self):
+        """Signals, positions, trade extraction and metrics on in-memory frames"""
+        engine = BacktestEngine(strategy=None)
+        frames = self._frames()
+        exit_threshold = self.entry_threshold * 0.5
+        total_bars = self.bars * len(frames)
+
+        def signals():
+            for data in frames.values():
+                engine._calculate_mean_reversion_signals(
+                    data, self.lookback, self.entry_threshold, exit_threshold
+                )
+
+        self.timed('engine.signals', signals, items=total_bars)
+
+        self.timed('engine.positions', lambda: [
+            mean_reversion_positions(data['Signal'].to_numpy()) for data in frames.values()
+        ], items=total_bars)
+
+        trades = []
+
+        def execute_trades():
+            trades.clear()
+            for symbol, data in frames.items():
+                trades.extend(engine._execute_trades(data, symbol))
+
+        self.timed('engine.trades', execute_trades, items=total_bars)
+
+        def portfolio():
+            panel = PricePanel(frames)
+            z_scores = RollingWindowStats(panel.closes).z_score(self.lookback)
+            positions = mean_reversion_positions(
+                mean_reversion_signals(z_scores, self.entry_threshold, exit_threshold)
+            )
+            weights = portfolio_weights(panel, 'equal', self.lookback)
+            return (
+                aggregate_returns(panel.strategy_returns(positions), weights, panel.active),
+                aggregate_returns(panel.returns, weights, panel.active),
+            )
+
+        self.timed('engine.portfolio', portfolio, items=total_bars)
+
+        # Metrics run on the aggregated portfolio series, as the engine reports them
+        daily_returns, benchmark_returns = portfolio()
+        self.timed('engine.metrics', lambda: engine._calculate_performance_metrics(
+            daily_returns, benchmark_returns, trades
+        ), items=len(daily_returns))
+
+        self.timed('engine.bootstrap', lambda: bootstrap_confidence_intervals(
+            daily_returns, resamples=5000, seed=self.seed
+        ), items=5000 * len(daily_returns))
+
+        closes = PricePanel(frames).closes
+        pair_count = len(self.symbols) * (len(self.symbols) - 1) // 2
+        self.timed('engine.pair_screen', lambda: screen_pairs(
+            closes, self.symbols, self.lookback
+        ), items=pair_count * self.bars)
+
+    def create_fixtures(self):
+        """User, securities with a synced price store, and one strategy"""
+        from django.contrib.auth.models import User
+        from core.models import PriceData, Security, Strategy
+        from core.services.price_store import sync_prices_batch
+
+        user = User.objects.create_user('benchmark', 'benchmark@example.com', 'benchmark')
+        securities = [
+            Security.objects.create(symbol=symbol, name=f"Synthetic {symbol}")
+            for symbol in self.symbols
+        ]
+
+        first_day = min(data.index[0] for data in self.prices.values()).date()
+        last_day = max(data.index[-1] for data in self.prices.values()).date()
+
+        def reset_store():
+            PriceData.objects.filter(security__in=securities).delete()
+            Security.objects.filter(pk__in=[s.pk for s in securities]).update(
+                price_history_start=None, price_history_end=None
+            )
+            for security in securities:
+                security.price_history_start = security.price_history_end = None
+
+        self.timed(
+            'store.sync_batch',
+            lambda: sync_prices_batch(securities, first_day, last_day + timedelta(days=1)),
+            items=self.bars * len(securities),
+            setup=reset_store
+        )
+
+        from django.test.utils import override_settings
+        from core.services.price_arrays import get_array_store
+        from core.services.price_store import get_price_histories, refresh_stale_price_arrays
+
+        def load_histories():
+            get_price_histories(securities, first_day, last_day + timedelta(days=1))
+
+        # Arrays are built outside of requests, as the backtest worker does
+        refresh_stale_price_arrays(securities)
+        array_store = get_array_store()
+        if array_store is not None and any(
+            array_store.frame(security.symbol, first_day, last_day + timedelta(days=1)) is None
+            for security in securities
+        ):
+            raise RuntimeError('Price arrays do not cover the synthetic history')
+
+        load_histories()  # fills the price cache
+        self.timed('store.load_cached', load_histories, items=self.bars * len(securities))
+        with override_settings(PRICE_CACHE_MAX_BYTES=0):
+            if array_store is not None:
+                self.timed('store.load_arrays', load_histories, items=self.bars * len(securities))
+            with override_settings(PRICE_ARRAY_DIR=''):
+                self.timed('store.load_database', load_histories, items=self.bars * len(securities))
+
+        strategy = Strategy.objects.create(
+            user=user,
+            name='Benchmark strategy',
+            lookback_days=self.lookback,
+            entry_threshold=self.entry_threshold,
+            exit_rule='mean_revert'
+        )
+        strategy.tickers.set(securities)
+        return user, strategy
+
+    def run_database(self, client):
+        """Backtest from the price store, result persistence and main views"""
+        from django.core.cache import cache
+        from django.urls import reverse
+        from core.services.chart_data import prepare_chart_frames
+        from core.services.result_writer import BacktestResultWriter
+
+        user, strategy = self.create_fixtures()
+
+        self.timed('backtest.comprehensive', lambda: run_comprehensive_backtest(strategy))
+
+        # Persist results covering the full synthetic history
+        engine = BacktestEngine(strategy)
+        engine.data = self._frames()
+        for security in strategy.tickers.all():
+            engine.data[security.symbol]['Security'] = security
+        results = engine.run_mean_reversion_strategy()
+        results['chart_frames'] = prepare_chart_frames(engine.chart_frames())
+
+        writer = BacktestResultWriter()
+        self.timed(
+            'persistence.save_results',
+            lambda: writer.write(strategy, results),
+            items=len(results.get('trade_log', [])) + 1
+        )
+
+        client.force_login(user)
+
+        def get(url):
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} returned {response.status_code}")
+
+        views = {
+            'view.dashboard': reverse('dashboard'),
+            'view.strategy_detail': reverse('strategy_detail', args=[strategy.id]),
+            'view.backtest_detail': reverse('backtest_detail', args=[strategy.id]),
+            'view.backtest_api_series': reverse('backtest_api', args=[strategy.id]) + '?series=1',
+            'view.compare': reverse('compare_strategies'),
+        }
+        for name, url in views.items():
+            get(url)  # warm caches
+            self.timed(name, lambda url=url: get(url))
+
+        self.timed(
+            'view.strategy_detail_uncached',
+            lambda: get(views['view.strategy_detail']),
+            setup=cache.clear
+        )
+
+    def run(self, client=None) -> Dict:
+        """Run the engine benchmarks, plus database/view benchmarks given a test client"""
+        self.run_engine()
+        if client is not None:
+            # Price syncs are served from the synthetic series through the normal batching path
+            set_provider(FixtureMarketDataProvider(self.prices))
+            try:
+                self.run_database(client)
+            finally:
+                set_provider(None)
+        return self.timings
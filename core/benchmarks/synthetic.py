@@ -0,0 +1,43 @@
+"""
+Synthetic Price Series for AlgoAnchor benchmarks
+Geometric Brownian motion OHLCV bars, so benchmarks never touch the network.
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+
+def synthetic_symbols(count: int) -> List[str]:
+    """Placeholder ticker symbols that cannot clash with real listings"""
+    return [f"SYN{i:03d}" for i in range(count)]
+
+
+def synthetic_prices(symbols: List[str], bars: int, seed: int = 42,
+                     end: Optional[date] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Daily OHLCV frames of ``bars`` business days ending at ``end``.
+
+    ``end`` defaults to yesterday, the last complete bar the price store
+    considers final.
+    """
+    rng = np.random.default_rng(seed)
+    end = end or date.today() - timedelta(days=1)
+    index = pd.bdate_range(end=end, periods=bars, name='Date')
+
+    frames = {}
+    for symbol in symbols:
+        log_returns = rng.normal(0.0003, 0.015, bars)
+        close = 100 * np.exp(np.cumsum(log_returns))
+        open_ = close * np.exp(rng.normal(0, 0.003, bars))
+        spread = np.abs(rng.normal(0, 0.006, bars))
+        frames[symbol] = pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close) * (1 + spread),
+            'Low': np.minimum(open_, close) * (1 - spread),
+            'Close': close,
+            'Volume': rng.integers(100_000, 5_000_000, bars).astype(float),
+        }, index=index)
+
+    return frames
@@ -1,7 +1,8 @@
+from asgiref.sync import async_to_sync, sync_to_async
 from django import forms
 from django.contrib.auth.models import User
 from .models import Strategy, Security
-import yfinance as yf
+from core.services.ticker_info import fetch_infos
 
 class StrategyForm(forms.ModelForm):
     tickers = forms.CharField(
@@ -16,24 +17,38 @@ class StrategyForm(forms.ModelForm):
 
     class Meta:
         model = Strategy
-        fields = ['name', 'lookback_days', 'entry_threshold', 'exit_rule']
+        fields = [
+            'name', 'strategy_type', 'lookback_days', 'entry_threshold', 'exit_rule',
+            'skip_days', 'holding_days', 'top_n',
+        ]
         labels = {
             'name': 'Strategy Name',
+            'strategy_type': 'Strategy Type',
             'lookback_days': 'Lookback Period (Days)',
             'entry_threshold': 'Entry Threshold',
             'exit_rule': 'Exit Rule',
+            'skip_days': 'Skip Period (Days)',
+            'holding_days': 'Holding Period (Days)',
+            'top_n': 'Top N Tickers',
         }
         help_texts = {
             'name': 'A descriptive name for your strategy',
+            'strategy_type': 'Mean reversion trades z-scores, momentum trades lookback returns and pairs trading trades the spread of every ticker pair',
             'lookback_days': 'Number of days for moving average calculation (10-50 typical)',
             'entry_threshold': 'Z-score threshold for entry signal (-2 to -1 typical)',
             'exit_rule': 'When to exit the position (e.g., mean_revert, stop_loss, time_based)',
+            'skip_days': 'Momentum only: most recent days left out of the lookback return (0-21)',
+            'holding_days': 'Momentum only: days between rebalances (1-252)',
+            'top_n': 'Momentum only: hold the N strongest tickers; leave empty to trade each ticker on its own',
         }
         widgets = {
             'name': forms.TextInput(attrs={'placeholder': 'My Mean Reversion Strategy'}),
             'lookback_days': forms.NumberInput(attrs={'min': 5, 'max': 100, 'value': 20}),
             'entry_threshold': forms.NumberInput(attrs={'step': 0.1, 'min': -5, 'max': 5, 'value': -2}),
             'exit_rule': forms.TextInput(attrs={'placeholder': 'mean_revert'}),
+            'skip_days': forms.NumberInput(attrs={'min': 0, 'max': 21}),
+            'holding_days': forms.NumberInput(attrs={'min': 1, 'max': 252}),
+            'top_n': forms.NumberInput(attrs={'min': 1, 'max': 5}),
         }
         
     def __init__(self, *args, **kwargs):
@@ -65,6 +80,24 @@ class StrategyForm(forms.ModelForm):
             raise forms.ValidationError("Entry threshold must be between -5 and 5.")
         return threshold
 
+    def clean_skip_days(self):
+        skip_days = self.cleaned_data.get('skip_days')
+        if skip_days and skip_days > 21:
+            raise forms.ValidationError("Skip period must be between 0 and 21 days.")
+        return skip_days
+
+    def clean_holding_days(self):
+        holding_days = self.cleaned_data.get('holding_days')
+        if holding_days is not None and (holding_days < 1 or holding_days > 252):
+            raise forms.ValidationError("Holding period must be between 1 and 252 days.")
+        return holding_days
+
+    def clean_top_n(self):
+        top_n = self.cleaned_data.get('top_n')
+        if top_n is not None and (top_n < 1 or top_n > 5):
+            raise forms.ValidationError("Top N must be between 1 and 5 tickers.")
+        return top_n
+
     def clean_tickers(self):
         ticker_str = self.cleaned_data['tickers']
         tickers = [t.strip().upper() for t in ticker_str.split(',') if t.strip()]
@@ -80,27 +113,77 @@ class StrategyForm(forms.ModelForm):
         
         return tickers
 
-    def save(self, commit=True):
-        instance = super().save(commit=False)
-        # Process tickers and create Security objects
+    def clean(self):
+        cleaned_data = super().clean()
+        tickers = cleaned_data.get('tickers') or []
+        if cleaned_data.get('strategy_type') == 'pairs' and len(tickers) < 2:
+            self.add_error('tickers', "Pairs trading needs at least 2 tickers.")
+        return cleaned_data
+
+    def resolve_tickers(self):
+        """
+        Security objects of the cleaned tickers, creating missing ones and
+        naming them from the market data provider.
+
+        The provider lookups are network calls (all tickers at once, each
+        bounded by TICKER_INFO_TIMEOUT), so views call this before opening a
+        transaction; ``save`` reuses the result. This is the sync bridge for
+        sync callers: it blocks the calling thread until the lookups finish,
+        so async views await ``aresolve_tickers`` instead.
+        """
+        if hasattr(self, '_resolved_tickers'):
+            return self._resolved_tickers
+        
+        securities, unnamed = self._get_securities()
+        infos = async_to_sync(fetch_infos)([security.symbol for security in unnamed]) if unnamed else {}
+        self._name_securities(unnamed, infos)
+        
+        self._resolved_tickers = securities
+        return securities
+
+    async def aresolve_tickers(self):
+        """``resolve_tickers`` for async views, awaiting the provider lookups"""
+        if hasattr(self, '_resolved_tickers'):
+            return self._resolved_tickers
+        
+        securities, unnamed = await sync_to_async(self._get_securities)()
+        infos = await fetch_infos([security.symbol for security in unnamed]) if unnamed else {}
+        await sync_to_async(self._name_securities)(unnamed, infos)
+        
+        self._resolved_tickers = securities
+        return securities
+
+    def _get_securities(self):
+        """Security objects of the cleaned tickers, and those still needing a name"""
         tickers = self.cleaned_data.get('tickers', [])
         print(f"DEBUG: Tickers from cleaned_data: {tickers}")
         securities = []
+        unnamed = []
         for symbol in tickers:
             security, created = Security.objects.get_or_create(symbol=symbol)
             if created or not security.name:
-                try:
-                    info = yf.Ticker(symbol).info
-                    security.name = info.get("longName") or info.get("shortName") or symbol
-                    security.market_cap = info.get("marketCap")
-                    security.sector = info.get("sector")
-                    security.save()
-                except Exception:
-                    if not security.name:
-                        security.name = symbol
-                        security.save()
+                unnamed.append(security)
             securities.append(security)
         print(f"DEBUG: Securities created: {[s.symbol for s in securities]}")
+        return securities, unnamed
+
+    def _name_securities(self, unnamed, infos):
+        """Name securities from provider info, falling back to the symbol"""
+        for security in unnamed:
+            info = infos.get(security.symbol)
+            if info is not None:
+                security.name = info.get("longName") or info.get("shortName") or security.symbol
+                security.market_cap = info.get("marketCap")
+                security.sector = info.get("sector")
+                security.save()
+            elif not security.name:
+                security.name = security.symbol
+                security.save()
+
+    def save(self, commit=True):
+        instance = super().save(commit=False)
+        # Process tickers and create Security objects
+        securities = self.resolve_tickers()
         
         if commit:
             instance.save()
@@ -0,0 +1,103 @@
+"""
+Management command that drains the backtest job queue
+Usage: python manage.py backtest_worker [--once] [--poll-interval 2] [--max-jobs N] [--requeue-interval 60]
+"""
+
+from django.core.management.base import BaseCommand
+from core.models import Security
+from core.services.job_queue import (
+    claim_next_job, default_worker_name, requeue_stale_jobs, run_job
+)
+from core.services.price_store import refresh_stale_price_arrays
+from datetime import timedelta
+import time
+
+
+class Command(BaseCommand):
+    help = 'Run queued backtest jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once the queue is empty instead of polling for new jobs'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls when the queue is empty'
+        )
+        parser.add_argument(
+            '--max-jobs',
+            type=int,
+            default=0,
+            help='Exit after running this many jobs (0 = no limit)'
+        )
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            default=60,
+            help='Requeue RUNNING jobs older than this (their worker is assumed dead)'
+        )
+        parser.add_argument(
+            '--requeue-interval',
+            type=float,
+            default=60.0,
+            help='Seconds between checks for stale RUNNING jobs while polling'
+        )
+
+    def handle(self, *args, **options):
+        worker = default_worker_name()
+        stale_after = timedelta(minutes=options['stale_minutes'])
+        processed = 0
+        failed = 0
+
+        self.stdout.write(self.style.SUCCESS(f'Backtest worker {worker} started'))
+        last_requeue = None
+
+        try:
+            while not options['max_jobs'] or processed < options['max_jobs']:
+                # Jobs of workers that died after this one started are picked up too
+                now = time.monotonic()
+                if last_requeue is None or now - last_requeue >= options['requeue_interval']:
+                    requeued = requeue_stale_jobs(stale_after)
+                    if requeued:
+                        self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale jobs'))
+                    last_requeue = now
+
+                job = claim_next_job(worker)
+
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                self.stdout.write(f'Running job {job.id} for: {job.strategy.name}')
+                start = time.perf_counter()
+                succeeded = run_job(job)
+                elapsed = time.perf_counter() - start
+                processed += 1
+
+                if succeeded:
+                    self.stdout.write(
+                        self.style.SUCCESS(f'✓ Job {job.id} completed in {elapsed:.2f}s')
+                    )
+                else:
+                    failed += 1
+                    self.stdout.write(
+                        self.style.ERROR(f'✗ Job {job.id} failed after {elapsed:.2f}s')
+                    )
+
+                # Rebuild the price arrays of bars the job stored, off the request path
+                rebuilt = refresh_stale_price_arrays(
+                    Security.objects.filter(strategies__backtest_jobs=job)
+                )
+                if rebuilt:
+                    self.stdout.write(f'Rebuilt price arrays for {rebuilt} securities')
+
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('\nWorker interrupted'))
+
+        self.stdout.write(f'Processed {processed} jobs ({failed} failed)')
@@ -0,0 +1,108 @@
+"""
+Management command to rebuild the memory-mapped price arrays
+Usage: python manage.py build_price_cache [--source store|provider] [--symbol AAPL] [--days 3650] [--strategies-only] [--stale-only]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from core.models import Security
+from core.services.price_arrays import get_array_store
+from core.services.price_store import refresh_stale_price_arrays
+from datetime import timedelta
+import time
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-symbol memory-mapped price arrays from PriceData or the data provider'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            choices=['store', 'provider'],
+            default='store',
+            help='Build from stored PriceData rows or download from the market data provider'
+        )
+        parser.add_argument(
+            '--symbol',
+            type=str,
+            help='Rebuild a specific symbol only'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=3650,
+            help='Calendar days of history to download (provider source only)'
+        )
+        parser.add_argument(
+            '--strategies-only',
+            action='store_true',
+            help='Only rebuild securities used by at least one strategy'
+        )
+        parser.add_argument(
+            '--stale-only',
+            action='store_true',
+            help='Only rebuild securities whose stored history has grown past their arrays (store source)'
+        )
+
+    def handle(self, *args, **options):
+        array_store = get_array_store()
+        if array_store is None:
+            raise CommandError('PRICE_ARRAY_DIR is not set; the price array cache is disabled.')
+
+        securities = Security.objects.filter(is_active=True)
+
+        if options['symbol']:
+            securities = securities.filter(symbol=options['symbol'].upper())
+
+        if options['strategies_only']:
+            securities = securities.filter(strategies__isnull=False).distinct()
+
+        if options['source'] == 'store':
+            securities = securities.filter(
+                price_history_start__isnull=False, price_history_end__isnull=False
+            )
+
+        total = securities.count()
+        if total == 0:
+            self.stdout.write(self.style.WARNING('No securities to build.'))
+            return
+
+        if options['stale_only'] and options['source'] == 'store':
+            start = time.perf_counter()
+            rebuilt = refresh_stale_price_arrays(securities)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Rebuilt {rebuilt} of {total} securities in {time.perf_counter() - start:.2f}s'
+                )
+            )
+            return
+
+        end_date = timezone.now().date()
+        start_date = end_date - timedelta(days=options['days'])
+
+        self.stdout.write(
+            f"Building price arrays for {total} securities from {options['source']} "
+            f"into {array_store.directory}..."
+        )
+
+        rows_total = 0
+        start = time.perf_counter()
+
+        for i, security in enumerate(securities, 1):
+            try:
+                if options['source'] == 'store':
+                    rows = array_store.build_from_store(security)
+                else:
+                    rows = array_store.build_from_provider(security.symbol, start_date, end_date)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'  [{i}/{total}] {security.symbol}: {e}'))
+                continue
+
+            rows_total += rows
+            self.stdout.write(f'  [{i}/{total}] {security.symbol}: {rows} rows')
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nCompleted! Wrote {rows_total} rows in {time.perf_counter() - start:.2f}s'
+            )
+        )
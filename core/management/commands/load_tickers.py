@@ -1,6 +1,6 @@
-import yfinance as yf
 from django.core.management.base import BaseCommand
 from core.models import Security
+from core.services.market_data import get_provider
 import time
 import requests
 from bs4 import BeautifulSoup
@@ -65,14 +65,14 @@ class Command(BaseCommand):
         
         loaded_count = 0
         failed_count = 0
+        provider = get_provider()
         
         for i, symbol in enumerate(tickers, 1):
             try:
                 self.stdout.write(f"Processing {symbol} ({i}/{len(tickers)})...")
                 
-                # Fetch data from yfinance
-                ticker = yf.Ticker(symbol)
-                info = ticker.info
+                # Fetch info from the market data provider
+                info = provider.get_info(symbol)
                 
                 # Create or update security
                 security, created = Security.objects.update_or_create(
@@ -100,7 +100,8 @@ class Command(BaseCommand):
                 loaded_count += 1
                 
                 # Rate limiting to avoid overwhelming Yahoo Finance
-                time.sleep(0.5)
+                if provider.remote:
+                    time.sleep(0.5)
                 
             except Exception as e:
                 failed_count += 1
@@ -116,7 +117,7 @@ class Command(BaseCommand):
         )
 
     def get_exchange_from_info(self, info):
-        """Determine exchange from yfinance info"""
+        """Determine exchange from provider info"""
         exchange = info.get('exchange', '').upper()
         if 'NYSE' in exchange:
             return 'NYSE'
@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
 from core.models import Security
-import yfinance as yf
+from core.services.market_data import get_provider, has_security_info
 from django.db.models import Q
 from collections import Counter
 
@@ -66,7 +66,7 @@ class Command(BaseCommand):
             self.stdout.write("No duplicates found")
 
     def validate_tickers(self, dry_run=False):
-        """Validate ticker symbols by checking with yfinance"""
+        """Validate ticker symbols by checking with the market data provider"""
         self.stdout.write("Validating ticker symbols...")
         
         invalid_tickers = []
@@ -74,11 +74,10 @@ class Command(BaseCommand):
         
         for security in Security.objects.filter(is_active=True):
             try:
-                ticker = yf.Ticker(security.symbol)
-                info = ticker.info
+                info = get_provider().get_info(security.symbol)
                 
                 # Check if ticker has basic info
-                if info.get('symbol') or info.get('shortName') or info.get('longName'):
+                if has_security_info(info):
                     valid_tickers.append(security)
                 else:
                     invalid_tickers.append(security)
@@ -102,11 +101,10 @@ class Command(BaseCommand):
         
         for security in Security.objects.filter(is_active=True):
             try:
-                ticker = yf.Ticker(security.symbol)
-                info = ticker.info
+                info = get_provider().get_info(security.symbol)
                 
                 # Check if ticker has basic info
-                if not (info.get('symbol') or info.get('shortName') or info.get('longName')):
+                if not has_security_info(info):
                     self.stdout.write(f"Deactivating {security.symbol}")
                     if not dry_run:
                         security.is_active = False
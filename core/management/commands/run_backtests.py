@@ -1,17 +1,77 @@
 """
 Management command to run backtests for strategies
-Usage: python manage.py run_backtests [--strategy-id ID] [--force]
+Usage: python manage.py run_backtests [--strategy-id ID] [--force] [--advance] [--workers N] [--weighting equal|inverse_volatility] [--plan-only]
 """
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
-from core.models import Strategy, BacktestResult
-from core.services.backtest_engine import run_comprehensive_backtest
+from django.db import connections
+from core.models import Strategy
+from core.services.backtest_engine import run_comprehensive_backtest, run_incremental_backtest
+from core.services.batch_plan import BacktestPlan, set_backtest_plan
+from core.services.price_store import refresh_stale_price_arrays
+from core.services.indicator_cache import get_indicator_cache
+from core.services.portfolio import WEIGHTING_CHOICES
+from core.services.result_writer import advance_backtest_results, save_backtest_results
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 
+def _init_worker():
+    """Prepare a pool process: set up Django and drop connections inherited from the parent"""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+
+
+def run_strategy_backtest(strategy, weighting='equal', advance=False):
+    """Advance the stored result when possible (with ``advance``), otherwise run in full"""
+    results = run_incremental_backtest(strategy, weighting=weighting) if advance else None
+    if results is None:
+        results = run_comprehensive_backtest(strategy, weighting=weighting)
+    return results
+
+
+def _run_strategy_backtest(strategy_id, weighting='equal', advance=False):
+    """
+    Run one backtest inside a pool process.
+
+    Only reads from the database (over the worker's own connection); results are
+    returned to the parent, which performs all writes. Never raises, so one
+    failing strategy cannot break the pool.
+    """
+    start = time.perf_counter()
+    try:
+        strategy = Strategy.objects.get(id=strategy_id)
+        results = run_strategy_backtest(strategy, weighting, advance)
+        return strategy_id, results, None, time.perf_counter() - start
+    except Exception as e:
+        return strategy_id, None, str(e), time.perf_counter() - start
+
+
+def _run_strategy_group(strategy_ids, weighting='equal', advance=False):
+    """Run strategies sharing their indicators one after another in the same pool process"""
+    return [_run_strategy_backtest(strategy_id, weighting, advance) for strategy_id in strategy_ids]
+
+
+def indicator_groups(strategies):
+    """
+    Strategy ids grouped by lookback and ticker set. A group's strategies
+    compute the same rolling indicators, so running them in one process lets
+    the indicator cache compute them once.
+    """
+    groups = {}
+    for strategy in strategies:
+        signature = (strategy.lookback_days, tuple(sorted(security.symbol for security in strategy.tickers.all())))
+        groups.setdefault(signature, []).append(strategy.id)
+    return list(groups.values())
+
+
 class Command(BaseCommand):
     help = 'Run backtests for strategies'
 
@@ -26,10 +86,32 @@ class Command(BaseCommand):
             action='store_true',
             help='Force re-run backtest even if results exist'
         )
+        parser.add_argument(
+            '--advance',
+            action='store_true',
+            help='Advance existing results over bars that arrived since they ran (full run otherwise)'
+        )
         parser.add_argument(
             '--user',
             help='Run backtests for strategies owned by specific user'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of worker processes (1 = run serially in this process)'
+        )
+        parser.add_argument(
+            '--weighting',
+            choices=WEIGHTING_CHOICES,
+            default='equal',
+            help='How returns of multi-ticker strategies are combined into the portfolio'
+        )
+        parser.add_argument(
+            '--plan-only',
+            action='store_true',
+            help='Print the data loading plan for the selected strategies without running them'
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(
@@ -39,126 +121,224 @@ class Command(BaseCommand):
         try:
             # Filter strategies
             strategies = Strategy.objects.all()
-            
+
             if options['strategy_id']:
                 strategies = strategies.filter(id=options['strategy_id'])
-            
+
             if options['user']:
                 strategies = strategies.filter(user__username=options['user'])
-            
+
             # Filter out strategies that already have results unless forced
-            if not options['force']:
+            if not options['force'] and not options['advance']:
                 strategies = strategies.filter(backtestresult__isnull=True)
-            
+
             total_strategies = strategies.count()
-            
+
             if total_strategies == 0:
                 self.stdout.write(
                     self.style.WARNING('No strategies found to backtest.')
                 )
                 return
-            
+
+            workers = max(options['workers'], 1)
+            self.weighting = options['weighting']
+            self.advance = options['advance']
             self.stdout.write(
-                f'Found {total_strategies} strategies to backtest.'
+                f'Found {total_strategies} strategies to backtest'
+                f'{f" using {workers} workers" if workers > 1 else ""}.'
             )
-            
-            successful = 0
-            failed = 0
-            
-            for strategy in strategies:
-                try:
-                    self.stdout.write(f'Running backtest for: {strategy.name}')
-                    
-                    # Delete existing results if forcing
-                    if options['force']:
-                        BacktestResult.objects.filter(strategy=strategy).delete()
-                    
-                    # Run backtest
-                    with transaction.atomic():
-                        results = run_comprehensive_backtest(strategy)
-                        
-                        if not results:
-                            self.stdout.write(
-                                self.style.WARNING(
-                                    f'No results generated for {strategy.name}'
-                                )
-                            )
-                            failed += 1
-                            continue
-                        
-                        # Create BacktestResult
-                        backtest_result = BacktestResult.objects.create(
-                            strategy=strategy,
-                            cumulative_return=results.get('cumulative_return'),
-                            annualized_return=results.get('annualized_return'),
-                            sharpe_ratio=results.get('sharpe_ratio'),
-                            sortino_ratio=results.get('sortino_ratio'),
-                            win_rate=results.get('win_rate'),
-                            max_drawdown=results.get('max_drawdown'),
-                            volatility=results.get('volatility'),
-                            total_trades=results.get('total_trades', 0),
-                            winning_trades=results.get('winning_trades', 0),
-                            losing_trades=results.get('losing_trades', 0),
-                            avg_trade_return=results.get('avg_trade_return'),
-                            avg_winning_trade=results.get('avg_winning_trade'),
-                            avg_losing_trade=results.get('avg_losing_trade'),
-                            value_at_risk_95=results.get('value_at_risk_95'),
-                            calmar_ratio=results.get('calmar_ratio'),
-                            benchmark_return=results.get('benchmark_return'),
-                            alpha=results.get('alpha'),
-                            beta=results.get('beta'),
-                            backtest_start_date=results.get('backtest_start_date'),
-                            backtest_end_date=results.get('backtest_end_date')
-                        )
-                        
-                        # Create trade logs
-                        from core.models import TradeLog
-                        trade_log = results.get('trade_log', [])
-                        for trade in trade_log:
-                            TradeLog.objects.create(
-                                backtest_result=backtest_result,
-                                security=trade['security'],
-                                trade_type=trade['type'],
-                                date=trade['date'],
-                                price=trade['price'],
-                                quantity=trade['quantity'],
-                                commission=trade['commission'],
-                                signal_value=trade.get('signal_value'),
-                                notes=f"Generated by management command"
-                            )
-                        
-                        self.stdout.write(
-                            self.style.SUCCESS(
-                                f'✓ {strategy.name}: '
-                                f'Return: {results.get("cumulative_return", 0):.2%}, '
-                                f'Sharpe: {results.get("sharpe_ratio", 0):.2f}, '
-                                f'Trades: {results.get("total_trades", 0)}'
-                            )
-                        )
-                        successful += 1
-                        
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.ERROR(
-                            f'✗ Failed to backtest {strategy.name}: {str(e)}'
-                        )
-                    )
-                    failed += 1
-                    logger.error(f'Backtest failed for {strategy.name}: {str(e)}')
-            
+
+            self.successful = 0
+            self.failed = 0
+            self.strategy_seconds = 0.0
+            wall_start = time.perf_counter()
+
+            # Every symbol is synced and loaded once, for the widest range any strategy needs
+            strategies = strategies.prefetch_related('tickers')
+            plan = BacktestPlan(strategies)
+            if options['plan_only']:
+                self.write_plan(plan.summary(), plan.estimate_network_calls())
+                return
+
+            self.write_plan(plan.load().summary())
+            # Bars the plan just stored go into the price arrays for later runs
+            refresh_stale_price_arrays(plan.securities.values())
+
+            set_backtest_plan(plan)
+            try:
+                if workers > 1:
+                    self.run_parallel(list(strategies), workers)
+                else:
+                    self.run_serial(strategies)
+            finally:
+                set_backtest_plan(None)
+
+            wall_seconds = time.perf_counter() - wall_start
+
             # Summary
             self.stdout.write('\n' + '='*50)
             self.stdout.write(f'Backtest Summary:')
-            self.stdout.write(f'✓ Successful: {successful}')
-            self.stdout.write(f'✗ Failed: {failed}')
+            self.stdout.write(f'✓ Successful: {self.successful}')
+            self.stdout.write(f'✗ Failed: {self.failed}')
             self.stdout.write(f'Total: {total_strategies}')
-            
-            if successful > 0:
+            self.stdout.write(
+                f'Wall time: {wall_seconds:.2f}s | '
+                f'Strategy time: {self.strategy_seconds:.2f}s | '
+                f'Throughput: {total_strategies / max(wall_seconds, 1e-9):.2f} strategies/s'
+            )
+            if workers > 1 and wall_seconds > 0:
+                self.stdout.write(
+                    f'Parallel speedup: {self.strategy_seconds / wall_seconds:.2f}x '
+                    f'over {workers} workers'
+                )
+            elif get_indicator_cache():
+                stats = get_indicator_cache().stats()
+                self.stdout.write(
+                    f'Indicator cache: {stats["computed"]} arrays computed, {stats["hits"]} hits, '
+                    f'{stats["bytes"] / 1024 / 1024:.1f} MB'
+                )
+
+            if self.successful > 0:
                 self.stdout.write(
                     self.style.SUCCESS(
-                        f'\nSuccessfully completed {successful} backtests!'
+                        f'\nSuccessfully completed {self.successful} backtests!'
                     )
                 )
-            
+
         except Exception as e:
             raise CommandError(f'Error running backtests: {str(e)}')
+
+    def write_plan(self, summary, expected_calls=None):
+        """
+        Report what the batch loads compared to loading each strategy's tickers
+        separately; ``expected_calls`` (planned, naive) reports a plan that was not loaded
+        """
+        self.stdout.write(
+            f'Data plan: {summary["unique_symbols"]} unique symbols for {summary["strategies"]} strategies '
+            f'({summary["naive_symbol_loads"]} symbol loads naively)'
+        )
+        if expected_calls:
+            planned_calls, naive_calls = expected_calls
+            self.stdout.write(
+                f'Network calls: {planned_calls} expected vs up to {naive_calls} expected naively'
+            )
+        else:
+            self.stdout.write(
+                f'Network calls: {summary["network_calls"]} made ({summary["expected_network_calls"]} expected) '
+                f'vs up to {summary["expected_naive_network_calls"]} expected naively'
+            )
+        if summary['symbol_loads']:
+            saved = 1 - summary['bytes_loaded'] / max(summary['naive_bytes'], 1)
+            self.stdout.write(
+                f'Loaded {summary["bytes_loaded"] / 1024 / 1024:.1f} MB once '
+                f'vs {summary["naive_bytes"] / 1024 / 1024:.1f} MB per strategy ({saved:.0%} saved), '
+                f'{summary["new_rows"]} new rows in {summary["seconds"]:.2f}s'
+            )
+
+    def run_serial(self, strategies):
+        """Run backtests one at a time in this process"""
+        total = strategies.count()
+
+        for index, strategy in enumerate(strategies, 1):
+            self.stdout.write(f'Running backtest for: {strategy.name}')
+            start = time.perf_counter()
+            try:
+                results = run_strategy_backtest(strategy, self.weighting, self.advance)
+                self.record_result(
+                    strategy, results, None, time.perf_counter() - start, index, total
+                )
+            except Exception as e:
+                self.record_result(
+                    strategy, None, str(e), time.perf_counter() - start, index, total
+                )
+
+    def run_parallel(self, strategies, workers):
+        """Run backtests across a process pool; results are written here, in the parent"""
+        by_id = {strategy.id: strategy for strategy in strategies}
+        total = len(strategies)
+
+        # Forked workers must not share the parent's database connection
+        connections.close_all()
+
+        groups = indicator_groups(strategies)
+        index = 0
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = {
+                pool.submit(_run_strategy_group, group, self.weighting, self.advance): group
+                for group in groups
+            }
+
+            for future in as_completed(futures):
+                try:
+                    outcomes = future.result()
+                except Exception as e:
+                    # The worker process itself died (e.g. killed or out of memory)
+                    outcomes = [
+                        (strategy_id, None, f'worker crashed: {str(e)}', 0.0)
+                        for strategy_id in futures[future]
+                    ]
+
+                for strategy_id, results, error, elapsed in outcomes:
+                    index += 1
+                    self.record_result(by_id[strategy_id], results, error, elapsed, index, total)
+
+    def record_result(self, strategy, results, error, elapsed, index, total):
+        """Persist a finished backtest and report its progress line"""
+        self.strategy_seconds += elapsed
+        progress = f'[{index}/{total}]'
+
+        if error:
+            self.stdout.write(
+                self.style.ERROR(
+                    f'{progress} ✗ Failed to backtest {strategy.name}: {error} ({elapsed:.2f}s)'
+                )
+            )
+            self.failed += 1
+            logger.error(f'Backtest failed for {strategy.name}: {error}')
+            return
+
+        if results and results.get('incremental') and not results.get('new_bars'):
+            self.stdout.write(f'{progress} {strategy.name} is up to date ({elapsed:.2f}s)')
+            self.successful += 1
+            return
+
+        if not results:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'{progress} No results generated for {strategy.name} ({elapsed:.2f}s)'
+                )
+            )
+            self.failed += 1
+            return
+
+        try:
+            self.save_results(strategy, results)
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(
+                    f'{progress} ✗ Failed to save results for {strategy.name}: {str(e)}'
+                )
+            )
+            self.failed += 1
+            logger.error(f'Saving backtest failed for {strategy.name}: {str(e)}')
+            return
+
+        advanced = f' [+{results["new_bars"]} bars]' if results.get('incremental') else ''
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{progress} ✓ {strategy.name}{advanced}: '
+                f'Return: {results.get("cumulative_return", 0):.2%}, '
+                f'Sharpe: {results.get("sharpe_ratio", 0):.2f}, '
+                f'Trades: {results.get("total_trades", 0)} '
+                f'({elapsed:.2f}s)'
+            )
+        )
+        self.successful += 1
+
+    def save_results(self, strategy, results):
+        """Persist the BacktestResult and its trade log, replacing any previous result atomically"""
+        if results.get('incremental'):
+            advance_backtest_results(strategy, results, notes="Advanced by management command")
+        else:
+            save_backtest_results(strategy, results, notes="Generated by management command")
@@ -0,0 +1,156 @@
+"""
+Management command to run the offline benchmark suite
+Usage: python manage.py run_benchmarks [--bars 2520] [--symbols 5] [--output report.json] [--baseline baseline.json]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from core.benchmarks.report import build_report, compare_reports, load_report, save_report
+from core.benchmarks.suite import BenchmarkSuite
+import tempfile
+
+# Keeps benchmark runs out of the shared file cache (price arrays go to a temp dir)
+BENCHMARK_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'prices': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark-prices'},
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark engine, metrics, persistence and views on synthetic data (no network)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bars',
+            type=int,
+            default=2520,
+            help='Business days per synthetic price series'
+        )
+        parser.add_argument(
+            '--symbols',
+            type=int,
+            default=5,
+            help='Number of synthetic tickers'
+        )
+        parser.add_argument(
+            '--lookback',
+            type=int,
+            default=20,
+            help='Strategy lookback window'
+        )
+        parser.add_argument(
+            '--entry-threshold',
+            type=float,
+            default=1.0,
+            help='Strategy z-score entry threshold'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timing repetitions per benchmark (best run is compared)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for the synthetic series'
+        )
+        parser.add_argument(
+            '--engine-only',
+            action='store_true',
+            help='Skip the database and view benchmarks'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Write the JSON report to this path'
+        )
+        parser.add_argument(
+            '--baseline',
+            type=str,
+            help='Compare against a previously saved JSON report'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.2,
+            help='Allowed slowdown vs the baseline before a benchmark is flagged (0.2 = 20%%)'
+        )
+
+    def handle(self, *args, **options):
+        suite = BenchmarkSuite(
+            bars=options['bars'],
+            symbols=options['symbols'],
+            lookback=options['lookback'],
+            entry_threshold=options['entry_threshold'],
+            repeat=options['repeat'],
+            seed=options['seed']
+        )
+
+        self.stdout.write(
+            f"Benchmarking {len(suite.symbols)} synthetic series x {suite.bars} bars "
+            f"({suite.repeat} runs each)..."
+        )
+
+        if options['engine_only']:
+            suite.run()
+        else:
+            self.run_with_test_database(suite)
+
+        report = build_report(suite.timings, suite.params)
+        self.print_timings(report)
+
+        if options['output']:
+            save_report(report, options['output'])
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+        if options['baseline']:
+            self.check_baseline(report, options['baseline'], options['tolerance'])
+
+    def run_with_test_database(self, suite):
+        """Run the full suite against a throwaway test database"""
+        old_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+        try:
+            with tempfile.TemporaryDirectory() as array_dir, \
+                    override_settings(CACHES=BENCHMARK_CACHES, PRICE_ARRAY_DIR=array_dir):
+                suite.run(client=Client())
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def print_timings(self, report):
+        self.stdout.write('\n' + '='*72)
+        self.stdout.write(f"{'Benchmark':<34}{'Best (ms)':>12}{'Mean (ms)':>12}{'Items/s':>14}")
+        self.stdout.write('='*72)
+
+        for name, timing in report['benchmarks'].items():
+            rate = f"{timing['items_per_second']:,.0f}" if timing['items_per_second'] else '-'
+            self.stdout.write(
+                f"{name:<34}{timing['best'] * 1000:>12.3f}{timing['mean'] * 1000:>12.3f}{rate:>14}"
+            )
+
+    def check_baseline(self, report, path, tolerance):
+        try:
+            rows = compare_reports(report, load_report(path), tolerance)
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f'Cannot compare against baseline {path}: {e}')
+
+        self.stdout.write(f"\nComparison with {path} (tolerance {tolerance:.0%}):")
+        for row in rows:
+            line = (
+                f"  {row['name']:<32}{row['baseline'] * 1000:>10.3f} -> "
+                f"{row['current'] * 1000:>10.3f} ms  ({row['ratio']:.2f}x)"
+            )
+            self.stdout.write(self.style.ERROR(line) if row['regressed'] else line)
+
+        regressions = [row['name'] for row in rows if row['regressed']]
+        if regressions:
+            raise CommandError(f"{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
@@ -0,0 +1,95 @@
+"""
+Management command to sweep lookback x entry-threshold grids for a strategy
+Usage: python manage.py sweep_parameters --strategy-id ID [--lookbacks 10,20,40] [--thresholds 1,1.5,2]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from core.models import Strategy
+from core.services.backtest_engine import RANK_METRICS, build_sweep_grid, run_parameter_sweep
+import time
+
+
+class Command(BaseCommand):
+    help = 'Evaluate a grid of lookback/entry-threshold pairs against one data load'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--strategy-id',
+            type=int,
+            required=True,
+            help='Strategy whose tickers are used for the sweep'
+        )
+        parser.add_argument(
+            '--lookbacks',
+            default='10,20,30,50',
+            help='Comma-separated lookback windows in days'
+        )
+        parser.add_argument(
+            '--thresholds',
+            default='1.0,1.5,2.0',
+            help='Comma-separated z-score entry thresholds'
+        )
+        parser.add_argument(
+            '--rank-by',
+            default='sharpe_ratio',
+            choices=RANK_METRICS,
+            help='Metric used to rank the combinations (descending)'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=10,
+            help='Number of ranked rows to display'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            strategy = Strategy.objects.get(id=options['strategy_id'])
+        except Strategy.DoesNotExist:
+            raise CommandError(f'Strategy {options["strategy_id"]} not found')
+
+        try:
+            lookbacks = [int(value) for value in options['lookbacks'].split(',') if value.strip()]
+            thresholds = [float(value) for value in options['thresholds'].split(',') if value.strip()]
+        except ValueError as e:
+            raise CommandError(f'Invalid grid specification: {str(e)}')
+
+        try:
+            grid = build_sweep_grid(lookbacks, thresholds)
+        except ValueError as e:
+            raise CommandError(str(e))
+        if not grid:
+            raise CommandError('The parameter grid is empty')
+
+        self.stdout.write(
+            f'Sweeping {len(grid)} combinations for {strategy.name} '
+            f'({strategy.get_tickers_display()})...'
+        )
+
+        start = time.perf_counter()
+        rows = run_parameter_sweep(strategy, grid, rank_by=options['rank_by'])
+        elapsed = time.perf_counter() - start
+
+        if not rows:
+            self.stdout.write(self.style.WARNING('No sweep results generated.'))
+            return
+
+        self.stdout.write('\n' + '='*78)
+        self.stdout.write(
+            f'{"Rank":>4} {"Lookback":>8} {"Entry":>6} {"Return":>9} {"Sharpe":>7} '
+            f'{"Sortino":>8} {"MaxDD":>8} {"WinRate":>8} {"Trades":>7}'
+        )
+        for row in rows[:options['top']]:
+            self.stdout.write(
+                f'{row["rank"]:>4} {row["lookback_days"]:>8} {row["entry_threshold"]:>6.2f} '
+                f'{row["cumulative_return"]:>9.2%} {row["sharpe_ratio"]:>7.2f} '
+                f'{row["sortino_ratio"]:>8.2f} {row["max_drawdown"]:>8.2%} '
+                f'{row["win_rate"]:>8.1%} {row["total_trades"]:>7}'
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nEvaluated {len(rows)} combinations in {elapsed:.2f}s '
+                f'({len(rows) / max(elapsed, 1e-9):.1f} combinations/s)'
+            )
+        )
@@ -0,0 +1,78 @@
+"""
+Management command to sync daily OHLCV history into the local price store
+Usage: python manage.py sync_prices [--symbol AAPL] [--days 3650] [--strategies-only] [--batch-size 50]
+"""
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.models import Security
+from core.services.price_store import sync_prices_batch
+from datetime import timedelta
+import time
+
+
+class Command(BaseCommand):
+    help = 'Download missing daily price history into PriceData'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--symbol',
+            type=str,
+            help='Sync a specific symbol only'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=3650,
+            help='How many calendar days of history to keep synced'
+        )
+        parser.add_argument(
+            '--strategies-only',
+            action='store_true',
+            help='Only sync securities used by at least one strategy'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Symbols requested together in one download'
+        )
+
+    def handle(self, *args, **options):
+        securities = Security.objects.filter(is_active=True)
+
+        if options['symbol']:
+            securities = securities.filter(symbol=options['symbol'].upper())
+
+        if options['strategies_only']:
+            securities = securities.filter(strategies__isnull=False).distinct()
+
+        if not securities.exists():
+            self.stdout.write(self.style.WARNING('No securities to sync.'))
+            return
+
+        end_date = timezone.now().date()
+        start_date = end_date - timedelta(days=options['days'])
+        total = securities.count()
+
+        self.stdout.write(f'Syncing {total} securities from {start_date} to {end_date}...')
+
+        inserted_total = 0
+        start = time.perf_counter()
+        securities = list(securities)
+        batch_size = max(options['batch_size'], 1)
+
+        for offset in range(0, total, batch_size):
+            batch = securities[offset:offset + batch_size]
+            inserted = sync_prices_batch(batch, start_date, end_date)
+
+            for i, security in enumerate(batch, offset + 1):
+                count = inserted.get(security.symbol, 0)
+                inserted_total += count
+                self.stdout.write(f'  [{i}/{total}] {security.symbol}: {count} new rows')
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nCompleted! Inserted {inserted_total} rows in {time.perf_counter() - start:.2f}s'
+            )
+        )
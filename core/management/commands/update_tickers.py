@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
 from core.models import Security
-import yfinance as yf
+from core.services.market_data import get_provider
 import time
 from django.utils import timezone
 from datetime import timedelta
@@ -70,7 +70,8 @@ class Command(BaseCommand):
                 updated_count += 1
                 
                 # Rate limiting
-                time.sleep(0.5)
+                if get_provider().remote:
+                    time.sleep(0.5)
                 
             except Exception as e:
                 failed_count += 1
@@ -85,9 +86,8 @@ class Command(BaseCommand):
         )
 
     def update_security(self, security):
-        """Update a single security with latest data from yfinance"""
-        ticker = yf.Ticker(security.symbol)
-        info = ticker.info
+        """Update a single security with latest data from the market data provider"""
+        info = get_provider().get_info(security.symbol)
         
         # Update fields
         security.name = info.get('longName') or info.get('shortName') or security.name
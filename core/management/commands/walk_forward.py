@@ -0,0 +1,152 @@
+"""
+Management command to run walk-forward optimization for a strategy
+Usage: python manage.py walk_forward --strategy-id ID [--train-days 504] [--test-days 126] [--workers 4]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from core.models import Strategy
+from core.services.backtest_engine import RANK_METRICS, build_sweep_grid
+from core.services.portfolio import WEIGHTING_CHOICES
+from core.services.walk_forward import run_walk_forward, save_walk_forward
+
+
+class Command(BaseCommand):
+    help = 'Optimize lookback/entry threshold on rolling train windows and evaluate out of sample'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--strategy-id',
+            type=int,
+            required=True,
+            help='Strategy whose tickers are used'
+        )
+        parser.add_argument(
+            '--lookbacks',
+            default='10,20,30,50',
+            help='Comma-separated lookback windows in days'
+        )
+        parser.add_argument(
+            '--thresholds',
+            default='1.0,1.5,2.0',
+            help='Comma-separated z-score entry thresholds'
+        )
+        parser.add_argument(
+            '--train-days',
+            type=int,
+            default=504,
+            help='Trading days per train window'
+        )
+        parser.add_argument(
+            '--test-days',
+            type=int,
+            default=126,
+            help='Trading days per test window (and step between folds)'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=3650,
+            help='Calendar days of history to split into folds'
+        )
+        parser.add_argument(
+            '--rank-by',
+            default='sharpe_ratio',
+            choices=RANK_METRICS,
+            help='Metric optimized on each train window (descending)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of worker processes for the folds'
+        )
+        parser.add_argument(
+            '--weighting',
+            choices=WEIGHTING_CHOICES,
+            default='equal',
+            help='How returns of multi-ticker strategies are combined into the portfolio'
+        )
+        parser.add_argument(
+            '--no-save',
+            action='store_true',
+            help='Print the results without storing the run'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            strategy = Strategy.objects.get(id=options['strategy_id'])
+        except Strategy.DoesNotExist:
+            raise CommandError(f'Strategy {options["strategy_id"]} not found')
+
+        try:
+            lookbacks = [int(value) for value in options['lookbacks'].split(',') if value.strip()]
+            thresholds = [float(value) for value in options['thresholds'].split(',') if value.strip()]
+        except ValueError as e:
+            raise CommandError(f'Invalid grid specification: {str(e)}')
+
+        try:
+            grid = build_sweep_grid(lookbacks, thresholds)
+        except ValueError as e:
+            raise CommandError(str(e))
+        if not grid:
+            raise CommandError('The parameter grid is empty')
+
+        self.stdout.write(
+            f'Walk-forward optimization of {len(grid)} combinations for {strategy.name} '
+            f'({options["train_days"]} train / {options["test_days"]} test days)...'
+        )
+
+        results = run_walk_forward(
+            strategy,
+            grid,
+            train_bars=options['train_days'],
+            test_bars=options['test_days'],
+            days=options['days'],
+            rank_by=options['rank_by'],
+            workers=max(options['workers'], 1),
+            weighting=options['weighting']
+        )
+
+        if not results:
+            self.stdout.write(self.style.WARNING('Not enough history for a single fold.'))
+            return
+
+        self.stdout.write('\n' + '='*86)
+        self.stdout.write(
+            f'{"Fold":>4} {"Test window":>23} {"Lookback":>8} {"Entry":>6} '
+            f'{"Train":>7} {"Return":>9} {"Sharpe":>7} {"MaxDD":>8} {"Trades":>7}'
+        )
+        for index, fold in enumerate(results['folds'], 1):
+            metrics = fold['test_metrics']
+            train_score = f'{fold["train_score"]:.2f}' if fold['train_score'] is not None else '-'
+            self.stdout.write(
+                f'{index:>4} {fold["test_start"]} - {fold["test_end"]} '
+                f'{fold["lookback_days"]:>8} {fold["entry_threshold"]:>6.2f} {train_score:>7} '
+                f'{metrics.get("cumulative_return", 0):>9.2%} {metrics.get("sharpe_ratio", 0):>7.2f} '
+                f'{metrics.get("max_drawdown", 0):>8.2%} {metrics.get("total_trades", 0):>7}'
+            )
+
+        summary = results['summary']
+        out_of_sample = summary['out_of_sample']
+        self.stdout.write('\n' + '='*86)
+        self.stdout.write(
+            f'Out of sample: Return {out_of_sample.get("cumulative_return", 0):.2%}, '
+            f'Sharpe {out_of_sample.get("sharpe_ratio", 0):.2f}, '
+            f'Max drawdown {out_of_sample.get("max_drawdown", 0):.2%}'
+        )
+        self.stdout.write(
+            f'Profitable folds: {summary["profitable_folds"]}/{summary["folds"]}'
+            + (f' | Efficiency: {summary["efficiency"]:.2f}' if summary['efficiency'] is not None else '')
+        )
+
+        if not options['no_save']:
+            run = save_walk_forward(
+                strategy, results, grid, options['train_days'], options['test_days'], options['rank_by']
+            )
+            self.stdout.write(f'Stored as walk-forward run {run.id}')
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nCompleted {summary["folds"]} folds in {results["seconds"]:.2f}s'
+            )
+        )
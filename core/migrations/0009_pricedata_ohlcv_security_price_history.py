@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_remove_backtestresult_trade_log_backtestresult_alpha_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="pricedata",
+            options={
+                "ordering": ["security", "date"],
+                "verbose_name_plural": "Price data",
+            },
+        ),
+        migrations.AddField(
+            model_name="pricedata",
+            name="high",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="pricedata",
+            name="low",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="pricedata",
+            name="open",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="pricedata",
+            name="volume",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="security",
+            name="price_history_end",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="security",
+            name="price_history_start",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name="pricedata",
+            constraint=models.UniqueConstraint(
+                fields=("security", "date"), name="unique_price_per_security_date"
+            ),
+        ),
+    ]
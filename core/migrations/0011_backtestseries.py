@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_backtestjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BacktestSeries",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_date", models.DateField()),
+                ("length", models.PositiveIntegerField(default=0)),
+                ("date_offsets", models.BinaryField()),
+                ("strategy_returns", models.BinaryField()),
+                ("benchmark_returns", models.BinaryField()),
+                ("equity_curve", models.BinaryField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "backtest_result",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="series",
+                        to="core.backtestresult",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Backtest series",
+            },
+        ),
+    ]
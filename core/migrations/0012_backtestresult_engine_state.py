@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_backtestseries"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="backtestresult",
+            name="engine_state",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
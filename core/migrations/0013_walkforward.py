@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_backtestresult_engine_state"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WalkForwardRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("train_days", models.PositiveIntegerField()),
+                ("test_days", models.PositiveIntegerField()),
+                ("lookbacks", models.JSONField(default=list)),
+                ("thresholds", models.JSONField(default=list)),
+                ("rank_by", models.CharField(default="sharpe_ratio", max_length=50)),
+                ("start_date", models.DateField(blank=True, null=True)),
+                ("end_date", models.DateField(blank=True, null=True)),
+                ("summary", models.JSONField(default=dict)),
+                ("seconds", models.FloatField(default=0.0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "strategy",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="walk_forward_runs",
+                        to="core.strategy",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="WalkForwardFold",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("index", models.PositiveIntegerField()),
+                ("train_start", models.DateField()),
+                ("train_end", models.DateField()),
+                ("test_start", models.DateField()),
+                ("test_end", models.DateField()),
+                ("lookback_days", models.IntegerField()),
+                ("entry_threshold", models.FloatField()),
+                ("train_score", models.FloatField(blank=True, null=True)),
+                ("cumulative_return", models.FloatField(blank=True, null=True)),
+                ("sharpe_ratio", models.FloatField(blank=True, null=True)),
+                ("max_drawdown", models.FloatField(blank=True, null=True)),
+                ("total_trades", models.IntegerField(default=0)),
+                ("test_metrics", models.JSONField(default=dict)),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="folds",
+                        to="core.walkforwardrun",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["run", "index"],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_walkforward"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="backtestresult",
+            name="confidence_intervals",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
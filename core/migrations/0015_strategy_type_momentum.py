@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0014_backtestresult_confidence_intervals"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="strategy",
+            name="holding_days",
+            field=models.PositiveIntegerField(
+                default=21, help_text="Days between momentum rebalances"
+            ),
+        ),
+        migrations.AddField(
+            model_name="strategy",
+            name="skip_days",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Most recent days excluded from the momentum lookback",
+            ),
+        ),
+        migrations.AddField(
+            model_name="strategy",
+            name="strategy_type",
+            field=models.CharField(
+                choices=[
+                    ("mean_reversion", "Mean Reversion"),
+                    ("momentum", "Momentum"),
+                ],
+                default="mean_reversion",
+                help_text="Engine the strategy is backtested with",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="strategy",
+            name="top_n",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Hold only the N strongest tickers (cross-sectional momentum)",
+                null=True,
+            ),
+        ),
+    ]
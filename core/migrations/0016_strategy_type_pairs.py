@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0015_strategy_type_momentum"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="strategy",
+            name="strategy_type",
+            field=models.CharField(
+                choices=[
+                    ("mean_reversion", "Mean Reversion"),
+                    ("momentum", "Momentum"),
+                    ("pairs", "Pairs Trading"),
+                ],
+                default="mean_reversion",
+                help_text="Engine the strategy is backtested with",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0016_strategy_type_pairs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="backtestjob",
+            name="symbols_done",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="backtestjob",
+            name="symbols_total",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
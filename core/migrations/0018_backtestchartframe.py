@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 09:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0017_backtestjob_symbols"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BacktestChartFrame",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50)),
+                ("start_date", models.DateField()),
+                ("length", models.PositiveIntegerField(default=0)),
+                ("date_offsets", models.BinaryField()),
+                ("columns", models.JSONField(default=list)),
+                ("values", models.BinaryField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "backtest_result",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="chart_frames",
+                        to="core.backtestresult",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("backtest_result", "name")},
+            },
+        ),
+    ]
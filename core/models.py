@@ -1,8 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-import yfinance as yf
+from django.utils import timezone
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
@@ -43,6 +43,9 @@ class Security(models.Model):
     )
     currency = models.CharField(max_length=3, default='USD')
     is_active = models.BooleanField(default=True)
+    # Date range already synced into PriceData (inclusive), see core.services.price_store
+    price_history_start = models.DateField(null=True, blank=True)
+    price_history_end = models.DateField(null=True, blank=True)
     last_updated = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -83,6 +86,12 @@ class Security(models.Model):
         super().save(*args, **kwargs)
 
 class Strategy(models.Model):
+    STRATEGY_TYPE_CHOICES = [
+        ('mean_reversion', 'Mean Reversion'),
+        ('momentum', 'Momentum'),
+        ('pairs', 'Pairs Trading'),
+    ]
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=100, help_text="Descriptive name for your strategy")
     lookback_days = models.PositiveIntegerField(
@@ -94,6 +103,28 @@ class Strategy(models.Model):
         max_length=255, 
         help_text="Exit strategy rule (e.g., mean_revert, stop_loss)"
     )
+    strategy_type = models.CharField(
+        max_length=20,
+        choices=STRATEGY_TYPE_CHOICES,
+        default='mean_reversion',
+        help_text="Engine the strategy is backtested with"
+    )
+    # Momentum: the most recent skip_days are left out of the lookback return,
+    # positions are rebalanced every holding_days and, when top_n is set, only
+    # the top_n strongest tickers are held (cross-sectional momentum)
+    skip_days = models.PositiveIntegerField(
+        default=0,
+        help_text="Most recent days excluded from the momentum lookback"
+    )
+    holding_days = models.PositiveIntegerField(
+        default=21,
+        help_text="Days between momentum rebalances"
+    )
+    top_n = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Hold only the N strongest tickers (cross-sectional momentum)"
+    )
     tickers = models.ManyToManyField(Security, related_name='strategies', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -128,7 +159,18 @@ class Strategy(models.Model):
 class PriceData(models.Model):
     security = models.ForeignKey(Security, on_delete=models.CASCADE)
     date = models.DateField()
+    open = models.FloatField(null=True, blank=True)
+    high = models.FloatField(null=True, blank=True)
+    low = models.FloatField(null=True, blank=True)
     close = models.FloatField()
+    volume = models.BigIntegerField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "Price data"
+        ordering = ['security', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['security', 'date'], name='unique_price_per_security_date'),
+        ]
 
     def __str__(self):
         return f"{self.security.symbol} - {self.date} - {self.close}"
@@ -160,6 +202,10 @@ class BacktestResult(models.Model):
     # Execution details
     backtest_start_date = models.DateField(null=True, blank=True)
     backtest_end_date = models.DateField(null=True, blank=True)
+    # Bootstrap confidence intervals of the headline metrics
+    confidence_intervals = models.JSONField(null=True, blank=True)
+    # Terminal engine state used to advance the backtest over newly arrived bars
+    engine_state = models.JSONField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -176,6 +222,47 @@ class BacktestResult(models.Model):
             'total_trades': self.total_trades,
         }
 
+class BacktestSeries(models.Model):
+    """
+    Daily series of a backtest stored as packed arrays (see core.services.series_store):
+    int32 day offsets from ``start_date`` plus float32 returns and equity values.
+    """
+    backtest_result = models.OneToOneField(BacktestResult, on_delete=models.CASCADE, related_name='series')
+    start_date = models.DateField()
+    length = models.PositiveIntegerField(default=0)
+    date_offsets = models.BinaryField()
+    strategy_returns = models.BinaryField()
+    benchmark_returns = models.BinaryField()
+    equity_curve = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = "Backtest series"
+
+    def __str__(self):
+        return f"Series for {self.backtest_result} ({self.length} days)"
+
+class BacktestChartFrame(models.Model):
+    """
+    Engine-prepared price/indicator/position frame of one ticker (or "Y/X"
+    pair) of a backtest, stored as packed arrays (see core.services.series_store):
+    int32 day offsets from ``start_date`` plus a float64 (days x columns) matrix.
+    """
+    backtest_result = models.ForeignKey(BacktestResult, on_delete=models.CASCADE, related_name='chart_frames')
+    name = models.CharField(max_length=50)
+    start_date = models.DateField()
+    length = models.PositiveIntegerField(default=0)
+    date_offsets = models.BinaryField()
+    columns = models.JSONField(default=list)
+    values = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['backtest_result', 'name']
+
+    def __str__(self):
+        return f"Chart frame {self.name} for {self.backtest_result} ({self.length} days)"
+
 class TradeLog(models.Model):
     TRADE_TYPES = [
         ('BUY', 'Buy'),
@@ -202,65 +289,103 @@ class TradeLog(models.Model):
     def __str__(self):
         return f"{self.trade_type} {self.security.symbol} on {self.date}"
 
+class BacktestJob(models.Model):
+    STATUS_QUEUED = 'QUEUED'
+    STATUS_RUNNING = 'RUNNING'
+    STATUS_DONE = 'DONE'
+    STATUS_FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    strategy = models.ForeignKey(Strategy, on_delete=models.CASCADE, related_name='backtest_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True)
+    stage = models.CharField(max_length=50, blank=True)  # Current step reported by the engine
+    progress = models.FloatField(default=0.0)  # 0.0 - 1.0
+    symbols_done = models.PositiveIntegerField(default=0)  # Tickers loaded so far
+    symbols_total = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Backtest job {self.id} for {self.strategy.name} ({self.status})"
+    
+    def is_active(self):
+        """Whether the job is still waiting or running"""
+        return self.status in (self.STATUS_QUEUED, self.STATUS_RUNNING)
+    
+    def queue_seconds(self):
+        """Seconds spent waiting for a worker"""
+        if self.started_at:
+            return (self.started_at - self.created_at).total_seconds()
+        return None
+    
+    def run_seconds(self):
+        """Seconds spent running (so far, if still running)"""
+        if not self.started_at:
+            return None
+        end = self.finished_at or timezone.now()
+        return (end - self.started_at).total_seconds()
+
+class WalkForwardRun(models.Model):
+    """Out-of-sample validation of a strategy over rolling train/test windows"""
+    strategy = models.ForeignKey(Strategy, on_delete=models.CASCADE, related_name='walk_forward_runs')
+    train_days = models.PositiveIntegerField()  # Trading days per train window
+    test_days = models.PositiveIntegerField()  # Trading days per test window
+    lookbacks = models.JSONField(default=list)
+    thresholds = models.JSONField(default=list)
+    rank_by = models.CharField(max_length=50, default='sharpe_ratio')
+    start_date = models.DateField(null=True, blank=True)
+    end_date = models.DateField(null=True, blank=True)
+    # Stitched out-of-sample metrics and fold statistics
+    summary = models.JSONField(default=dict)
+    seconds = models.FloatField(default=0.0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Walk-forward run {self.id} for {self.strategy.name}"
+
+class WalkForwardFold(models.Model):
+    run = models.ForeignKey(WalkForwardRun, on_delete=models.CASCADE, related_name='folds')
+    index = models.PositiveIntegerField()
+    train_start = models.DateField()
+    train_end = models.DateField()
+    test_start = models.DateField()
+    test_end = models.DateField()
+    # Parameters chosen on the train window
+    lookback_days = models.IntegerField()
+    entry_threshold = models.FloatField()
+    train_score = models.FloatField(null=True, blank=True)
+    # Out-of-sample results on the test window
+    cumulative_return = models.FloatField(null=True, blank=True)
+    sharpe_ratio = models.FloatField(null=True, blank=True)
+    max_drawdown = models.FloatField(null=True, blank=True)
+    total_trades = models.IntegerField(default=0)
+    test_metrics = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ['run', 'index']
+
+    def __str__(self):
+        return f"Fold {self.index} of {self.run}"
+
 @receiver(post_save, sender=Strategy)
 def run_backtest_on_save(sender, instance, created, **kwargs):
-    """Auto-trigger comprehensive backtesting when a strategy is created"""
+    """Queue a backtest when a strategy is created; a backtest_worker process runs it"""
     if created and hasattr(instance, 'user') and instance.user:
-        from .services.backtest_engine import run_comprehensive_backtest
-        try:
-            # Run comprehensive backtest
-            results = run_comprehensive_backtest(instance)
-            
-            if not results:
-                logger.warning(f"No backtest results generated for strategy {instance.name}")
-                return
-            
-            # Create BacktestResult
-            backtest_result = BacktestResult.objects.create(
-                strategy=instance,
-                cumulative_return=results.get('cumulative_return'),
-                annualized_return=results.get('annualized_return'),
-                sharpe_ratio=results.get('sharpe_ratio'),
-                sortino_ratio=results.get('sortino_ratio'),
-                win_rate=results.get('win_rate'),
-                max_drawdown=results.get('max_drawdown'),
-                volatility=results.get('volatility'),
-                total_trades=results.get('total_trades', 0),
-                winning_trades=results.get('winning_trades', 0),
-                losing_trades=results.get('losing_trades', 0),
-                avg_trade_return=results.get('avg_trade_return'),
-                avg_winning_trade=results.get('avg_winning_trade'),
-                avg_losing_trade=results.get('avg_losing_trade'),
-                value_at_risk_95=results.get('value_at_risk_95'),
-                calmar_ratio=results.get('calmar_ratio'),
-                benchmark_return=results.get('benchmark_return'),
-                alpha=results.get('alpha'),
-                beta=results.get('beta'),
-                backtest_start_date=results.get('backtest_start_date'),
-                backtest_end_date=results.get('backtest_end_date')
-            )
-            
-            # Create individual trade logs
-            trade_log = results.get('trade_log', [])
-            for trade in trade_log:
-                TradeLog.objects.create(
-                    backtest_result=backtest_result,
-                    security=trade['security'],
-                    trade_type=trade['type'],
-                    date=trade['date'],
-                    price=trade['price'],
-                    quantity=trade['quantity'],
-                    commission=trade['commission'],
-                    signal_value=trade.get('signal_value'),
-                    notes=f"Auto-generated from mean reversion strategy"
-                )
-            
-            logger.info(f"Backtest completed successfully for strategy {instance.name}")
-            
-        except Exception as e:
-            logger.error(f"Error running backtest for strategy {instance.name}: {str(e)}")
-            # Create a minimal result to indicate failure
-            BacktestResult.objects.create(
-                strategy=instance,
-                total_trades=0
-            )
\ No newline at end of file
+        from .services.job_queue import enqueue_backtest
+        
+        # Wait for the surrounding transaction so workers see the strategy's tickers
+        transaction.on_commit(lambda: enqueue_backtest(instance))
@@ -3,15 +3,52 @@ Advanced Backtesting Engine for AlgoAnchor
 Provides comprehensive backtesting capabilities with detailed performance metrics.
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 import logging
 
+from django.conf import settings
+
+from core.services.batch_plan import get_backtest_plan
+from core.services.price_store import get_price_histories
+from core.services.bootstrap import backtest_confidence_intervals
+from core.services.indicator_cache import data_version, rolling_indicators
+from core.services.leg_cache import cached, content_key, load_entries, store_entries
+from core.services.metrics import PerformanceAccumulator
+from core.services.pairs import RollingRegression, all_pairs, pair_returns
+from core.services.portfolio import PricePanel, aggregate_returns, portfolio_weights
+from core.services.position_engine import (
+    mean_reversion_signals, mean_reversion_positions, momentum_scores, momentum_positions
+)
+from core.services.rolling import RollingWindowStats
+
 logger = logging.getLogger(__name__)
 
+# Bump when the persisted engine state changes meaning; older states are rerun in full
+ENGINE_STATE_VERSION = 2
+
+# Bump whenever engine outputs change; cached legs and intervals of other versions are never read
+ENGINE_VERSION = 1
+
+# Per-symbol columns of a mean reversion leg, as written into the symbol's frame
+LEG_COLUMNS = ('Rolling_Mean', 'Rolling_Std', 'Z_Score', 'Signal', 'Position', 'Strategy_Returns')
+
+# Shortest lookback a parameter sweep accepts
+MIN_SWEEP_LOOKBACK = 2
+
+# Metrics sweeps and walk-forward runs can rank combinations by (descending)
+RANK_METRICS = (
+    'sharpe_ratio', 'sortino_ratio', 'calmar_ratio', 'cumulative_return', 'annualized_return',
+    'alpha', 'max_drawdown', 'win_rate', 'avg_trade_return',
+)
+
+
+def _json_floats(values) -> List[Optional[float]]:
+    """Floats as a JSON-safe list (NaN becomes None)"""
+    return [None if np.isnan(value) else float(value) for value in values]
+
 
 class BacktestEngine:
     """
@@ -19,38 +56,39 @@ class BacktestEngine:
     comprehensive performance metrics and trade logging.
     """
     
-    def __init__(self, strategy, commission_rate=0.001):
+    def __init__(self, strategy, commission_rate=0.001, weighting='equal'):
         self.strategy = strategy
         self.commission_rate = commission_rate
+        # 'equal', 'inverse_volatility' or a dict of custom weights by symbol
+        self.weighting = weighting
         self.data = {}
+        # Prepared frames of every pair, by "Y/X", after a pairs trading run
+        self.pair_frames = {}
         self.results = {}
         self.trade_log = []
         
     def fetch_data(self, start_date: datetime, end_date: datetime) -> bool:
         """Fetch historical data for all strategy tickers"""
         try:
-            tickers = self.strategy.tickers.all()
+            tickers = list(self.strategy.tickers.all())
             self.data = {}
             
+            # Sliced from the batch plan's frames when a batch run loaded them;
+            # otherwise served from the local PriceData store, with missing
+            # ranges downloaded for all tickers in one batched request
+            plan = get_backtest_plan()
+            histories = plan.histories(tickers, start_date, end_date) if plan else None
+            if histories is None:
+                histories = get_price_histories(tickers, start_date, end_date)
+            
             for security in tickers:
                 try:
-                    ticker_data = yf.download(
-                        security.symbol, 
-                        start=start_date, 
-                        end=end_date,
-                        progress=False,
-                        auto_adjust=True
-                    )
+                    ticker_data = histories.get(security.symbol)
                     
-                    if ticker_data.empty:
+                    if ticker_data is None or ticker_data.empty:
                         logger.warning(f"No data found for {security.symbol}")
                         continue
                     
-                    # Handle MultiIndex columns (yfinance returns this for single tickers too)
-                    if hasattr(ticker_data.columns, 'levels'):
-                        # MultiIndex columns - flatten them
-                        ticker_data.columns = ticker_data.columns.droplevel(1)
-                    
                     # Clean and prepare data
                     ticker_data = ticker_data.dropna()
                     
@@ -77,131 +115,419 @@ class BacktestEngine:
             return False
     
     def run_mean_reversion_strategy(self) -> Dict:
-        """Execute mean reversion strategy backtest"""
-        if not self.data:
+        """
+        Execute mean reversion strategy backtest.
+        
+        All tickers are aligned on one trading calendar and their z-scores,
+        signals, positions and returns computed column-wise in a single pass;
+        the per-symbol returns are then combined into one portfolio return
+        series using the engine's weighting.
+        """
+        lookback = self.strategy.lookback_days
+        panel = self.build_panel(lookback)
+        if panel is None:
             return {}
-            
+        
+        legs = self.mean_reversion_legs(panel, lookback)
+        columns = {
+            name: np.column_stack([legs[symbol][name] for symbol in panel.symbols])
+            for name in LEG_COLUMNS
+        }
+        positions = columns['Position']
+        strategy_returns = columns['Strategy_Returns']
+        
         all_trades = []
-        portfolio_value = []
-        benchmark_returns = []
+        for column, symbol in enumerate(panel.symbols):
+            data = self.data[symbol]
+            rows = panel.rows[symbol]
+            
+            # Per-symbol frames keep the prepared columns for the strategy charts
+            for name, values in columns.items():
+                data[name] = values[rows, column]
+            
+            security = data['Security'].iloc[0]
+            all_trades.extend({**trade, 'security': security} for trade in legs[symbol]['trades'])
         
-        # Get strategy parameters
-        lookback = self.strategy.lookback_days
+        weights = portfolio_weights(panel, self.weighting, lookback)
+        portfolio_returns = aggregate_returns(strategy_returns, weights, panel.active)
+        benchmark_returns = aggregate_returns(panel.returns, weights, panel.active)
+        
+        # Calculate comprehensive metrics
+        accumulator = PerformanceAccumulator()
+        results = self._calculate_performance_metrics(
+            portfolio_returns, benchmark_returns, all_trades, accumulator
+        )
+        if results:
+            results['daily_series'] = {
+                'dates': panel.dates.values.astype('datetime64[D]'),
+                'strategy_returns': portfolio_returns,
+                'benchmark_returns': benchmark_returns,
+            }
+            results['engine_state'] = self.terminal_state(
+                panel, positions, accumulator, lookback
+            )
+        return results
+    
+    def mean_reversion_legs(self, panel: PricePanel, lookback: int) -> Dict[str, Dict]:
+        """
+        Per-symbol legs of the mean reversion strategy: indicator, signal,
+        position and return columns on the panel calendar, plus the symbol's
+        trades (without their Security).
+        
+        A leg only depends on its own column of the panel, so legs are cached
+        under a hash of the symbol, the strategy parameters, the column's data
+        version and ``ENGINE_VERSION``; only legs missing from the cache are
+        computed, together in one column-wise pass.
+        """
         entry_threshold = self.strategy.entry_threshold
-        # Use a default exit threshold since it's not in the model
         exit_threshold = entry_threshold * 0.5  # Exit at half the entry threshold
         
-        for symbol, data in self.data.items():
-            if len(data) < lookback + 1:
+        keys = {
+            symbol: content_key(
+                'leg', ENGINE_VERSION, 'mean_reversion', symbol, lookback, entry_threshold,
+                self.strategy.exit_rule, self.commission_rate,
+                data_version(panel.dates, panel.closes[:, column])
+            )
+            for column, symbol in enumerate(panel.symbols)
+        }
+        found = load_entries(keys.values())
+        legs = {symbol: found[key] for symbol, key in keys.items() if key in found}
+        missing = [column for column, symbol in enumerate(panel.symbols) if symbol not in legs]
+        if not missing:
+            return legs
+        
+        symbols = [panel.symbols[column] for column in missing]
+        # Shared with other strategies over the same bars through the indicator cache
+        indicators = rolling_indicators(symbols, panel.dates, panel.closes[:, missing], lookback)
+        z_scores = indicators['z_score']
+        signals = mean_reversion_signals(z_scores, entry_threshold, exit_threshold)
+        positions = mean_reversion_positions(signals)
+        strategy_returns = np.full(positions.shape, np.nan)
+        strategy_returns[1:] = panel.returns[1:, missing] * positions[:-1]
+        
+        computed = {}
+        for index, (column, symbol) in enumerate(zip(missing, symbols)):
+            rows = panel.rows[symbol]
+            legs[symbol] = {
+                'Rolling_Mean': indicators['mean'][:, index],
+                'Rolling_Std': indicators['std'][:, index],
+                'Z_Score': z_scores[:, index],
+                'Signal': signals[:, index],
+                'Position': positions[:, index],
+                'Strategy_Returns': strategy_returns[:, index],
+                'trades': self._trades_from_arrays(
+                    symbol, None, panel.dates[rows], panel.closes[rows, column],
+                    positions[rows, index], z_scores[rows, index]
+                ),
+            }
+            computed[keys[symbol]] = legs[symbol]
+        store_entries(computed)
+        return legs
+    
+    def terminal_state(self, panel: PricePanel, positions: np.ndarray,
+                       accumulator: PerformanceAccumulator, lookback: int) -> Dict:
+        """
+        JSON-serializable state at the end of a run: the trailing closes that
+        every rolling window of the next bar depends on, the positions held,
+        and the running metric accumulators.
+        """
+        tail = panel.closes[-(lookback + 1):]
+        return {
+            'version': ENGINE_STATE_VERSION,
+            'lookback': lookback,
+            'entry_threshold': self.strategy.entry_threshold,
+            'weighting': self.weighting,
+            'tickers': sorted(security.symbol for security in self.strategy.tickers.all()),
+            'symbols': panel.symbols,
+            'dates': [day.isoformat() for day in panel.dates[-len(tail):].date],
+            'closes': [_json_floats(row) for row in tail],
+            'positions': positions[-1].tolist(),
+            'metrics': accumulator.to_dict(),
+        }
+    
+    def advance(self, state: Dict, previous_trades: List[Dict]) -> Dict:
+        """
+        Continue a backtest from its terminal ``state`` over the bars in
+        ``self.data`` dated after the state's last bar.
+        
+        Only the stored trailing window and the new bars are processed. The
+        returned metrics cover the whole history (``previous_trades`` is the
+        trade log of the earlier runs), while ``trade_log`` and
+        ``daily_series`` hold just the new rows. Returns {} when there are no
+        new bars.
+        """
+        lookback = state['lookback']
+        entry_threshold = state['entry_threshold']
+        exit_threshold = entry_threshold * 0.5
+        tail_dates = pd.DatetimeIndex(state['dates'])
+        tail = np.array(state['closes'], dtype=np.float64)
+        last_date = tail_dates[-1]
+        
+        frames = {}
+        for column, symbol in enumerate(state['symbols']):
+            kept = ~np.isnan(tail[:, column])
+            frame = pd.DataFrame({'Close': tail[kept, column]}, index=tail_dates[kept])
+            new_bars = self.data.get(symbol)
+            if new_bars is not None:
+                frame = pd.concat([frame, new_bars.loc[new_bars.index > last_date, ['Close']]])
+            frames[symbol] = frame
+        
+        panel = PricePanel(frames)
+        first_new = int(np.searchsorted(panel.dates, last_date, side='right'))
+        if first_new >= len(panel):
+            return {}
+        
+        z_scores = RollingWindowStats(panel.closes).z_score(lookback)
+        signals = mean_reversion_signals(z_scores[first_new:], entry_threshold, exit_threshold)
+        
+        # The held positions continue into the new bars exactly as in a full run
+        carried = np.array(state['positions'], dtype=np.int64)
+        positions = np.zeros(panel.closes.shape, dtype=np.int64)
+        positions[first_new - 1:] = mean_reversion_positions(np.vstack([carried, signals]))
+        
+        new_trades = []
+        for column, symbol in enumerate(panel.symbols):
+            data = self.data.get(symbol)
+            if data is None:
                 continue
-                
-            # Calculate mean reversion signals
-            data = self._calculate_mean_reversion_signals(
-                data, lookback, entry_threshold, exit_threshold
+            rows = panel.rows[symbol]
+            rows = rows[rows >= first_new - 1]
+            trades = self._trades_from_arrays(
+                symbol, data['Security'].iloc[0], panel.dates[rows],
+                panel.closes[rows, column], positions[rows, column], z_scores[rows, column]
+            )
+            new_trades.extend(trade for trade in trades if trade['date'] > last_date.date())
+        
+        weights = portfolio_weights(panel, state['weighting'], lookback)
+        portfolio_returns = aggregate_returns(
+            panel.strategy_returns(positions), weights, panel.active
+        )[first_new:]
+        benchmark_returns = aggregate_returns(panel.returns, weights, panel.active)[first_new:]
+        
+        # Same order as a full run: grouped by symbol, then by date
+        order = {symbol: index for index, symbol in enumerate(panel.symbols)}
+        all_trades = sorted(
+            list(previous_trades) + new_trades,
+            key=lambda trade: (order.get(trade['symbol'], len(order)), trade['date'])
+        )
+        
+        accumulator = PerformanceAccumulator.from_dict(state['metrics'])
+        results = self._calculate_performance_metrics(
+            portfolio_returns, benchmark_returns, all_trades, accumulator
+        )
+        results.update({
+            'trade_log': new_trades,
+            'new_bars': len(panel) - first_new,
+            'daily_series': {
+                'dates': panel.dates[first_new:].values.astype('datetime64[D]'),
+                'strategy_returns': portfolio_returns,
+                'benchmark_returns': benchmark_returns,
+            },
+            'engine_state': {
+                **state,
+                'dates': [day.isoformat() for day in panel.dates[-(lookback + 1):].date],
+                'closes': [_json_floats(row) for row in panel.closes[-(lookback + 1):]],
+                'positions': positions[-1].tolist(),
+                'metrics': accumulator.to_dict(),
+            },
+        })
+        return results
+    
+    def build_panel(self, lookback: int) -> Optional[PricePanel]:
+        """Date-aligned close matrix of the loaded tickers with enough bars for ``lookback``"""
+        frames = {
+            symbol: data for symbol, data in self.data.items()
+            if len(data) >= lookback + 1
+        }
+        return PricePanel(frames) if frames else None
+    
+    def run_parameter_sweep(self, grid: List[Tuple[int, float]],
+                            rank_by: str = 'sharpe_ratio') -> List[Dict]:
+        """
+        Evaluate a grid of (lookback, entry_threshold) pairs against the loaded data.
+        
+        Rolling statistics for every window come from one set of cumulative sums
+        over the date-aligned close matrix, and z-scores are shared by all
+        thresholds using the same window. Returns one metrics row per pair,
+        ranked by ``rank_by`` (descending, one of RANK_METRICS; anything else
+        raises ValueError).
+        """
+        if rank_by not in RANK_METRICS:
+            raise ValueError(f"Unknown ranking metric '{rank_by}' (choose from {', '.join(RANK_METRICS)})")
+        if not self.data or not grid:
+            return []
+        
+        panels = {}
+        z_scores = {}
+        rows = []
+        
+        for lookback, entry_threshold in grid:
+            exit_threshold = entry_threshold * 0.5
+            
+            # The tickers taking part depend on the window length
+            if lookback not in z_scores:
+                panel = self.build_panel(lookback)
+                z_scores[lookback] = (
+                    RollingWindowStats(panel.closes).z_score(lookback) if panel else None
+                )
+                panels[lookback] = panel
+            panel, z = panels[lookback], z_scores[lookback]
+            if panel is None:
+                continue
+            
+            positions = mean_reversion_positions(
+                mean_reversion_signals(z, entry_threshold, exit_threshold)
             )
+            all_trades = []
+            for column, symbol in enumerate(panel.symbols):
+                data = self.data[symbol]
+                symbol_rows = panel.rows[symbol]
+                all_trades.extend(self._trades_from_arrays(
+                    symbol, data['Security'].iloc[0], data.index,
+                    data['Close'].to_numpy(), positions[symbol_rows, column], z[symbol_rows, column]
+                ))
             
-            # Execute trades
-            trades = self._execute_trades(data, symbol)
-            all_trades.extend(trades)
+            # Same accounting as run_mean_reversion_strategy
+            weights = portfolio_weights(panel, self.weighting, lookback)
+            metrics = self._calculate_performance_metrics(
+                aggregate_returns(panel.strategy_returns(positions), weights, panel.active),
+                aggregate_returns(panel.returns, weights, panel.active),
+                all_trades
+            )
+            if not metrics:
+                continue
             
-            # Track portfolio performance
-            data['Strategy_Returns'] = data['Returns'] * data['Position'].shift(1)
-            portfolio_value.extend(data['Strategy_Returns'].fillna(0).tolist())
-            benchmark_returns.extend(data['Returns'].fillna(0).tolist())
+            metrics.pop('trade_log', None)
+            rows.append({
+                'lookback_days': lookback,
+                'entry_threshold': entry_threshold,
+                **metrics
+            })
         
-        # Calculate comprehensive metrics
-        return self._calculate_performance_metrics(
-            portfolio_value, benchmark_returns, all_trades
+        def rank_key(row):
+            value = row.get(rank_by)
+            return value if value is not None and np.isfinite(value) else -np.inf
+        
+        rows.sort(key=rank_key, reverse=True)
+        for rank, row in enumerate(rows, 1):
+            row['rank'] = rank
+        
+        return rows
+    
+    def prepare_signals(self, data: pd.DataFrame, symbol: str = '') -> pd.DataFrame:
+        """
+        Add the strategy's indicator, signal, position and return columns to a
+        symbol's price frame (in place). Charts reuse these columns as-is.
+        """
+        entry_threshold = self.strategy.entry_threshold
+        # Use a default exit threshold since it's not in the model
+        exit_threshold = entry_threshold * 0.5  # Exit at half the entry threshold
+        
+        if 'Returns' not in data.columns:
+            data['Returns'] = data['Close'].pct_change()
+        
+        data = self._calculate_mean_reversion_signals(
+            data, self.strategy.lookback_days, entry_threshold, exit_threshold, symbol
         )
+        data['Strategy_Returns'] = data['Returns'] * data['Position'].shift(1)
+        return data
     
     def _calculate_mean_reversion_signals(self, data: pd.DataFrame, lookback: int, 
-                                        entry_threshold: float, exit_threshold: float) -> pd.DataFrame:
+                                        entry_threshold: float, exit_threshold: float,
+                                        symbol: str = '') -> pd.DataFrame:
         """Calculate mean reversion trading signals"""
-        # Rolling statistics
-        data['Rolling_Mean'] = data['Close'].rolling(window=lookback).mean()
-        data['Rolling_Std'] = data['Close'].rolling(window=lookback).std()
-        data['Z_Score'] = (data['Close'] - data['Rolling_Mean']) / data['Rolling_Std']
+        # Rolling statistics, reused from the indicator cache when the engine
+        # already computed them for the same bars
+        indicators = rolling_indicators([symbol], data.index, data['Close'].to_numpy(), lookback)
+        data['Rolling_Mean'] = indicators['mean']
+        data['Rolling_Std'] = indicators['std']
+        data['Z_Score'] = indicators['z_score']
         
-        # Generate signals
-        data['Signal'] = 0
-        data.loc[data['Z_Score'] < -entry_threshold, 'Signal'] = 1  # Buy signal
-        data.loc[data['Z_Score'] > entry_threshold, 'Signal'] = -1  # Sell signal
-        data.loc[data['Z_Score'].abs() < exit_threshold, 'Signal'] = 0  # Exit signal
+        # Generate signals (buy below -entry, sell above +entry, exit inside the exit band)
+        data['Signal'] = mean_reversion_signals(
+            data['Z_Score'].to_numpy(), entry_threshold, exit_threshold
+        )
         
         # Generate positions
-        data['Position'] = 0
-        position = 0
-        
-        for i in range(len(data)):
-            if data.iloc[i]['Signal'] == 1 and position == 0:
-                position = 1
-            elif data.iloc[i]['Signal'] == -1 and position == 0:
-                position = -1
-            elif data.iloc[i]['Signal'] == 0:
-                position = 0
-            
-            data.iloc[i, data.columns.get_loc('Position')] = position
+        data['Position'] = mean_reversion_positions(data['Signal'].to_numpy())
         
         return data
     
     def _execute_trades(self, data: pd.DataFrame, symbol: str) -> List[Dict]:
         """Execute trades based on position changes"""
-        trades = []
-        position_changes = data[data['Position'].diff() != 0].copy()
+        security = data['Security'].iloc[0] if 'Security' in data.columns and len(data) else None
+        return self._trades_from_arrays(
+            symbol,
+            security,
+            data.index,
+            data['Close'].to_numpy(),
+            data['Position'].to_numpy(),
+            data['Z_Score'].to_numpy()
+        )
+    
+    def _trades_from_arrays(self, symbol: str, security, dates, closes: np.ndarray,
+                            positions: np.ndarray, z_scores: np.ndarray) -> List[Dict]:
+        """Build the trade log for one symbol from position, price and z-score arrays"""
+        positions = np.asarray(positions, dtype=np.float64)
+        if len(positions) == 0:
+            return []
         
-        for idx, row in position_changes.iterrows():
-            if pd.isna(row['Position']) or row['Position'] == 0:
-                continue
-                
-            trade_type = 'BUY' if row['Position'] > 0 else 'SELL'
-            price = row['Close']
-            commission = price * self.commission_rate
-            
-            trade = {
+        # Entries and reversals: bars where a non-zero position differs from the previous bar
+        changed = np.empty(len(positions), dtype=bool)
+        changed[0] = True
+        changed[1:] = positions[1:] != positions[:-1]
+        entry_rows = np.flatnonzero(changed & (positions != 0) & ~np.isnan(positions))
+        
+        trade_dates = dates[entry_rows]
+        if isinstance(trade_dates, pd.DatetimeIndex):
+            trade_dates = trade_dates.date
+        
+        trades = []
+        for row, trade_date in zip(entry_rows, trade_dates):
+            price = closes[row]
+            trades.append({
                 'symbol': symbol,
-                'date': idx.date() if hasattr(idx, 'date') else idx,
-                'type': trade_type,
+                'date': trade_date,
+                'type': 'BUY' if positions[row] > 0 else 'SELL',
                 'price': price,
                 'quantity': 100,  # Standard lot size
-                'commission': commission,
-                'signal_value': row['Z_Score'],
-                'security': row['Security']
-            }
-            
-            trades.append(trade)
+                'commission': price * self.commission_rate,
+                'signal_value': z_scores[row],
+                'security': security
+            })
         
         return trades
     
-    def _calculate_performance_metrics(self, portfolio_returns: List[float], 
-                                     benchmark_returns: List[float], 
-                                     trades: List[Dict]) -> Dict:
-        """Calculate comprehensive performance metrics"""
-        if not portfolio_returns:
-            return {}
-            
-        portfolio_returns = np.array(portfolio_returns)
-        benchmark_returns = np.array(benchmark_returns)
+    def _calculate_performance_metrics(self, portfolio_returns, benchmark_returns,
+                                       trades: List[Dict],
+                                       accumulator: Optional[PerformanceAccumulator] = None) -> Dict:
+        """
+        Calculate comprehensive performance metrics.
         
-        # Basic returns
-        cumulative_return = np.prod(1 + portfolio_returns) - 1
-        annualized_return = (1 + cumulative_return) ** (252 / len(portfolio_returns)) - 1
-        
-        # Risk metrics
-        volatility = np.std(portfolio_returns) * np.sqrt(252)
-        sharpe_ratio = (np.mean(portfolio_returns) * 252) / volatility if volatility > 0 else 0
-        
-        # Downside deviation and Sortino ratio
-        downside_returns = portfolio_returns[portfolio_returns < 0]
-        downside_deviation = np.std(downside_returns) * np.sqrt(252) if len(downside_returns) > 0 else 0
-        sortino_ratio = (np.mean(portfolio_returns) * 252) / downside_deviation if downside_deviation > 0 else 0
+        Returns are streamed through a constant-memory ``PerformanceAccumulator``
+        in chunks; pass one in to continue an earlier history (it is updated
+        in place) or to keep it for later runs.
+        """
+        if accumulator is None:
+            accumulator = PerformanceAccumulator()
+        accumulator.update_chunked(
+            np.asarray(portfolio_returns, dtype=np.float64),
+            np.asarray(benchmark_returns, dtype=np.float64)
+        )
         
-        # Drawdown analysis
-        cumulative_returns = np.cumprod(1 + portfolio_returns)
-        running_max = np.maximum.accumulate(cumulative_returns)
-        drawdown = (cumulative_returns - running_max) / running_max
-        max_drawdown = np.min(drawdown)
+        metrics = accumulator.metrics()
+        if not metrics:
+            return {}
         
-        # Trade analysis
+        return {
+            **metrics,
+            'total_trades': len(trades),
+            'trade_log': trades,
+            **self._trade_statistics(trades),
+        }
+    
+    def _trade_statistics(self, trades: List[Dict]) -> Dict:
+        """Win/loss statistics of the trade log"""
         trade_returns = []
         if trades:
             for i in range(0, len(trades) - 1, 2):  # Assuming pairs of entry/exit
@@ -213,83 +539,327 @@ class BacktestEngine:
         
         winning_trades = len([r for r in trade_returns if r > 0])
         losing_trades = len([r for r in trade_returns if r <= 0])
-        win_rate = winning_trades / len(trade_returns) if trade_returns else 0
-        
-        avg_winning_trade = np.mean([r for r in trade_returns if r > 0]) if winning_trades > 0 else 0
-        avg_losing_trade = np.mean([r for r in trade_returns if r <= 0]) if losing_trades > 0 else 0
-        avg_trade_return = np.mean(trade_returns) if trade_returns else 0
-        
-        # Risk metrics
-        var_95 = np.percentile(portfolio_returns, 5) if len(portfolio_returns) > 0 else 0
-        calmar_ratio = annualized_return / abs(max_drawdown) if max_drawdown != 0 else 0
-        
-        # Benchmark comparison
-        benchmark_cumulative = np.prod(1 + benchmark_returns) - 1
-        alpha = cumulative_return - benchmark_cumulative
-        
-        # Beta calculation (correlation with benchmark)
-        if len(portfolio_returns) > 1 and len(benchmark_returns) > 1:
-            covariance = np.cov(portfolio_returns, benchmark_returns)[0, 1]
-            benchmark_variance = np.var(benchmark_returns)
-            beta = covariance / benchmark_variance if benchmark_variance > 0 else 1
-        else:
-            beta = 1
         
         return {
-            'cumulative_return': cumulative_return,
-            'annualized_return': annualized_return,
-            'sharpe_ratio': sharpe_ratio,
-            'sortino_ratio': sortino_ratio,
-            'win_rate': win_rate,
-            'max_drawdown': max_drawdown,
-            'volatility': volatility,
-            'total_trades': len(trades),
+            'win_rate': winning_trades / len(trade_returns) if trade_returns else 0,
             'winning_trades': winning_trades,
             'losing_trades': losing_trades,
-            'avg_trade_return': avg_trade_return,
-            'avg_winning_trade': avg_winning_trade,
-            'avg_losing_trade': avg_losing_trade,
-            'value_at_risk_95': var_95,
-            'calmar_ratio': calmar_ratio,
-            'benchmark_return': benchmark_cumulative,
-            'alpha': alpha,
-            'beta': beta,
-            'trade_log': trades
+            'avg_trade_return': np.mean(trade_returns) if trade_returns else 0,
+            'avg_winning_trade': np.mean([r for r in trade_returns if r > 0]) if winning_trades > 0 else 0,
+            'avg_losing_trade': np.mean([r for r in trade_returns if r <= 0]) if losing_trades > 0 else 0,
         }
     
     def run_momentum_strategy(self) -> Dict:
-        """Execute momentum strategy backtest"""
-        # Placeholder for momentum strategy
-        # Can be implemented based on specific momentum rules
-        return {}
+        """
+        Execute momentum strategy backtest.
+        
+        Volatility-scaled lookback returns (skipping the most recent
+        ``skip_days``) are scored for every ticker on one trading calendar and
+        positions rebalanced every ``holding_days``: each ticker on its own
+        against the entry threshold (time-series momentum), or the ``top_n``
+        strongest tickers held long (cross-sectional momentum). In the
+        cross-sectional case the portfolio return is spread over the held
+        tickers only.
+        """
+        lookback = self.strategy.lookback_days
+        skip = self.strategy.skip_days
+        top_n = self.strategy.top_n
+        panel = self.build_panel(lookback + skip)
+        if panel is None:
+            return {}
+        
+        scores = momentum_scores(panel.closes, lookback, skip)
+        positions = momentum_positions(
+            scores, self.strategy.entry_threshold, self.strategy.holding_days, top_n
+        )
+        strategy_returns = panel.strategy_returns(positions)
+        columns = {
+            'Momentum_Score': scores,
+            # 1 for the strongest score of each date
+            'Momentum_Rank': pd.DataFrame(scores).rank(axis=1, ascending=False, method='first').to_numpy(),
+            # +1 where a position is bought, -1 where one is sold
+            'Signal': np.sign(np.diff(positions, axis=0, prepend=0)),
+            'Position': positions,
+            'Strategy_Returns': strategy_returns,
+        }
+        
+        all_trades = []
+        for column, symbol in enumerate(panel.symbols):
+            rows = panel.rows[symbol]
+            
+            # Per-symbol frames keep the prepared columns for the strategy charts
+            data = self.data[symbol]
+            for name, values in columns.items():
+                data[name] = values[rows, column]
+            
+            all_trades.extend(self._trades_from_arrays(
+                symbol,
+                self.data[symbol]['Security'].iloc[0],
+                panel.dates[rows],
+                panel.closes[rows, column],
+                positions[rows, column],
+                scores[rows, column]
+            ))
+        
+        weights = portfolio_weights(panel, self.weighting, lookback)
+        held = panel.active
+        if top_n:
+            held = held.copy()
+            held[1:] &= positions[:-1] != 0
+            held[0] = False
+        portfolio_returns = aggregate_returns(strategy_returns, weights, held)
+        benchmark_returns = aggregate_returns(panel.returns, weights, panel.active)
+        
+        results = self._calculate_performance_metrics(portfolio_returns, benchmark_returns, all_trades)
+        if results:
+            results['daily_series'] = {
+                'dates': panel.dates.values.astype('datetime64[D]'),
+                'strategy_returns': portfolio_returns,
+                'benchmark_returns': benchmark_returns,
+            }
+        return results
+    
+    def chart_frames(self) -> Dict[str, pd.DataFrame]:
+        """Frames prepared by the last run for the strategy charts, by symbol (or "Y/X" pair)"""
+        if self.pair_frames:
+            return self.pair_frames
+        return {symbol: data for symbol, data in self.data.items() if 'Position' in data.columns}
+    
+    def run_strategy(self) -> Dict:
+        """Run the engine matching the strategy's type"""
+        strategy_type = getattr(self.strategy, 'strategy_type', 'mean_reversion')
+        if strategy_type == 'momentum':
+            return self.run_momentum_strategy()
+        if strategy_type == 'pairs':
+            return self.run_pairs_trading_strategy()
+        return self.run_mean_reversion_strategy()
     
     def run_pairs_trading_strategy(self) -> Dict:
-        """Execute pairs trading strategy backtest"""
-        # Placeholder for pairs trading strategy
-        # Can be implemented for multi-ticker strategies
-        return {}
+        """
+        Execute pairs trading strategy backtest.
+        
+        Every pair of the strategy's tickers is traded on the spread of their
+        log prices: the rolling hedge ratio and spread z-score come from one
+        cumulative-sum regression over all pairs, and the spread is entered
+        and exited with the mean reversion rules (long the first ticker and
+        short the hedge ratio of the second below ``-entry_threshold``, the
+        reverse above it). Pairs are weighted equally in the portfolio; the
+        benchmark holds the tickers with the engine's weighting.
+        """
+        lookback = self.strategy.lookback_days
+        panel = self.build_panel(lookback)
+        if panel is None or len(panel.symbols) < 2:
+            logger.warning(f"Pairs trading needs at least two tickers with {lookback + 1} bars")
+            return {}
+        
+        entry_threshold = self.strategy.entry_threshold
+        y, x = all_pairs(len(panel.symbols))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_closes = np.log(panel.closes)
+        hedge_ratios, z_scores = RollingRegression(log_closes[:, x], log_closes[:, y]).regression(lookback)
+        signals = mean_reversion_signals(z_scores, entry_threshold, entry_threshold * 0.5)
+        positions = mean_reversion_positions(signals)
+        returns = pair_returns(panel.returns[:, y], panel.returns[:, x], hedge_ratios, positions)
+        
+        all_trades = []
+        self.pair_frames = {}
+        for pair, (y_column, x_column) in enumerate(zip(y, x)):
+            both = ~np.isnan(panel.closes[:, y_column]) & ~np.isnan(panel.closes[:, x_column])
+            
+            # The first ticker's prices with the pair's spread columns, for the strategy charts
+            y_symbol, x_symbol = panel.symbols[y_column], panel.symbols[x_column]
+            frame = self.data[y_symbol].reindex(panel.dates[both])
+            frame['Hedge_Ratio'] = hedge_ratios[both, pair]
+            frame['Spread_Z'] = z_scores[both, pair]
+            frame['Signal'] = signals[both, pair]
+            frame['Position'] = positions[both, pair]
+            frame['Strategy_Returns'] = returns[both, pair]
+            self.pair_frames[f"{y_symbol}/{x_symbol}"] = frame
+            
+            for column, direction in ((y_column, 1), (x_column, -1)):
+                symbol = panel.symbols[column]
+                all_trades.extend(self._trades_from_arrays(
+                    symbol,
+                    self.data[symbol]['Security'].iloc[0],
+                    panel.dates[both],
+                    panel.closes[both, column],
+                    direction * positions[both, pair],
+                    z_scores[both, pair]
+                ))
+        
+        active = ~np.isnan(returns)
+        portfolio_returns = aggregate_returns(returns, np.ones(returns.shape), active)
+        weights = portfolio_weights(panel, self.weighting, lookback)
+        benchmark_returns = aggregate_returns(panel.returns, weights, panel.active)
+        
+        results = self._calculate_performance_metrics(portfolio_returns, benchmark_returns, all_trades)
+        if results:
+            results['daily_series'] = {
+                'dates': panel.dates.values.astype('datetime64[D]'),
+                'strategy_returns': portfolio_returns,
+                'benchmark_returns': benchmark_returns,
+            }
+        return results
+
+
+def backtest_period(strategy, end_date: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """Date range a strategy is backtested (and charted) over"""
+    end_date = end_date or datetime.now()
+    start_date = end_date - timedelta(days=strategy.lookback_days * 10)  # Extended period for analysis
+    return start_date, end_date
 
 
-def run_comprehensive_backtest(strategy) -> Dict:
+def run_comprehensive_backtest(strategy, progress_callback=None, weighting='equal') -> Dict:
     """
     Main function to run comprehensive backtest for a strategy
+    
+    ``progress_callback(stage, fraction, **counts)`` is called as the backtest
+    moves through its stages, e.g. to update a queued BacktestJob; ``counts``
+    holds ``symbols_done``/``symbols_total`` once the tickers are known. ``weighting``
+    combines multi-ticker returns (see ``portfolio_weights``).
     """
-    engine = BacktestEngine(strategy)
+    def report(stage, fraction, **counts):
+        if progress_callback:
+            progress_callback(stage, fraction, **counts)
+    
+    from core.services.chart_data import prepare_chart_frames
+    
+    engine = BacktestEngine(strategy, weighting=weighting)
     
     # Calculate backtest period
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=strategy.lookback_days * 10)  # Extended period for analysis
+    start_date, end_date = backtest_period(strategy)
     
     # Fetch data
+    symbols_total = strategy.tickers.count()
+    report('fetching_data', 0.1, symbols_done=0, symbols_total=symbols_total)
     if not engine.fetch_data(start_date, end_date):
         logger.error(f"Failed to fetch data for strategy {strategy.name}")
         return {}
     
-    # Run mean reversion strategy (default for current model)
-    results = engine.run_mean_reversion_strategy()
+    # Run the engine for the strategy's type
+    report('running_strategy', 0.5, symbols_done=len(engine.data), symbols_total=symbols_total)
+    results = engine.run_strategy()
+    
+    # Stored with the result, so the strategy charts never rerun the engine
+    if results:
+        results['chart_frames'] = prepare_chart_frames(engine.chart_frames())
+    
+    # How robust the headline metrics are to resampling the daily returns
+    if results:
+        report('bootstrapping', 0.8)
+        daily_series = results.get('daily_series')
+        results['confidence_intervals'] = cached(
+            content_key(
+                'bootstrap', ENGINE_VERSION,
+                getattr(settings, 'BOOTSTRAP_RESAMPLES', 5000), getattr(settings, 'BOOTSTRAP_SEED', None),
+                *((daily_series['dates'], daily_series['strategy_returns']) if daily_series else ())
+            ),
+            lambda: backtest_confidence_intervals(daily_series)
+        )
     
     # Add metadata
     results['backtest_start_date'] = start_date.date()
     results['backtest_end_date'] = end_date.date()
     
     return results
+
+
+def can_advance(backtest_result, strategy, weighting='equal') -> bool:
+    """
+    Whether a stored result can be advanced incrementally: it has an engine
+    state from this engine version, and the strategy's parameters, tickers
+    and the weighting are the ones that state was built with.
+    """
+    # Only mean reversion results carry an engine state
+    state = getattr(backtest_result, 'engine_state', None)
+    if strategy.strategy_type != 'mean_reversion' or not state or state.get('version') != ENGINE_STATE_VERSION:
+        return False
+    
+    tickers = sorted(security.symbol for security in strategy.tickers.all())
+    return (
+        state['lookback'] == strategy.lookback_days
+        and state['entry_threshold'] == strategy.entry_threshold
+        and state['weighting'] == weighting
+        and state['tickers'] == tickers
+    )
+
+
+def run_incremental_backtest(strategy, end_date: Optional[datetime] = None,
+                             weighting='equal') -> Optional[Dict]:
+    """
+    Advance a strategy's stored backtest over the bars that arrived after it
+    ran, keeping its start date.
+    
+    Returns None when the result cannot be advanced (see ``can_advance``) and
+    a full backtest is needed. Otherwise returns results flagged with
+    ``incremental``: metrics for the whole period, plus only the new trades,
+    daily series rows and the new engine state (``new_bars`` is 0 when the
+    result is already up to date).
+    """
+    from core.models import BacktestResult, TradeLog
+    
+    backtest_result = BacktestResult.objects.filter(strategy=strategy).first()
+    if backtest_result is None or not can_advance(backtest_result, strategy, weighting):
+        return None
+    
+    state = backtest_result.engine_state
+    end_date = end_date or datetime.now()
+    last_bar = datetime.fromisoformat(state['dates'][-1])
+    results = {'incremental': True, 'new_bars': 0, 'backtest_end_date': end_date.date()}
+    
+    engine = BacktestEngine(strategy, weighting=weighting)
+    if not engine.fetch_data(last_bar + timedelta(days=1), end_date):
+        return results
+    
+    previous_trades = [
+        {'symbol': symbol, 'date': trade_date, 'price': price}
+        for symbol, trade_date, price in TradeLog.objects.filter(
+            backtest_result=backtest_result
+        ).order_by('id').values_list('security__symbol', 'date', 'price')
+    ]
+    advanced = engine.advance(state, previous_trades)
+    if advanced:
+        results.update(advanced)
+        logger.info(
+            f"Advanced backtest for {strategy.name} by {advanced['new_bars']} bars "
+            f"({len(advanced['trade_log'])} new trades)"
+        )
+    return results
+
+
+def build_sweep_grid(lookbacks: List[int], thresholds: List[float]) -> List[Tuple[int, float]]:
+    """
+    Cartesian product of lookback windows and entry thresholds. Raises
+    ValueError for lookbacks below MIN_SWEEP_LOOKBACK (a rolling std needs
+    two observations).
+    """
+    too_short = sorted({int(lookback) for lookback in lookbacks if int(lookback) < MIN_SWEEP_LOOKBACK})
+    if too_short:
+        raise ValueError(
+            f"Lookback windows must be at least {MIN_SWEEP_LOOKBACK} days (got {', '.join(map(str, too_short))})"
+        )
+    return [(int(lookback), float(threshold)) for lookback in lookbacks for threshold in thresholds]
+
+
+def run_parameter_sweep(strategy, grid: List[Tuple[int, float]],
+                        rank_by: str = 'sharpe_ratio') -> List[Dict]:
+    """
+    Run a (lookback, entry_threshold) parameter sweep for a strategy's tickers
+    with a single data load shared by every combination.
+    """
+    if rank_by not in RANK_METRICS:
+        raise ValueError(f"Unknown ranking metric '{rank_by}' (choose from {', '.join(RANK_METRICS)})")
+    if not grid:
+        return []
+    
+    engine = BacktestEngine(strategy)
+    
+    # Cover the longest lookback with the same extended period as a single backtest
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=max(lookback for lookback, _ in grid) * 10)
+    
+    if not engine.fetch_data(start_date, end_date):
+        logger.error(f"Failed to fetch data for parameter sweep of strategy {strategy.name}")
+        return []
+    
+    return engine.run_parameter_sweep(grid, rank_by=rank_by)
\ No newline at end of file
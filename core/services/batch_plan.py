@@ -0,0 +1,180 @@
+"""
+Batch Backtest Planning for AlgoAnchor
+Collects the price ranges a batch of strategies needs, syncs and loads every
+symbol once for the widest range any strategy needs it for, and serves each
+strategy's backtest with slices of those frames.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+import time
+
+import pandas as pd
+
+from core.services.price_store import get_price_histories, missing_ranges, sync_price_ranges
+
+logger = logging.getLogger(__name__)
+
+
+def _as_date(value) -> date:
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.date()
+    return value
+
+
+class BacktestPlan:
+    """
+    Price data plan for a batch of strategies.
+
+    ``ranges`` holds the widest ``[start, end)`` date range each symbol is
+    needed for. After ``load`` every symbol's frame is in memory once, and
+    ``histories`` answers a strategy's request with positional slices of it
+    (views under pandas copy-on-write, so nothing is copied until modified).
+    """
+
+    def __init__(self, strategies: Iterable, end_date: Optional[datetime] = None):
+        from core.services.backtest_engine import backtest_period
+
+        self.strategies = list(strategies)
+        self.end_date = end_date or datetime.now()
+        self.securities = {}
+        self.ranges: Dict[str, Tuple[date, date]] = {}
+        # (symbol, start, end) of every strategy's ticker, as the naive path would load them
+        self.requests = []
+        self.periods = []
+
+        for strategy in self.strategies:
+            start, end = backtest_period(strategy, self.end_date)
+            start, end = _as_date(start), _as_date(end)
+            self.periods.append((start, end))
+            for security in strategy.tickers.all():
+                symbol = security.symbol
+                self.securities[symbol] = security
+                self.requests.append((symbol, start, end))
+                if symbol in self.ranges:
+                    known_start, known_end = self.ranges[symbol]
+                    self.ranges[symbol] = (min(known_start, start), max(known_end, end))
+                else:
+                    self.ranges[symbol] = (start, end)
+
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self.inserted = 0
+        # Provider requests made by ``load``, and the ones expected before it ran
+        self.network_calls = 0
+        self.expected_network_calls = 0
+        self.expected_naive_network_calls = 0
+        self.seconds = 0.0
+
+    def estimate_network_calls(self) -> Tuple[int, int]:
+        """
+        Provider requests the plan is expected to need (one per distinct
+        missing range of each symbol's own range) and the naive path (one per
+        distinct missing range of each strategy's own tickers), from the
+        store's current coverage.
+        """
+        planned = {
+            missing for symbol, (start, end) in self.ranges.items()
+            for missing in missing_ranges(self.securities[symbol], start, end)
+        }
+
+        naive = 0
+        for strategy, (strategy_start, strategy_end) in zip(self.strategies, self.periods):
+            naive += len({
+                missing for security in strategy.tickers.all()
+                for missing in missing_ranges(self.securities[security.symbol], strategy_start, strategy_end)
+            })
+        return len(planned), naive
+
+    def load(self) -> 'BacktestPlan':
+        """Sync each symbol's missing bars in shared requests, then load every symbol once"""
+        start_time = time.perf_counter()
+        self.expected_network_calls, self.expected_naive_network_calls = self.estimate_network_calls()
+
+        # Each symbol only over the widest range a strategy needs it for
+        inserted, self.network_calls = sync_price_ranges(
+            (self.securities[symbol], start, end) for symbol, (start, end) in self.ranges.items()
+        )
+        self.inserted = sum(inserted.values())
+
+        # Symbols needed for the same range are read together
+        by_range = defaultdict(list)
+        for symbol, symbol_range in self.ranges.items():
+            by_range[symbol_range].append(self.securities[symbol])
+        for (start, end), securities in by_range.items():
+            self.frames.update(get_price_histories(securities, start, end))
+
+        self.seconds = time.perf_counter() - start_time
+        logger.info(
+            f"Loaded {len(self.frames)} symbols for {len(self.strategies)} strategies "
+            f"in {self.seconds:.2f}s ({self.network_calls} provider calls)"
+        )
+        return self
+
+    def covers(self, symbol: str, start, end) -> bool:
+        if symbol not in self.frames:
+            return False
+        planned_start, planned_end = self.ranges[symbol]
+        return planned_start <= _as_date(start) and _as_date(end) <= planned_end
+
+    def slice(self, symbol: str, start, end) -> pd.DataFrame:
+        """Bars of ``symbol`` in ``[start, end)`` as a positional slice of the loaded frame"""
+        data = self.frames[symbol]
+        first = data.index.searchsorted(pd.Timestamp(_as_date(start)), side='left')
+        last = data.index.searchsorted(pd.Timestamp(_as_date(end)), side='left')
+        return data.iloc[first:last]
+
+    def histories(self, securities: Iterable, start, end) -> Optional[Dict[str, pd.DataFrame]]:
+        """
+        Price histories of ``securities`` for ``[start, end)`` served from the
+        plan, or None when any of them falls outside it.
+        """
+        securities = list(securities)
+        if not all(self.covers(security.symbol, start, end) for security in securities):
+            return None
+        return {security.symbol: self.slice(security.symbol, start, end) for security in securities}
+
+    def summary(self) -> Dict:
+        """What the plan loads compared to loading every strategy's tickers separately"""
+        bytes_loaded = sum(
+            int(frame.memory_usage(index=True, deep=True).sum()) for frame in self.frames.values()
+        )
+
+        naive_bytes = 0
+        for symbol, start, end in self.requests:
+            if symbol in self.frames:
+                frame = self.frames[symbol]
+                row_bytes = frame.memory_usage(index=True, deep=True).sum() / max(len(frame), 1)
+                naive_bytes += int(row_bytes * len(self.slice(symbol, start, end)))
+
+        return {
+            'strategies': len(self.strategies),
+            'unique_symbols': len(self.ranges),
+            'symbol_loads': len(self.frames),
+            'naive_symbol_loads': len(self.requests),
+            'bytes_loaded': bytes_loaded,
+            'naive_bytes': naive_bytes,
+            'network_calls': self.network_calls,
+            'expected_network_calls': self.expected_network_calls,
+            'expected_naive_network_calls': self.expected_naive_network_calls,
+            'new_rows': self.inserted,
+            'seconds': self.seconds,
+        }
+
+
+_backtest_plan = None
+
+
+def get_backtest_plan() -> Optional[BacktestPlan]:
+    """The plan serving price data to backtests in this process, if any"""
+    return _backtest_plan
+
+
+def set_backtest_plan(plan: Optional[BacktestPlan]):
+    """
+    Serve backtests from ``plan`` (None returns to per-strategy loading).
+    Pool processes forked afterwards inherit the plan and its frames.
+    """
+    global _backtest_plan
+    _backtest_plan = plan
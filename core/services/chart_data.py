@@ -0,0 +1,99 @@
+"""
+Strategy Chart Data for AlgoAnchor
+Serves the price, indicator and position frames prepared by the backtest engine
+and stored with its result to the strategy charts, so rendering a strategy page
+neither downloads prices nor recomputes indicators.
+"""
+
+from typing import Dict, Optional
+import logging
+import pandas as pd
+
+from core.models import BacktestJob, BacktestResult
+
+logger = logging.getLogger(__name__)
+
+# Columns kept from the engine's prepared frame
+CHART_COLUMNS = [
+    'Open', 'High', 'Low', 'Close', 'Volume', 'Returns',
+    'Rolling_Mean', 'Rolling_Std', 'Z_Score', 'Momentum_Score', 'Momentum_Rank',
+    'Hedge_Ratio', 'Spread_Z',
+    'Signal', 'Position', 'Strategy_Returns',
+]
+CHART_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Indicator column charted below the price for each strategy type, and its label
+CHART_INDICATORS = {
+    'mean_reversion': ('Z_Score', 'Z-Score'),
+    'momentum': ('Momentum_Score', 'Momentum Score'),
+    'pairs': ('Spread_Z', 'Spread Z-Score'),
+}
+
+
+def chart_indicator(strategy):
+    """(column, label) of the indicator the strategy trades on"""
+    return CHART_INDICATORS.get(
+        getattr(strategy, 'strategy_type', 'mean_reversion'), CHART_INDICATORS['mean_reversion']
+    )
+
+
+def chart_frame_name(strategy, symbol: Optional[str] = None) -> Optional[str]:
+    """
+    Name of the frame charted for a strategy: the ticker (the first one by
+    default), or for pairs trading the "Y/X" pair (the first two tickers by
+    default).
+    """
+    symbols = list(strategy.tickers.values_list('symbol', flat=True))
+    if getattr(strategy, 'strategy_type', 'mean_reversion') == 'pairs':
+        if symbol:
+            return symbol
+        return '/'.join(symbols[:2]) if len(symbols) >= 2 else None
+    if symbol:
+        return symbol if symbol in symbols else None
+    return symbols[0] if symbols else None
+
+
+def prepare_chart_frames(frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """Chart columns of the engine's prepared frames (see ``BacktestEngine.chart_frames``), for storage"""
+    return {
+        name: data[[column for column in CHART_COLUMNS if column in data.columns]].astype(float)
+        for name, data in frames.items()
+    }
+
+
+def get_chart_frame(strategy, symbol: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    Prepared price/indicator/position frame for charting a strategy's ticker
+    (or pair, see ``chart_frame_name``), as stored with its backtest result.
+
+    Returns None when the strategy has no result with that frame yet; see
+    ``request_chart_frames``.
+    """
+    from core.services.series_store import load_chart_frame
+
+    name = chart_frame_name(strategy, symbol)
+    if name is None:
+        return None
+
+    backtest_result = BacktestResult.objects.filter(strategy=strategy).values_list('id', flat=True).first()
+    if backtest_result is None:
+        return None
+    return load_chart_frame(backtest_result, name)
+
+
+def request_chart_frames(strategy) -> Optional[BacktestJob]:
+    """
+    Backtest job preparing a strategy's chart frames, queueing one unless a
+    job is already queued or running. Returns None after a failed job, whose
+    error the strategy page shows instead of retrying on every view.
+    """
+    from core.services.job_queue import enqueue_backtest, latest_job
+
+    job = latest_job(strategy)
+    if job is not None and job.is_active():
+        return job
+    if job is not None and job.status == BacktestJob.STATUS_FAILED:
+        return None
+
+    logger.info(f"Chart frames of {strategy.name} are missing, queueing a backtest")
+    return enqueue_backtest(strategy)
@@ -0,0 +1,178 @@
+"""
+Indicator Cache for AlgoAnchor
+Keeps rolling indicator arrays keyed by (symbol, data version, indicator,
+window) in process memory with a byte budget, so strategies in a batch that
+share tickers and lookbacks compute each rolling window only once.
+"""
+
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+import threading
+
+import numpy as np
+from django.conf import settings
+
+from core.services.rolling import RollingWindowStats
+
+logger = logging.getLogger(__name__)
+
+ROLLING_INDICATORS = ('mean', 'std', 'z_score')
+
+
+def data_version(dates, values) -> str:
+    """
+    Fingerprint of a close series and its dates. Identical series loaded by
+    different strategies share a version; any changed bar gives a new one.
+    """
+    digest = blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(np.asarray(dates).astype('datetime64[D]')).view(np.int64))
+    digest.update(np.ascontiguousarray(values, dtype=np.float64))
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    Byte-capped LRU cache of indicator arrays.
+
+    Arrays are stored read-only and returned without copying, so callers
+    must copy before modifying them. ``computed`` counts the arrays built
+    per key, which makes repeated work in a batch visible.
+    """
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.computed = 0
+
+    @staticmethod
+    def make_key(symbol: str, version: str, indicator: str, window: int) -> Tuple:
+        return (symbol, version, indicator, int(window))
+
+    def get(self, key: Tuple) -> Optional[np.ndarray]:
+        with self._lock:
+            values = self._entries.get(key)
+            if values is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return values
+
+    def set(self, key: Tuple, values: np.ndarray):
+        """Cache an array, evicting least recently used entries over budget"""
+        values = np.array(values, dtype=np.float64)
+        values.setflags(write=False)
+        if values.nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            self.computed += 1
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous.nbytes
+            self._entries[key] = values
+            self.bytes += values.nbytes
+
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        values = self.get(key)
+        if values is None:
+            values = compute()
+            self.set(key, values)
+        return values
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict:
+        """Counters for monitoring and benchmarks"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'computed': self.computed,
+            }
+
+
+_indicator_cache = None
+
+
+def get_indicator_cache() -> Optional[IndicatorCache]:
+    """The process-wide indicator cache, or None when INDICATOR_CACHE_MAX_BYTES is 0"""
+    global _indicator_cache
+    max_bytes = getattr(settings, 'INDICATOR_CACHE_MAX_BYTES', 128 * 1024 * 1024)
+    if not max_bytes:
+        return None
+    if _indicator_cache is None or _indicator_cache.max_bytes != max_bytes:
+        _indicator_cache = IndicatorCache(max_bytes=max_bytes)
+    return _indicator_cache
+
+
+def set_indicator_cache(cache: Optional[IndicatorCache]):
+    """Replace the process-wide indicator cache (e.g. a fresh one per benchmark)"""
+    global _indicator_cache
+    _indicator_cache = cache
+
+
+def rolling_indicators(symbols: List[str], dates, closes: np.ndarray, window: int) -> Dict[str, np.ndarray]:
+    """
+    Rolling mean, std and z-score of every column of a (dates x symbols)
+    close matrix (or of a single 1D close series for one symbol).
+
+    Columns found in the indicator cache are reused; the remaining columns
+    are computed together in one ``RollingWindowStats`` pass and cached.
+    Each column only depends on its own values, so cached and freshly
+    computed columns are identical.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    if closes.ndim == 1:
+        indicators = rolling_indicators(symbols[:1], dates, closes[:, None], window)
+        return {name: values[:, 0] for name, values in indicators.items()}
+
+    cache = get_indicator_cache()
+    if cache is None:
+        stats = RollingWindowStats(closes)
+        return {'mean': stats.mean(window), 'std': stats.std(window), 'z_score': stats.z_score(window)}
+
+    indicators = {name: np.empty(closes.shape) for name in ROLLING_INDICATORS}
+    keys = {}
+    missing = []
+    for column, symbol in enumerate(symbols):
+        version = data_version(dates, closes[:, column])
+        keys[column] = {
+            name: cache.make_key(symbol, version, name, window) for name in ROLLING_INDICATORS
+        }
+        cached = {name: cache.get(key) for name, key in keys[column].items()}
+        if any(values is None for values in cached.values()):
+            missing.append(column)
+            continue
+        for name, values in cached.items():
+            indicators[name][:, column] = values
+
+    if missing:
+        stats = RollingWindowStats(closes[:, missing])
+        computed = {'mean': stats.mean(window), 'std': stats.std(window), 'z_score': stats.z_score(window)}
+        for position, column in enumerate(missing):
+            for name, values in computed.items():
+                indicators[name][:, column] = values[:, position]
+                cache.set(keys[column][name], values[:, position])
+        logger.debug(f"Computed {window}-day rolling indicators for {len(missing)} of {len(symbols)} symbols")
+
+    return indicators
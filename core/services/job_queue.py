@@ -0,0 +1,152 @@
+"""
+Backtest Job Queue for AlgoAnchor
+Database-backed queue of backtest jobs drained by the backtest_worker command,
+so web requests only enqueue work instead of running backtests inline.
+"""
+
+from django.utils import timezone
+from datetime import timedelta
+from typing import Dict, Optional
+import logging
+import os
+import socket
+
+from core.models import BacktestJob
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_backtest(strategy) -> BacktestJob:
+    """Queue a backtest for a strategy, reusing a job that is still waiting"""
+    job = BacktestJob.objects.filter(
+        strategy=strategy, status=BacktestJob.STATUS_QUEUED
+    ).first()
+    if job:
+        return job
+
+    job = BacktestJob.objects.create(strategy=strategy, stage='queued')
+    logger.info(f"Queued backtest job {job.id} for strategy {strategy.name}")
+    return job
+
+
+def default_worker_name() -> str:
+    """Identify this worker process in job records"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_next_job(worker: str = '') -> Optional[BacktestJob]:
+    """
+    Atomically move the oldest queued job to RUNNING and return it.
+
+    The claim is a conditional UPDATE, so concurrent workers never pick up the
+    same job, on any database backend.
+    """
+    candidates = BacktestJob.objects.filter(
+        status=BacktestJob.STATUS_QUEUED
+    ).order_by('created_at').values_list('id', flat=True)[:10]
+
+    for job_id in candidates:
+        claimed = BacktestJob.objects.filter(
+            id=job_id, status=BacktestJob.STATUS_QUEUED
+        ).update(
+            status=BacktestJob.STATUS_RUNNING,
+            stage='starting',
+            started_at=timezone.now(),
+            worker=worker
+        )
+        if claimed:
+            return BacktestJob.objects.select_related('strategy').get(id=job_id)
+
+    return None
+
+
+def requeue_stale_jobs(max_age: timedelta = timedelta(hours=1)) -> int:
+    """Return jobs whose worker died mid-run to the queue"""
+    cutoff = timezone.now() - max_age
+    count = BacktestJob.objects.filter(
+        status=BacktestJob.STATUS_RUNNING, started_at__lt=cutoff
+    ).update(status=BacktestJob.STATUS_QUEUED, stage='requeued', started_at=None, worker='')
+    if count:
+        logger.warning(f"Requeued {count} stale backtest jobs")
+    return count
+
+
+def update_job_progress(job: BacktestJob, stage: str, progress: float,
+                        symbols_done: Optional[int] = None, symbols_total: Optional[int] = None):
+    """Record the current stage (and, when reported, the ticker counts) of a running job"""
+    fields = {'stage': stage, 'progress': progress}
+    if symbols_done is not None:
+        fields['symbols_done'] = symbols_done
+    if symbols_total is not None:
+        fields['symbols_total'] = symbols_total
+    for name, value in fields.items():
+        setattr(job, name, value)
+    BacktestJob.objects.filter(id=job.id).update(**fields)
+
+
+def run_job(job: BacktestJob) -> bool:
+    """Run a claimed job's backtest, persist the result and record the outcome"""
+    from core.services.backtest_engine import run_comprehensive_backtest
+    from core.services.result_writer import save_backtest_results
+
+    strategy = job.strategy
+
+    try:
+        results = run_comprehensive_backtest(
+            strategy,
+            progress_callback=lambda stage, progress, **counts: update_job_progress(
+                job, stage, progress, **counts
+            )
+        )
+
+        if not results:
+            raise RuntimeError('No backtest results generated')
+
+        update_job_progress(job, 'saving', 0.9)
+        save_backtest_results(strategy, results, notes="Generated by backtest worker")
+
+        BacktestJob.objects.filter(id=job.id).update(
+            status=BacktestJob.STATUS_DONE,
+            stage='done',
+            progress=1.0,
+            finished_at=timezone.now()
+        )
+        logger.info(f"Backtest job {job.id} completed for strategy {strategy.name}")
+        return True
+
+    except Exception as e:
+        BacktestJob.objects.filter(id=job.id).update(
+            status=BacktestJob.STATUS_FAILED,
+            stage='failed',
+            error=str(e),
+            finished_at=timezone.now()
+        )
+        logger.error(f"Backtest job {job.id} failed for strategy {strategy.name}: {str(e)}")
+        return False
+
+
+def latest_job(strategy) -> Optional[BacktestJob]:
+    """Most recent backtest job for a strategy"""
+    return BacktestJob.objects.filter(strategy=strategy).order_by('-created_at').first()
+
+
+def job_status(job: Optional[BacktestJob]) -> Dict:
+    """JSON-serializable status of a job for polling clients"""
+    if job is None:
+        return {'status': None}
+
+    return {
+        'job_id': job.id,
+        'status': job.status,
+        'stage': job.stage,
+        'progress': job.progress,
+        'symbols_done': job.symbols_done,
+        'symbols_total': job.symbols_total,
+        'active': job.is_active(),
+        'error': job.error,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'queue_seconds': job.queue_seconds(),
+        'run_seconds': job.run_seconds(),
+    }
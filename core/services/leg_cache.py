@@ -0,0 +1,75 @@
+"""
+Backtest Leg Cache for AlgoAnchor
+Caches per-symbol backtest legs (indicators, positions, returns and trades)
+and other deterministic engine outputs on a Django cache alias under a hash
+of everything they depend on, including the engine version, so any strategy
+or rerun that needs the same leg reuses it and engine changes never serve
+stale results.
+"""
+
+from hashlib import sha256
+from typing import Dict, Iterable
+import logging
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(kind: str, *parts) -> str:
+    """
+    Cache key hashing ``parts`` (strings, numbers, None or arrays). Equal
+    inputs always give the same key, on any process or machine.
+    """
+    digest = sha256(kind.encode())
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b'\x1f')
+    return f"{kind}:{digest.hexdigest()}"
+
+
+def get_leg_cache():
+    """The cache holding legs, or None when LEG_CACHE_ALIAS is empty"""
+    alias = getattr(settings, 'LEG_CACHE_ALIAS', 'default')
+    if not alias or alias not in settings.CACHES:
+        return None
+    return caches[alias]
+
+
+def load_entries(keys: Iterable[str]) -> Dict[str, object]:
+    """Cached entries found for ``keys``; lookup failures count as misses"""
+    cache = get_leg_cache()
+    keys = list(keys)
+    if cache is None or not keys:
+        return {}
+    try:
+        return cache.get_many(keys)
+    except Exception as e:
+        logger.warning(f"Leg cache lookup failed: {str(e)}")
+        return {}
+
+
+def store_entries(entries: Dict[str, object]):
+    """Cache ``entries`` for LEG_CACHE_TIMEOUT seconds; failures only cost a recompute later"""
+    cache = get_leg_cache()
+    if cache is None or not entries:
+        return
+    try:
+        cache.set_many(entries, getattr(settings, 'LEG_CACHE_TIMEOUT', 7 * 24 * 60 * 60))
+    except Exception as e:
+        logger.warning(f"Leg cache store failed: {str(e)}")
+
+
+def cached(key: str, compute):
+    """Cached value of ``key``, computing and storing it on a miss"""
+    found = load_entries([key])
+    if key in found:
+        return found[key]
+    value = compute()
+    store_entries({key: value})
+    return value
@@ -0,0 +1,306 @@
+"""
+Market Data Providers for AlgoAnchor
+Batched daily OHLCV downloads and security info behind a provider interface.
+The provider is chosen with the MARKET_DATA_PROVIDER setting: 'yahoo' (default)
+or 'file' for per-symbol CSV/Parquet files in MARKET_DATA_DIR, which runs the
+whole app offline.
+"""
+
+from abc import ABC, abstractmethod
+import json
+import os
+import yfinance as yf
+import pandas as pd
+from django.conf import settings
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def empty_prices() -> pd.DataFrame:
+    """Answer for a symbol without bars in the requested range"""
+    return pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name='Date'), dtype=float)
+
+
+class MarketDataProvider(ABC):
+    """
+    Source of daily OHLCV bars.
+
+    ``download`` takes many symbols at once and returns one frame per symbol
+    the provider answered for, which is empty when the symbol has no bars in
+    the range (holidays, before listing, after delisting); symbols whose
+    request failed are simply absent, so callers retry them later.
+    """
+
+    name = 'base'
+    # Remote providers are rate limited by callers that loop over many symbols
+    remote = False
+
+    @abstractmethod
+    def download(self, symbols: List[str], start, end) -> Dict[str, pd.DataFrame]:
+        """Daily bars for ``[start, end)`` keyed by symbol"""
+
+    def get_info(self, symbol: str) -> Dict:
+        """
+        Security info using Yahoo's keys (symbol, longName, shortName, sector,
+        industry, marketCap, currency, exchange); empty when unknown.
+        """
+        return {}
+
+    def download_one(self, symbol: str, start, end) -> pd.DataFrame:
+        """Daily bars for a single symbol (empty frame when unavailable)"""
+        return self.download([symbol], start, end).get(symbol, empty_prices())
+
+
+def split_download(data: pd.DataFrame, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+    """
+    Split a multi-symbol ``yf.download(..., group_by='ticker')`` frame into
+    per-symbol OHLCV frames, dropping symbols without any bars (yfinance
+    returns all-NaN columns for them).
+    """
+    if data is None or data.empty:
+        return {}
+
+    frames = {}
+    if isinstance(data.columns, pd.MultiIndex):
+        available = set(data.columns.get_level_values(0))
+        for symbol in symbols:
+            if symbol not in available:
+                continue
+            frame = data[symbol].reindex(columns=PRICE_COLUMNS).dropna(how='all')
+            if not frame.empty:
+                frames[symbol] = frame
+    elif len(symbols) == 1:
+        frame = data.reindex(columns=PRICE_COLUMNS).dropna(how='all')
+        if not frame.empty:
+            frames[symbols[0]] = frame
+
+    return frames
+
+
+class YahooMarketDataProvider(MarketDataProvider):
+    """
+    Yahoo Finance provider.
+
+    All symbols go out in one threaded ``yf.download`` call; only the symbols
+    missing from that response are retried one at a time.
+    """
+
+    name = 'yahoo'
+    remote = True
+
+    def __init__(self, threads: bool = True, retries: int = 1):
+        self.threads = threads
+        self.retries = retries
+
+    def _fetch(self, symbols: List[str], start, end) -> Dict[str, pd.DataFrame]:
+        data = yf.download(
+            symbols,
+            start=start,
+            end=end,
+            group_by='ticker',
+            threads=self.threads,
+            progress=False,
+            auto_adjust=True
+        )
+        frames = split_download(data, symbols)
+
+        # Failed symbols and symbols without bars both come back as all-NaN
+        # columns. Once the batch returned bars at all, the request went
+        # through, so those columns are taken as answered without bars; a
+        # batch without any bars cannot be told apart from a failure and is
+        # retried.
+        if frames and isinstance(data.columns, pd.MultiIndex):
+            answered = set(data.columns.get_level_values(0))
+            for symbol in symbols:
+                if symbol in answered:
+                    frames.setdefault(symbol, empty_prices())
+        return frames
+
+    def download(self, symbols: List[str], start, end) -> Dict[str, pd.DataFrame]:
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+
+        try:
+            frames = self._fetch(symbols, start, end)
+        except Exception as e:
+            logger.error(f"Batch download of {len(symbols)} symbols failed: {str(e)}")
+            frames = {}
+
+        failed = [symbol for symbol in symbols if symbol not in frames]
+        if len(symbols) > 1:
+            for symbol in failed:
+                for attempt in range(self.retries):
+                    try:
+                        frames.update(self._fetch([symbol], start, end))
+                    except Exception as e:
+                        logger.warning(f"Retry {attempt + 1} for {symbol} failed: {str(e)}")
+                    if symbol in frames:
+                        break
+
+        logger.info(
+            f"Downloaded {sum(not frame.empty for frame in frames.values())}/{len(symbols)} symbols "
+            f"from {start} to {end} ({len(failed)} needed a retry)"
+        )
+        return frames
+
+    def get_info(self, symbol: str) -> Dict:
+        return yf.Ticker(symbol).info or {}
+
+
+class FixtureMarketDataProvider(MarketDataProvider):
+    """
+    In-memory provider serving preloaded frames with the same batching
+    semantics as the Yahoo provider. Every ``download`` call is recorded in
+    ``calls`` so callers can check how requests were batched.
+    """
+
+    name = 'fixture'
+
+    def __init__(self, frames: Optional[Dict[str, pd.DataFrame]] = None,
+                 info: Optional[Dict[str, Dict]] = None):
+        self.frames = frames or {}
+        self.info = info or {}
+        self.calls = []
+
+    def get_info(self, symbol: str) -> Dict:
+        if symbol in self.info:
+            return self.info[symbol]
+        return {'symbol': symbol, 'shortName': symbol} if symbol in self.frames else {}
+
+    def download(self, symbols: List[str], start, end) -> Dict[str, pd.DataFrame]:
+        symbols = list(dict.fromkeys(symbols))
+        self.calls.append((symbols, start, end))
+
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        frames = {}
+        for symbol in symbols:
+            data = self.frames.get(symbol)
+            if data is None:
+                continue
+            data = data[(data.index >= start) & (data.index < end)]
+            frames[symbol] = data.reindex(columns=PRICE_COLUMNS)
+        return frames
+
+
+class FileMarketDataProvider(MarketDataProvider):
+    """
+    Reads daily bars from per-symbol files in a directory: ``AAPL.parquet``
+    or ``AAPL.csv`` (with a Date column plus Open/High/Low/Close/Volume).
+
+    Security info comes from an optional ``info.json`` mapping symbols to
+    Yahoo-style info dicts; any symbol with a price file is otherwise valid.
+    Parsed files are kept in memory until they change on disk.
+    """
+
+    name = 'file'
+    EXTENSIONS = ('.parquet', '.csv')
+
+    def __init__(self, directory):
+        self.directory = str(directory)
+        self._frames = {}
+        self._info = None
+
+    def path_for(self, symbol: str) -> Optional[str]:
+        """Price file for a symbol (upper or lower case name), if any"""
+        for name in (symbol, symbol.lower()):
+            for extension in self.EXTENSIONS:
+                path = os.path.join(self.directory, name + extension)
+                if os.path.isfile(path):
+                    return path
+        return None
+
+    def _read(self, path: str) -> pd.DataFrame:
+        if path.endswith('.parquet'):
+            data = pd.read_parquet(path)
+        else:
+            data = pd.read_csv(path)
+
+        data.columns = [str(column).strip().title() for column in data.columns]
+        if 'Date' in data.columns:
+            data = data.set_index('Date')
+        data.index = pd.to_datetime(data.index)
+        data.index.name = 'Date'
+        return data.sort_index().reindex(columns=PRICE_COLUMNS).astype(float)
+
+    def load(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Full price history of a symbol, or None without a readable file"""
+        path = self.path_for(symbol)
+        if path is None:
+            return None
+
+        mtime = os.path.getmtime(path)
+        cached = self._frames.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            data = self._read(path)
+        except Exception as e:
+            logger.warning(f"Cannot read price file {path}: {str(e)}")
+            return None
+
+        self._frames[path] = (mtime, data)
+        return data
+
+    def download(self, symbols: List[str], start, end) -> Dict[str, pd.DataFrame]:
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        frames = {}
+        for symbol in dict.fromkeys(symbols):
+            data = self.load(symbol)
+            if data is None:
+                continue
+            frames[symbol] = data[(data.index >= start) & (data.index < end)]
+        return frames
+
+    def get_info(self, symbol: str) -> Dict:
+        if self._info is None:
+            path = os.path.join(self.directory, 'info.json')
+            try:
+                with open(path) as f:
+                    self._info = json.load(f)
+            except FileNotFoundError:
+                self._info = {}
+            except Exception as e:
+                logger.warning(f"Cannot read {path}: {str(e)}")
+                self._info = {}
+
+        if symbol in self._info:
+            return {'symbol': symbol, **self._info[symbol]}
+        return {'symbol': symbol, 'shortName': symbol} if self.path_for(symbol) else {}
+
+
+def has_security_info(info: Dict) -> bool:
+    """Whether a provider's info dict describes an existing security"""
+    return bool(info.get('symbol') or info.get('shortName') or info.get('longName'))
+
+
+def provider_from_settings() -> MarketDataProvider:
+    """Build the provider selected by ``settings.MARKET_DATA_PROVIDER``"""
+    name = getattr(settings, 'MARKET_DATA_PROVIDER', 'yahoo')
+    if name == 'file':
+        return FileMarketDataProvider(settings.MARKET_DATA_DIR)
+    if name != 'yahoo':
+        logger.warning(f"Unknown MARKET_DATA_PROVIDER '{name}', using yahoo")
+    return YahooMarketDataProvider()
+
+
+_provider = None
+
+
+def get_provider() -> MarketDataProvider:
+    """The process-wide market data provider (from settings unless replaced)"""
+    global _provider
+    if _provider is None:
+        _provider = provider_from_settings()
+    return _provider
+
+
+def set_provider(provider: Optional[MarketDataProvider]):
+    """Replace the process-wide provider; ``None`` restores the default"""
+    global _provider
+    _provider = provider
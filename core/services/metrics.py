@@ -0,0 +1,345 @@
+"""
+Streaming Performance Metrics for AlgoAnchor
+Constant-memory accumulators for backtest metrics that can be fed daily
+returns in chunks, merged across partitions of a history and saved as JSON,
+so long histories and chunked or incremental runs never hold every return.
+"""
+
+from typing import Dict, Optional
+import math
+
+import numpy as np
+
+TRADING_DAYS = 252
+
+
+class RunningMoments:
+    """
+    Count, mean and sum of squared deviations (Welford), updated a chunk at a
+    time and merged with Chan's parallel formula.
+    """
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values):
+            chunk_mean = float(values.mean())
+            deviations = values - chunk_mean
+            self.merge(RunningMoments(len(values), chunk_mean, float(np.dot(deviations, deviations))))
+        return self
+
+    def merge(self, other: 'RunningMoments'):
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        return self
+
+    def variance(self, ddof: int = 0) -> float:
+        return self.m2 / (self.count - ddof) if self.count > ddof else 0.0
+
+    def std(self, ddof: int = 0) -> float:
+        return math.sqrt(max(self.variance(ddof), 0.0))
+
+    def to_dict(self) -> Dict:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RunningMoments':
+        return cls(data['count'], data['mean'], data['m2'])
+
+
+class RunningCovariance:
+    """Streaming co-moment of two paired series, plus the moments of each"""
+
+    def __init__(self, x: Optional[RunningMoments] = None, y: Optional[RunningMoments] = None,
+                 comoment: float = 0.0):
+        self.x = x or RunningMoments()
+        self.y = y or RunningMoments()
+        self.comoment = comoment
+
+    @property
+    def count(self) -> int:
+        return self.x.count
+
+    def update(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if len(x):
+            chunk = RunningCovariance(RunningMoments().update(x), RunningMoments().update(y))
+            chunk.comoment = float(np.dot(x - chunk.x.mean, y - chunk.y.mean))
+            self.merge(chunk)
+        return self
+
+    def merge(self, other: 'RunningCovariance'):
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        self.comoment += other.comoment + (
+            (other.x.mean - self.x.mean) * (other.y.mean - self.y.mean) * self.count * other.count / count
+        )
+        self.x.merge(other.x)
+        self.y.merge(other.y)
+        return self
+
+    def covariance(self, ddof: int = 1) -> float:
+        return self.comoment / (self.count - ddof) if self.count > ddof else 0.0
+
+    def to_dict(self) -> Dict:
+        return {'x': self.x.to_dict(), 'y': self.y.to_dict(), 'comoment': self.comoment}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RunningCovariance':
+        return cls(RunningMoments.from_dict(data['x']), RunningMoments.from_dict(data['y']),
+                   data['comoment'])
+
+
+class DrawdownTracker:
+    """
+    Compounded equity, running peak, lowest equity and maximum drawdown of a
+    return series. Partitions merge exactly when merged in time order.
+    """
+
+    def __init__(self, equity: float = 1.0, peak: float = 0.0, trough: float = math.inf,
+                 max_drawdown: float = 0.0):
+        self.equity = equity
+        self.peak = peak
+        self.trough = trough
+        self.max_drawdown = max_drawdown
+
+    def update(self, returns):
+        returns = np.asarray(returns, dtype=np.float64)
+        if len(returns):
+            equity = np.cumprod(1 + returns)
+            running_max = np.maximum.accumulate(equity)
+            self.merge(DrawdownTracker(
+                float(equity[-1]), float(running_max[-1]), float(equity.min()),
+                float(np.min((equity - running_max) / running_max))
+            ))
+        return self
+
+    def merge(self, later: 'DrawdownTracker'):
+        """Append a partition that follows this one in time"""
+        if later.trough == math.inf:
+            return self
+        max_drawdown = min(self.max_drawdown, later.max_drawdown)
+        if self.peak > 0:
+            # The later partition may fall below this partition's peak
+            max_drawdown = min(max_drawdown, self.equity * later.trough / self.peak - 1)
+        self.max_drawdown = max_drawdown
+        self.trough = min(self.trough, self.equity * later.trough)
+        self.peak = max(self.peak, self.equity * later.peak)
+        self.equity *= later.equity
+        return self
+
+    def to_dict(self) -> Dict:
+        return {
+            'equity': self.equity, 'peak': self.peak,
+            'trough': None if self.trough == math.inf else self.trough,
+            'max_drawdown': self.max_drawdown,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'DrawdownTracker':
+        trough = math.inf if data['trough'] is None else data['trough']
+        return cls(data['equity'], data['peak'], trough, data['max_drawdown'])
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative accuracy ``alpha`` (DDSketch).
+
+    Values are counted in logarithmic buckets by magnitude, separately for
+    positive and negative values; any quantile is then within ``alpha`` of
+    the true value's magnitude, using a few hundred buckets at most.
+    """
+
+    # Magnitudes below this count as zero
+    MIN_VALUE = 1e-9
+
+    def __init__(self, alpha: float = 0.005):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+
+    def _add(self, store: Dict[int, int], magnitudes: np.ndarray):
+        keys, counts = np.unique(np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64),
+                                 return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.count += len(values)
+            self._add(self.positive, values[values > self.MIN_VALUE])
+            self._add(self.negative, -values[values < -self.MIN_VALUE])
+            self.zeros += int(np.count_nonzero(np.abs(values) <= self.MIN_VALUE))
+        return self
+
+    def merge(self, other: 'QuantileSketch'):
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        return self
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        """Approximate ``q`` quantile (0..1), 0 when empty"""
+        if self.count == 0:
+            return 0.0
+
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+    def to_dict(self) -> Dict:
+        return {
+            'alpha': self.alpha, 'zeros': self.zeros, 'count': self.count,
+            'positive': {str(key): count for key, count in self.positive.items()},
+            'negative': {str(key): count for key, count in self.negative.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'QuantileSketch':
+        sketch = cls(data['alpha'])
+        sketch.positive = {int(key): count for key, count in data['positive'].items()}
+        sketch.negative = {int(key): count for key, count in data['negative'].items()}
+        sketch.zeros = data['zeros']
+        sketch.count = data['count']
+        return sketch
+
+
+class PerformanceAccumulator:
+    """
+    All return-based backtest metrics of a daily strategy return series and
+    its paired benchmark series.
+
+    Feed chunks with ``update`` in time order, or build one accumulator per
+    partition and ``merge`` them in time order; both give the same metrics as
+    a single pass, except value at risk, which comes from the quantile sketch.
+    """
+
+    def __init__(self):
+        self.returns = RunningCovariance()
+        self.downside = RunningMoments()
+        self.drawdown = DrawdownTracker()
+        self.benchmark_equity = 1.0
+        self.quantiles = QuantileSketch()
+
+    @property
+    def count(self) -> int:
+        return self.returns.count
+
+    def update(self, portfolio_returns, benchmark_returns):
+        portfolio_returns = np.asarray(portfolio_returns, dtype=np.float64)
+        benchmark_returns = np.asarray(benchmark_returns, dtype=np.float64)
+        self.returns.update(portfolio_returns, benchmark_returns)
+        self.downside.update(portfolio_returns[portfolio_returns < 0])
+        self.drawdown.update(portfolio_returns)
+        self.benchmark_equity *= float(np.prod(1 + benchmark_returns))
+        self.quantiles.update(portfolio_returns)
+        return self
+
+    def update_chunked(self, portfolio_returns, benchmark_returns, chunk_size: int = 65536):
+        for start in range(0, len(portfolio_returns), chunk_size):
+            self.update(portfolio_returns[start:start + chunk_size],
+                        benchmark_returns[start:start + chunk_size])
+        return self
+
+    def merge(self, later: 'PerformanceAccumulator'):
+        """Append the accumulator of a partition that follows this one in time"""
+        self.returns.merge(later.returns)
+        self.downside.merge(later.downside)
+        self.drawdown.merge(later.drawdown)
+        self.benchmark_equity *= later.benchmark_equity
+        self.quantiles.merge(later.quantiles)
+        return self
+
+    def metrics(self) -> Dict:
+        """Return and risk metrics; empty before any return was added"""
+        count = self.count
+        if count == 0:
+            return {}
+
+        mean = self.returns.x.mean
+        cumulative_return = self.drawdown.equity - 1
+        annualized_return = (1 + cumulative_return) ** (TRADING_DAYS / count) - 1
+
+        volatility = self.returns.x.std() * np.sqrt(TRADING_DAYS)
+        sharpe_ratio = (mean * TRADING_DAYS) / volatility if volatility > 0 else 0
+
+        downside_deviation = self.downside.std() * np.sqrt(TRADING_DAYS)
+        sortino_ratio = (mean * TRADING_DAYS) / downside_deviation if downside_deviation > 0 else 0
+
+        max_drawdown = self.drawdown.max_drawdown
+        calmar_ratio = annualized_return / abs(max_drawdown) if max_drawdown != 0 else 0
+
+        benchmark_cumulative = self.benchmark_equity - 1
+
+        # Beta: sample covariance over population benchmark variance
+        if count > 1:
+            benchmark_variance = self.returns.y.variance()
+            beta = self.returns.covariance(ddof=1) / benchmark_variance if benchmark_variance > 0 else 1
+        else:
+            beta = 1
+
+        return {
+            'cumulative_return': cumulative_return,
+            'annualized_return': annualized_return,
+            'sharpe_ratio': sharpe_ratio,
+            'sortino_ratio': sortino_ratio,
+            'max_drawdown': max_drawdown,
+            'volatility': volatility,
+            'value_at_risk_95': self.quantiles.quantile(0.05),
+            'calmar_ratio': calmar_ratio,
+            'benchmark_return': benchmark_cumulative,
+            'alpha': cumulative_return - benchmark_cumulative,
+            'beta': beta,
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            'returns': self.returns.to_dict(),
+            'downside': self.downside.to_dict(),
+            'drawdown': self.drawdown.to_dict(),
+            'benchmark_equity': self.benchmark_equity,
+            'quantiles': self.quantiles.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PerformanceAccumulator':
+        accumulator = cls()
+        accumulator.returns = RunningCovariance.from_dict(data['returns'])
+        accumulator.downside = RunningMoments.from_dict(data['downside'])
+        accumulator.drawdown = DrawdownTracker.from_dict(data['drawdown'])
+        accumulator.benchmark_equity = data['benchmark_equity']
+        accumulator.quantiles = QuantileSketch.from_dict(data['quantiles'])
+        return accumulator
@@ -0,0 +1,359 @@
+"""
+Pairs Trading for AlgoAnchor
+Rolling hedge ratios and spread z-scores from cumulative-sum regressions,
+and screening of every pair in a universe by correlation and cointegration
+statistics, with pair chunks evaluated in parallel processes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import logging
+import time
+
+import numpy as np
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# 5% critical value of the Engle-Granger test for two series (MacKinnon)
+ENGLE_GRANGER_CRITICAL_5 = -3.34
+
+
+class RollingRegression:
+    """
+    Rolling OLS of ``y`` on ``x`` (with intercept) for any window length.
+
+    Works on 1D series or column-wise on 2D (dates x pairs) matrices. Like
+    ``RollingWindowStats``, cumulative sums of the demeaned values, squares
+    and cross products are built once and every window is an O(n)
+    difference of them, so no window needs its own least squares solve.
+    Windows without ``window`` dates where both series are observed are NaN.
+    """
+
+    def __init__(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        self.x = x
+        self.y = y
+        self.shape = x.shape
+        self.length = x.shape[0]
+
+        observed = ~(np.isnan(x) | np.isnan(y))
+        counts = np.maximum(observed.sum(axis=0), 1)
+        # Demeaning keeps the cumulative sums small and limits cancellation error
+        self._x_offset = np.where(observed, x, 0.0).sum(axis=0) / counts
+        self._y_offset = np.where(observed, y, 0.0).sum(axis=0) / counts
+        dx = np.where(observed, x - self._x_offset, 0.0)
+        dy = np.where(observed, y - self._y_offset, 0.0)
+
+        zeros = np.zeros((1,) + x.shape[1:])
+
+        def cumulative(values):
+            return np.concatenate((zeros, np.cumsum(values, axis=0)))
+
+        self._sx = cumulative(dx)
+        self._sy = cumulative(dy)
+        self._sxx = cumulative(dx * dx)
+        self._sxy = cumulative(dx * dy)
+        self._syy = cumulative(dy * dy)
+        # Only needed when some window can hold a gap
+        self._count = None if observed.all() else cumulative(observed.astype(np.float64))
+
+    def _window(self, window: int) -> Dict[str, np.ndarray]:
+        """Means and co-moments of every full window, padded to the input shape"""
+        def window_sum(cumulative):
+            return cumulative[window:] - cumulative[:-window]
+
+        mean_x = window_sum(self._sx) / window
+        mean_y = window_sum(self._sy) / window
+        moments = {
+            'mean_x': mean_x,
+            'mean_y': mean_y,
+            'cxx': window_sum(self._sxx) - window * mean_x * mean_x,
+            'cxy': window_sum(self._sxy) - window * mean_x * mean_y,
+            'cyy': window_sum(self._syy) - window * mean_y * mean_y,
+        }
+        if self._count is not None:
+            full = window_sum(self._count) == window
+            moments = {key: np.where(full, values, np.nan) for key, values in moments.items()}
+
+        padded = {}
+        for key, values in moments.items():
+            padded[key] = np.full(self.shape, np.nan)
+            padded[key][window - 1:] = values
+        return padded
+
+    def _valid(self, window: int) -> bool:
+        return 2 < window <= self.length
+
+    def beta(self, window: int) -> np.ndarray:
+        """Rolling hedge ratio (slope of y on x)"""
+        if not self._valid(window):
+            return np.full(self.shape, np.nan)
+        moments = self._window(window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(moments['cxx'] > 0, moments['cxy'] / moments['cxx'], np.nan)
+
+    def alpha(self, window: int) -> np.ndarray:
+        """Rolling intercept, in the units of the original series"""
+        if not self._valid(window):
+            return np.full(self.shape, np.nan)
+        moments = self._window(window)
+        beta = self.beta(window)
+        return moments['mean_y'] + self._y_offset - beta * (moments['mean_x'] + self._x_offset)
+
+    def correlation(self, window: int) -> np.ndarray:
+        if not self._valid(window):
+            return np.full(self.shape, np.nan)
+        moments = self._window(window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return moments['cxy'] / np.sqrt(moments['cxx'] * moments['cyy'])
+
+    def regression(self, window: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rolling hedge ratio and z-score of the spread ``y - alpha - beta * x``
+        against the regression's residual standard deviation, both using the
+        window ending on each date.
+        """
+        if not self._valid(window):
+            empty = np.full(self.shape, np.nan)
+            return empty, empty.copy()
+
+        moments = self._window(window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            beta = np.where(moments['cxx'] > 0, moments['cxy'] / moments['cxx'], np.nan)
+            residual_variance = (moments['cyy'] - beta * moments['cxy']) / (window - 2)
+            residual_std = np.sqrt(np.maximum(residual_variance, 0.0))
+            # Spread of today's prices around the window's regression line (demeaned units)
+            spread = (
+                (self.y - self._y_offset) - moments['mean_y']
+                - beta * ((self.x - self._x_offset) - moments['mean_x'])
+            )
+            z_scores = np.where(residual_std > 0, spread / residual_std, np.nan)
+        return beta, z_scores
+
+    def spread_z(self, window: int) -> np.ndarray:
+        return self.regression(window)[1]
+
+
+def pair_returns(y_returns: np.ndarray, x_returns: np.ndarray, hedge_ratios: np.ndarray,
+                 positions: np.ndarray) -> np.ndarray:
+    """
+    Daily returns of spread positions (1 = long y / short ``hedge`` x,
+    -1 = the reverse) per unit of gross exposure.
+
+    Yesterday's position and hedge ratio earn today's leg returns; dates on
+    which either leg has no return are NaN.
+    """
+    returns = np.full(y_returns.shape, np.nan)
+    held = positions[:-1]
+    hedge = np.nan_to_num(hedge_ratios[:-1])
+    with np.errstate(invalid='ignore'):
+        spread_returns = (y_returns[1:] - hedge * x_returns[1:]) / (1 + np.abs(hedge))
+    returns[1:] = np.where(held != 0, held * spread_returns, 0.0)
+    returns[np.isnan(y_returns) | np.isnan(x_returns)] = np.nan
+    return returns
+
+
+class PairMoments:
+    """
+    Full-sample moment matrices of a (dates x symbols) log price matrix.
+
+    Hedge ratio, return correlation and the Engle-Granger (Dickey-Fuller on
+    the OLS residual) statistics of any pair are closed-form functions of
+    these matrices, so they cost O(1) per pair once the O(T N^2) products
+    are built.
+    """
+
+    def __init__(self, log_prices: np.ndarray):
+        prices = log_prices - log_prices.mean(axis=0)
+        lagged = prices[:-1]
+        differences = np.diff(prices, axis=0)
+
+        self.length = len(differences)
+        self.price_cov = prices.T @ prices
+        self.lag_lag = lagged.T @ lagged
+        self.lag_diff = lagged.T @ differences
+        self.diff_diff = differences.T @ differences
+        self.lag_sum = lagged.sum(axis=0)
+        self.diff_sum = differences.sum(axis=0)
+
+        centered = differences - differences.mean(axis=0)
+        scale = np.sqrt(np.einsum('ij,ij->j', centered, centered))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.return_correlation = (centered.T @ centered) / np.outer(scale, scale)
+
+    def statistics(self, y: np.ndarray, x: np.ndarray) -> Dict[str, np.ndarray]:
+        """Statistics of the pairs ``(y[k], x[k])`` given as column indices"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hedge = self.price_cov[y, x] / self.price_cov[x, x]
+
+            # Residual e = y - hedge * x (zero mean, so no intercept); DF regression de = gamma * e[-1]
+            lag_sq = (self.lag_lag[y, y] - 2 * hedge * self.lag_lag[y, x]
+                      + hedge * hedge * self.lag_lag[x, x])
+            lag_diff = (self.lag_diff[y, y] - hedge * (self.lag_diff[y, x] + self.lag_diff[x, y])
+                        + hedge * hedge * self.lag_diff[x, x])
+            diff_sq = (self.diff_diff[y, y] - 2 * hedge * self.diff_diff[y, x]
+                       + hedge * hedge * self.diff_diff[x, x])
+
+            gamma = lag_diff / lag_sq
+            residual_variance = (diff_sq - gamma * lag_diff) / (self.length - 1)
+            adf_stat = gamma / np.sqrt(residual_variance / lag_sq)
+            half_life = np.where(
+                (gamma < 0) & (gamma > -1), -np.log(2) / np.log1p(gamma), np.nan
+            )
+
+        return {
+            'correlation': self.return_correlation[y, x],
+            'hedge_ratio': hedge,
+            'adf_stat': adf_stat,
+            'half_life': half_life,
+        }
+
+
+def all_pairs(count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Column indices (y, x) of every unordered pair of ``count`` symbols"""
+    return np.triu_indices(count, k=1)
+
+
+def screen_chunk(log_prices: np.ndarray, moments: PairMoments, y: np.ndarray, x: np.ndarray,
+                 lookback: int) -> Dict[str, np.ndarray]:
+    """
+    Screening statistics of a chunk of pairs: the closed-form full-sample
+    statistics plus the stability of the rolling hedge ratio and today's
+    spread z-score from a ``lookback`` day rolling regression.
+    """
+    statistics = moments.statistics(y, x)
+    hedge_ratios, z_scores = RollingRegression(log_prices[:, x], log_prices[:, y]).regression(lookback)
+    with np.errstate(invalid='ignore'):
+        statistics['hedge_ratio_std'] = np.nanstd(hedge_ratios[lookback - 1:], axis=0)
+    statistics['spread_z'] = z_scores[-1]
+    return statistics
+
+
+_log_prices = None
+_moments = None
+
+
+def _init_screen_worker(log_prices: np.ndarray, moments: PairMoments):
+    """Keep the universe's log prices and moment matrices in a pool process"""
+    global _log_prices, _moments
+    _log_prices = log_prices
+    _moments = moments
+
+
+def _screen_chunk_in_worker(y, x, lookback) -> Dict[str, np.ndarray]:
+    return screen_chunk(_log_prices, _moments, y, x, lookback)
+
+
+def screen_pairs(closes: np.ndarray, symbols: List[str], lookback: int = 60,
+                 min_correlation: Optional[float] = None, workers: int = 1,
+                 chunk_size: int = 4096) -> List[Dict]:
+    """
+    Rank every pair of the columns of a gap-free (dates x symbols) close
+    matrix, most cointegrated (most negative Engle-Granger statistic) first.
+
+    The symbol listed first is regressed on the second. Chunks of
+    ``chunk_size`` pairs are evaluated in ``workers`` processes. Pairs whose
+    return correlation is below ``min_correlation`` are left out.
+    """
+    log_prices = np.log(np.asarray(closes, dtype=np.float64))
+    if log_prices.shape[1] < 2 or log_prices.shape[0] <= lookback:
+        return []
+
+    moments = PairMoments(log_prices)
+    y, x = all_pairs(len(symbols))
+    chunks = [
+        (y[start:start + chunk_size], x[start:start + chunk_size])
+        for start in range(0, len(y), chunk_size)
+    ]
+
+    if workers > 1 and len(chunks) > 1:
+        # Forked workers must not share the parent's database connection
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)),
+            initializer=_init_screen_worker,
+            initargs=(log_prices, moments)
+        ) as pool:
+            results = list(pool.map(
+                _screen_chunk_in_worker,
+                [chunk[0] for chunk in chunks],
+                [chunk[1] for chunk in chunks],
+                [lookback] * len(chunks)
+            ))
+    else:
+        results = [screen_chunk(log_prices, moments, chunk_y, chunk_x, lookback)
+                   for chunk_y, chunk_x in chunks]
+
+    statistics = {key: np.concatenate([result[key] for result in results]) for key in results[0]}
+
+    keep = np.isfinite(statistics['adf_stat'])
+    if min_correlation is not None:
+        keep &= statistics['correlation'] >= min_correlation
+    order = np.flatnonzero(keep)
+    order = order[np.argsort(statistics['adf_stat'][order], kind='stable')]
+
+    def value(key, index):
+        number = statistics[key][index]
+        return float(number) if np.isfinite(number) else None
+
+    return [
+        {
+            'y': symbols[y[index]],
+            'x': symbols[x[index]],
+            **{key: value(key, index) for key in statistics},
+            'cointegrated': bool(statistics['adf_stat'][index] < ENGLE_GRANGER_CRITICAL_5),
+        }
+        for index in order
+    ]
+
+
+def screen_universe(securities, days: int = 756, lookback: int = 60,
+                    min_correlation: Optional[float] = None, workers: int = 1,
+                    chunk_size: int = 4096) -> Dict:
+    """
+    Screen every pair of ``securities`` over ``days`` calendar days of stored
+    history. Symbols without a bar on every date of the shared calendar are
+    left out so all pairs are compared over the same dates.
+    """
+    from core.services.portfolio import PricePanel
+    from core.services.price_store import get_price_histories
+
+    securities = list(securities)
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
+
+    start = time.perf_counter()
+    histories = get_price_histories(securities, start_date, end_date)
+    frames = {symbol: data for symbol, data in histories.items() if data is not None and not data.empty}
+    if len(frames) < 2:
+        return {}
+
+    panel = PricePanel(frames)
+    complete = ~np.isnan(panel.closes).any(axis=0) & (np.nan_to_num(panel.closes, nan=1.0) > 0).all(axis=0)
+    symbols = [symbol for symbol, keep in zip(panel.symbols, complete) if keep]
+    skipped = sorted(set(symbol.symbol for symbol in securities) - set(symbols))
+    if skipped:
+        logger.info(f"Pair screen skipping {len(skipped)} symbols without a full history")
+    loaded = time.perf_counter() - start
+
+    pairs = screen_pairs(
+        panel.closes[:, complete], symbols, lookback, min_correlation, workers, chunk_size
+    )
+    seconds = time.perf_counter() - start
+    logger.info(
+        f"Screened {len(symbols) * (len(symbols) - 1) // 2} pairs of {len(symbols)} symbols "
+        f"in {seconds:.2f}s ({loaded:.2f}s loading prices)"
+    )
+
+    return {
+        'pairs': pairs,
+        'symbols': len(symbols),
+        'skipped': skipped,
+        'bars': len(panel),
+        'start_date': panel.dates[0].date(),
+        'end_date': panel.dates[-1].date(),
+        'seconds': seconds,
+    }
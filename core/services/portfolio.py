@@ -0,0 +1,116 @@
+"""
+Portfolio Matrix for AlgoAnchor
+Aligns a strategy's tickers on one shared trading calendar as a (dates x
+symbols) matrix and aggregates per-symbol returns into a single portfolio
+return series with configurable weighting.
+"""
+
+from typing import Dict, List, Union
+import logging
+
+import numpy as np
+import pandas as pd
+
+from core.services.rolling import RollingWindowStats
+
+logger = logging.getLogger(__name__)
+
+WEIGHTING_CHOICES = ('equal', 'inverse_volatility')
+
+
+class PricePanel:
+    """
+    Close prices of several symbols on the union of their trading dates.
+
+    Each column is forward filled between the symbol's first and last bar (a
+    missing day earns a zero return) and is NaN outside that span. ``rows``
+    maps every symbol to the calendar rows of its own bars.
+    """
+
+    def __init__(self, frames: Dict[str, pd.DataFrame]):
+        self.symbols: List[str] = list(frames)
+        self.dates = pd.DatetimeIndex(
+            np.unique(np.concatenate([frame.index.values for frame in frames.values()]))
+            if frames else []
+        )
+        self.closes = np.full((len(self.dates), len(self.symbols)), np.nan)
+        self.rows = {}
+
+        for column, (symbol, frame) in enumerate(frames.items()):
+            rows = self.dates.get_indexer(frame.index)
+            self.rows[symbol] = rows
+            self.closes[rows, column] = frame['Close'].to_numpy(dtype=np.float64)
+
+        if len(self.dates):
+            # Forward fill inside each symbol's span only
+            observed = ~np.isnan(self.closes)
+            rows = np.arange(len(self.dates))[:, None]
+            last_seen = np.maximum.accumulate(np.where(observed, rows, -1), axis=0)
+            filled = np.take_along_axis(self.closes, np.maximum(last_seen, 0), axis=0)
+            last_row = np.max(np.where(observed, rows, -1), axis=0)
+            self.closes = np.where((last_seen >= 0) & (rows <= last_row), filled, np.nan)
+
+        self.returns = np.full(self.closes.shape, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.returns[1:] = self.closes[1:] / self.closes[:-1] - 1
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def active(self) -> np.ndarray:
+        """Whether each symbol has a return on each date"""
+        return ~np.isnan(self.returns)
+
+    def strategy_returns(self, positions: np.ndarray) -> np.ndarray:
+        """Yesterday's position earns today's return (NaN where the symbol is not trading)"""
+        strategy_returns = np.full(self.returns.shape, np.nan)
+        strategy_returns[1:] = self.returns[1:] * positions[:-1]
+        return strategy_returns
+
+
+def portfolio_weights(panel: PricePanel, weighting: Union[str, Dict[str, float]] = 'equal',
+                      lookback: int = 20) -> np.ndarray:
+    """
+    Raw (unnormalized) weight of every symbol on every date.
+
+    ``weighting`` is 'equal', 'inverse_volatility' (inverse of the trailing
+    ``lookback`` day return volatility known at the previous close) or a dict
+    of custom weights by symbol, where missing symbols get no weight.
+    """
+    shape = panel.returns.shape
+
+    if isinstance(weighting, dict):
+        weights = np.array([float(weighting.get(symbol, 0.0)) for symbol in panel.symbols])
+        return np.broadcast_to(np.maximum(weights, 0.0), shape)
+
+    if weighting == 'inverse_volatility':
+        volatility = np.full(shape, np.nan)
+        volatility[1:] = RollingWindowStats(panel.returns).std(lookback)[:-1]
+        with np.errstate(divide='ignore'):
+            weights = np.where(volatility > 0, 1.0 / volatility, np.nan)
+
+        # Until a symbol has a volatility estimate it gets the average weight of the others
+        known = ~np.isnan(weights)
+        counts = known.sum(axis=1, keepdims=True)
+        average = np.where(counts > 0, np.where(known, weights, 0.0).sum(axis=1, keepdims=True)
+                           / np.maximum(counts, 1), 1.0)
+        return np.where(known, weights, average)
+
+    if weighting != 'equal':
+        logger.warning(f"Unknown weighting '{weighting}', using equal weights")
+    return np.ones(shape)
+
+
+def aggregate_returns(returns: np.ndarray, weights: np.ndarray, active: np.ndarray) -> np.ndarray:
+    """
+    Weighted portfolio return per date.
+
+    Weights are renormalized over the symbols trading on each date; dates on
+    which nothing trades return zero.
+    """
+    weights = np.where(active, weights, 0.0)
+    totals = weights.sum(axis=1)
+    weighted = np.where(active, returns, 0.0) * weights
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(totals > 0, weighted.sum(axis=1) / totals, 0.0)
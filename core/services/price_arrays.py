@@ -0,0 +1,237 @@
+"""
+Memory-Mapped Price Arrays for AlgoAnchor
+On-disk columnar copy of daily price history: one .npy file per symbol and
+field plus a date index, opened with mmap so every process shares the same
+page-cached data and date ranges are sliced without copying or parsing.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+import json
+import logging
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+COLUMN_NAMES = {field: field.title() for field in FIELDS}
+MANIFEST = 'CURRENT'
+
+
+def _day(value) -> np.datetime64:
+    if isinstance(value, (datetime, pd.Timestamp)):
+        value = value.date()
+    return np.datetime64(value, 'D')
+
+
+class SymbolArrays:
+    """Memory-mapped arrays of one symbol build"""
+
+    def __init__(self, path: str, manifest: Dict):
+        self.path = path
+        self.manifest = manifest
+        self.coverage_start = np.datetime64(manifest['coverage_start'], 'D')
+        self.coverage_end = np.datetime64(manifest['coverage_end'], 'D')
+        self.dates = np.load(os.path.join(path, 'dates.npy'), mmap_mode='r')
+        self.columns = {
+            field: np.load(os.path.join(path, f'{field}.npy'), mmap_mode='r')
+            for field in FIELDS
+        }
+
+    def matches_coverage(self, coverage_start, coverage_end) -> bool:
+        """Whether this build has exactly the given coverage"""
+        return (coverage_start is not None and coverage_end is not None
+                and self.coverage_start == _day(coverage_start)
+                and self.coverage_end == _day(coverage_end))
+
+    def covers(self, start, end) -> bool:
+        """Whether every day of ``[start, end)`` is inside the built coverage"""
+        return self.coverage_start <= _day(start) and _day(end) - 1 <= self.coverage_end
+
+    def slice(self, start, end) -> Dict[str, np.ndarray]:
+        """Zero-copy views of ``[start, end)`` keyed by 'dates' and field name"""
+        lo, hi = np.searchsorted(self.dates, [_day(start), _day(end)])
+        views = {'dates': self.dates[lo:hi]}
+        views.update({field: values[lo:hi] for field, values in self.columns.items()})
+        return views
+
+
+class PriceArrayStore:
+    """
+    Directory of per-symbol array builds.
+
+    Each build is written to its own version directory and published by
+    atomically replacing the symbol's ``CURRENT`` manifest, so readers in other
+    processes never see a half-written build. Opened builds are reused until
+    the manifest changes.
+    """
+
+    def __init__(self, directory):
+        self.directory = str(directory)
+        self._open = {}
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.directory, symbol.upper())
+
+    def _read_manifest(self, symbol: str) -> Optional[Dict]:
+        try:
+            with open(os.path.join(self._symbol_dir(symbol), MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _version_ns(version: str) -> int:
+        try:
+            return int(version[1:])
+        except (TypeError, ValueError):
+            return -1
+
+    def write(self, symbol: str, dates, columns: Dict[str, np.ndarray], coverage_start, coverage_end) -> int:
+        """
+        Publish a new build for a symbol and return its row count.
+
+        Versions are named by their start time. A build started before the
+        published one (a concurrent builder got there first) is discarded
+        rather than published. After publishing, only versions older than
+        the replaced one are removed: the replaced build may still be mapped
+        by a reader that opened it just before the swap.
+        """
+        symbol_dir = self._symbol_dir(symbol)
+        version = f"v{time.time_ns()}"
+        version_dir = os.path.join(symbol_dir, version)
+        os.makedirs(version_dir)
+
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        np.save(os.path.join(version_dir, 'dates.npy'), dates)
+        for field in FIELDS:
+            np.save(os.path.join(version_dir, f'{field}.npy'), np.asarray(columns[field], dtype=np.float64))
+
+        current = self._read_manifest(symbol)
+        replaced = current.get('version') if current else None
+        if replaced and self._version_ns(replaced) > self._version_ns(version):
+            shutil.rmtree(version_dir, ignore_errors=True)
+            return len(dates)
+
+        manifest = {
+            'version': version,
+            'rows': len(dates),
+            'coverage_start': str(_day(coverage_start)),
+            'coverage_end': str(_day(coverage_end)),
+            'built_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        tmp_path = os.path.join(symbol_dir, f'{MANIFEST}.{version}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(symbol_dir, MANIFEST))
+
+        # Processes that still map an old build keep reading it after the unlink
+        if replaced:
+            for name in os.listdir(symbol_dir):
+                if (name.startswith('v') and name != version
+                        and self._version_ns(name) < self._version_ns(replaced)):
+                    shutil.rmtree(os.path.join(symbol_dir, name), ignore_errors=True)
+
+        return len(dates)
+
+    def write_frame(self, symbol: str, data: pd.DataFrame, coverage_start, coverage_end) -> int:
+        """Publish a build from an OHLCV DataFrame indexed by date"""
+        columns = {
+            field: data[column].to_numpy(dtype=np.float64) for field, column in COLUMN_NAMES.items()
+        }
+        return self.write(
+            symbol, data.index.values.astype('datetime64[D]'), columns, coverage_start, coverage_end
+        )
+
+    def build_from_store(self, security) -> int:
+        """Rebuild a symbol from its PriceData rows and stored coverage"""
+        from core.services.price_store import load_security_prices
+
+        if security.price_history_start is None or security.price_history_end is None:
+            return 0
+
+        data = load_security_prices(
+            security, security.price_history_start, security.price_history_end + timedelta(days=1)
+        )
+        return self.write_frame(
+            security.symbol, data, security.price_history_start, security.price_history_end
+        )
+
+    def build_from_provider(self, symbol: str, start, end) -> int:
+        """Rebuild a symbol straight from the market data provider (no database)"""
+        from core.services.market_data import get_provider
+
+        data = get_provider().download_one(symbol, start, end)
+        if data.empty:
+            return 0
+
+        # Only completed bars count as covered
+        latest_final_day = date.today() - timedelta(days=1)
+        coverage_end = min(_day(end) - 1, _day(latest_final_day))
+        return self.write_frame(symbol, data, start, coverage_end)
+
+    def open(self, symbol: str) -> Optional[SymbolArrays]:
+        """Current build of a symbol, or None when it has not been built"""
+        manifest_path = os.path.join(self._symbol_dir(symbol), MANIFEST)
+
+        # A concurrent rebuild can replace the manifest and remove the build it
+        # pointed to between reading it and mapping; read it once more then
+        for attempt in range(2):
+            try:
+                mtime = os.stat(manifest_path).st_mtime_ns
+            except FileNotFoundError:
+                return None
+
+            cached = self._open.get(symbol)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+            manifest = self._read_manifest(symbol)
+            if manifest is None or 'version' not in manifest:
+                continue
+            try:
+                arrays = SymbolArrays(os.path.join(self._symbol_dir(symbol), manifest['version']), manifest)
+            except (OSError, ValueError, KeyError):
+                continue
+
+            self._open[symbol] = (mtime, arrays)
+            return arrays
+
+        logger.warning(f"Cannot open price arrays for {symbol}: replaced by a concurrent rebuild")
+        return None
+
+    def frame(self, symbol: str, start, end) -> Optional[pd.DataFrame]:
+        """
+        OHLCV DataFrame for ``[start, end)`` backed by the mapped arrays, or
+        None when the build does not cover the range.
+        """
+        arrays = self.open(symbol)
+        if arrays is None or not arrays.covers(start, end):
+            return None
+
+        views = arrays.slice(start, end)
+        return pd.DataFrame(
+            {COLUMN_NAMES[field]: views[field] for field in FIELDS},
+            index=pd.DatetimeIndex(views['dates'], name='Date'),
+            copy=False
+        )
+
+
+_array_store = None
+
+
+def get_array_store() -> Optional[PriceArrayStore]:
+    """The process-wide array store, or None when PRICE_ARRAY_DIR is not set"""
+    global _array_store
+    directory = getattr(settings, 'PRICE_ARRAY_DIR', '')
+    if not directory:
+        return None
+    if _array_store is None or _array_store.directory != str(directory):
+        _array_store = PriceArrayStore(directory)
+    return _array_store
@@ -0,0 +1,262 @@
+"""
+Price History Cache for AlgoAnchor
+Caches per-symbol OHLCV frames keyed by (symbol, start, end, adjustment) on a
+Django cache alias, with a byte budget, LRU eviction, market-hours aware
+expiry and superset lookups for overlapping date ranges.
+"""
+
+from collections import OrderedDict
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Dict, Optional
+from zoneinfo import ZoneInfo
+import logging
+import threading
+import time
+
+import pandas as pd
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+MARKET_TZ = ZoneInfo('America/New_York')
+MARKET_OPEN = dt_time(9, 30)
+MARKET_CLOSE = dt_time(16, 0)
+
+# Ranges ending before today only change on corporate actions
+HISTORICAL_TTL = 24 * 60 * 60
+# Ranges including today while the market trades
+INTRADAY_TTL = 5 * 60
+
+
+def _as_date(value) -> date:
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.date()
+    return value
+
+
+def market_aware_ttl(end, now: Optional[datetime] = None) -> int:
+    """
+    Seconds a cached range ending (exclusive) at ``end`` stays fresh.
+
+    Ranges that stop before today hold only final bars. Ranges that include
+    today expire quickly during US market hours and otherwise stay valid
+    until the next session opens.
+    """
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    if _as_date(end) <= now.date():
+        return HISTORICAL_TTL
+
+    if now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE:
+        return INTRADAY_TTL
+
+    next_open = datetime.combine(now.date(), MARKET_OPEN, tzinfo=MARKET_TZ)
+    if now.time() >= MARKET_OPEN:
+        next_open += timedelta(days=1)
+    while next_open.weekday() >= 5:
+        next_open += timedelta(days=1)
+    return int(min(max((next_open - now).total_seconds(), INTRADAY_TTL), HISTORICAL_TTL))
+
+
+class PriceCache:
+    """
+    Byte-capped LRU cache of price frames on top of a Django cache alias.
+
+    Frames live in the alias, together with a per-symbol index of the
+    ranges cached for it, so processes sharing a file-based or remote alias
+    (the web process and the backtest worker) read each other's frames. A
+    request for a range inside a cached range is answered by slicing the
+    larger entry, and a new entry replaces the cached ranges it contains.
+    The LRU order and byte accounting cover the entries this process has
+    stored or read.
+    """
+
+    def __init__(self, alias: str = 'default', max_bytes: int = 256 * 1024 * 1024):
+        self.alias = alias
+        self.max_bytes = max_bytes
+        # key -> (symbol, adjusted, start, end, nbytes, expires_at), oldest first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.superset_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def make_key(symbol: str, start, end, adjusted: bool = True) -> str:
+        return f"price-cache:{'adj' if adjusted else 'raw'}:{symbol}:{_as_date(start)}:{_as_date(end)}"
+
+    @staticmethod
+    def index_key(symbol: str, adjusted: bool = True) -> str:
+        return f"price-cache-index:{'adj' if adjusted else 'raw'}:{symbol}"
+
+    def _read_index(self, symbol: str, adjusted: bool) -> Dict:
+        """Shared index of ``symbol``: key -> (start, end, nbytes, expires_at)"""
+        return self.backend.get(self.index_key(symbol, adjusted)) or {}
+
+    def _update_index(self, symbol: str, adjusted: bool, add: Dict = None, remove=()):
+        # Read-modify-write without a lock: a lost update only costs a miss later
+        now = time.time()
+        index = {
+            key: entry for key, entry in self._read_index(symbol, adjusted).items()
+            if key not in remove and entry[3] > now
+        }
+        index.update(add or {})
+        if index:
+            self.backend.set(self.index_key(symbol, adjusted), index, HISTORICAL_TTL)
+        else:
+            self.backend.delete(self.index_key(symbol, adjusted))
+
+    def get(self, symbol: str, start, end, adjusted: bool = True) -> Optional[pd.DataFrame]:
+        """Cached bars for ``[start, end)``, sliced from the smallest covering entry"""
+        start, end = _as_date(start), _as_date(end)
+        now = time.time()
+
+        ranges = self._read_index(symbol, adjusted)
+        with self._lock:
+            # Entries whose index update was lost to a concurrent writer
+            for key, (entry_symbol, entry_adjusted, entry_start, entry_end, nbytes, expires_at) in self._entries.items():
+                if entry_symbol == symbol and entry_adjusted == adjusted:
+                    ranges.setdefault(key, (entry_start, entry_end, nbytes, expires_at))
+
+        candidates = sorted(
+            (
+                (entry_end - entry_start, key, entry_start, entry_end, nbytes, expires_at)
+                for key, (entry_start, entry_end, nbytes, expires_at) in ranges.items()
+                if entry_start <= start and end <= entry_end and expires_at > now
+            ),
+            key=lambda candidate: candidate[:2]
+        )
+
+        for _, key, entry_start, entry_end, nbytes, expires_at in candidates:
+            data = self.backend.get(key)
+            if data is None:
+                # Expired or culled by the backend itself
+                self._discard(key, symbol, adjusted)
+                continue
+
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    evicted = []
+                else:
+                    # Stored by another process; count it against this budget from now on
+                    self._entries[key] = (symbol, adjusted, entry_start, entry_end, nbytes, expires_at)
+                    self.bytes += nbytes
+                    evicted = self._evict_over_budget()
+                self.hits += 1
+                if (entry_start, entry_end) != (start, end):
+                    self.superset_hits += 1
+            self._delete(evicted)
+
+            mask = (data.index >= pd.Timestamp(start)) & (data.index < pd.Timestamp(end))
+            return data[mask]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, symbol: str, start, end, data: pd.DataFrame, adjusted: bool = True):
+        """Cache bars for ``[start, end)``, evicting least recently used entries over budget"""
+        if data is None or data.empty:
+            return
+
+        start, end = _as_date(start), _as_date(end)
+        nbytes = int(data.memory_usage(index=True, deep=True).sum())
+        if nbytes > self.max_bytes:
+            return
+
+        ttl = market_aware_ttl(end)
+        expires_at = time.time() + ttl
+        key = self.make_key(symbol, start, end, adjusted)
+        self.backend.set(key, data, ttl)
+
+        # Entries inside the new range, from any process, are now served from it
+        contained = [
+            other for other, (entry_start, entry_end, _, _) in self._read_index(symbol, adjusted).items()
+            if other != key and start <= entry_start and entry_end <= end
+        ]
+        self._update_index(symbol, adjusted, add={key: (start, end, nbytes, expires_at)}, remove=contained)
+
+        with self._lock:
+            contained += [
+                other for other, (entry_symbol, entry_adjusted, entry_start, entry_end, _, _)
+                in self._entries.items()
+                if other != key and other not in contained and entry_symbol == symbol
+                and entry_adjusted == adjusted and start <= entry_start and entry_end <= end
+            ]
+            for other in contained:
+                entry = self._entries.pop(other, None)
+                if entry:
+                    self.bytes -= entry[4]
+
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[4]
+            self._entries[key] = (symbol, adjusted, start, end, nbytes, expires_at)
+            self.bytes += nbytes
+            evicted = self._evict_over_budget()
+
+        for other in contained:
+            self.backend.delete(other)
+        self._delete(evicted)
+
+    def _evict_over_budget(self):
+        """Drop least recently used entries past the budget (lock held); returns what to delete"""
+        evicted = []
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            oldest, entry = self._entries.popitem(last=False)
+            self.bytes -= entry[4]
+            self.evictions += 1
+            evicted.append((oldest, entry[0], entry[1]))
+        return evicted
+
+    def _delete(self, evicted):
+        for key, symbol, adjusted in evicted:
+            self.backend.delete(key)
+            self._update_index(symbol, adjusted, remove={key})
+
+    def _discard(self, key: str, symbol: str, adjusted: bool):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry:
+                self.bytes -= entry[4]
+        self._delete([(key, symbol, adjusted)])
+
+    def clear(self):
+        with self._lock:
+            entries = [(key, entry[0], entry[1]) for key, entry in self._entries.items()]
+        for key, symbol, adjusted in entries:
+            self._discard(key, symbol, adjusted)
+
+    def stats(self) -> Dict:
+        """Counters for monitoring and benchmarks"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'superset_hits': self.superset_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+_price_cache = None
+
+
+def get_price_cache() -> Optional[PriceCache]:
+    """The process-wide price cache, or None when PRICE_CACHE_MAX_BYTES is 0"""
+    global _price_cache
+    alias = getattr(settings, 'PRICE_CACHE_ALIAS', 'default')
+    max_bytes = getattr(settings, 'PRICE_CACHE_MAX_BYTES', 256 * 1024 * 1024)
+    if not max_bytes or alias not in settings.CACHES:
+        return None
+    if _price_cache is None or (_price_cache.alias, _price_cache.max_bytes) != (alias, max_bytes):
+        _price_cache = PriceCache(alias=alias, max_bytes=max_bytes)
+    return _price_cache
@@ -0,0 +1,297 @@
+"""
+Local Price Store for AlgoAnchor
+Keeps daily OHLCV history in PriceData and only downloads the date ranges
+that are not stored yet, batching downloads across securities.
+"""
+
+import numpy as np
+import pandas as pd
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.db import transaction
+import logging
+
+from core.models import PriceData, Security
+from core.services.market_data import get_provider
+from core.services.price_arrays import get_array_store
+from core.services.price_cache import get_price_cache
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _as_date(value) -> date:
+    """Normalize datetime/Timestamp/date values to a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, pd.Timestamp):
+        return value.date()
+    return value
+
+
+def download_prices(symbol: str, start: date, end: date) -> pd.DataFrame:
+    """Download daily OHLCV bars for ``[start, end)`` from the market data provider"""
+    return get_provider().download_one(symbol, start, end)
+
+
+def missing_ranges(security: Security, start, end) -> List[Tuple[date, date]]:
+    """
+    Date ranges in ``[start, end)`` not yet covered by the store, as
+    ``(start, end)`` pairs with an exclusive end.
+
+    Coverage is a single contiguous span, so a range lying entirely before
+    or after it is extended to reach the span: the gap in between is
+    fetched too, and the span can then grow over it.
+    """
+    start, end = _as_date(start), _as_date(end)
+    if start >= end:
+        return []
+
+    covered_start = security.price_history_start
+    covered_end = security.price_history_end
+    if covered_start is None or covered_end is None:
+        return [(start, end)]
+
+    ranges = []
+    if start < covered_start:
+        ranges.append((start, covered_start))
+    if end - timedelta(days=1) > covered_end:
+        ranges.append((covered_end + timedelta(days=1), end))
+    return ranges
+
+
+def _extend_coverage(security: Security, range_start: date, range_end: date):
+    """
+    Mark ``[range_start, range_end)`` as stored, never past the last final
+    bar. The covered span only grows over ranges that touch or overlap it;
+    a disjoint range would mark the days in between as stored.
+    """
+    # Never mark today as covered: its bar is incomplete until the close
+    latest_final_day = date.today() - timedelta(days=1)
+    covered_end = min(range_end - timedelta(days=1), latest_final_day)
+    if covered_end < range_start:
+        return
+
+    if security.price_history_start is not None and security.price_history_end is not None and (
+        range_start > security.price_history_end + timedelta(days=1)
+        or covered_end < security.price_history_start - timedelta(days=1)
+    ):
+        logger.warning(
+            f"Not extending coverage of {security.symbol} ({security.price_history_start} to "
+            f"{security.price_history_end}) over the disjoint range {range_start} to {covered_end}"
+        )
+        return
+
+    security.price_history_start = min(filter(None, [security.price_history_start, range_start]))
+    security.price_history_end = max(filter(None, [security.price_history_end, covered_end]))
+    Security.objects.filter(pk=security.pk).update(
+        price_history_start=security.price_history_start,
+        price_history_end=security.price_history_end
+    )
+
+
+def sync_prices_batch(securities: Iterable[Security], start, end) -> Dict[str, int]:
+    """
+    Fetch and store the parts of ``[start, end)`` missing for many securities.
+    Returns the number of new rows per symbol (see ``sync_price_ranges``).
+    """
+    inserted, _ = sync_price_ranges((security, start, end) for security in securities)
+    return inserted
+
+
+def sync_price_ranges(requests: Iterable[Tuple[Security, date, date]]) -> Tuple[Dict[str, int], int]:
+    """
+    Fetch and store the missing parts of each security's own ``[start, end)``.
+
+    Securities missing the same date range are requested together in one
+    provider call, so a warm store with a shared gap (typically the days since
+    the last sync) costs a single batched download. Returns the number of new
+    rows per symbol and the number of provider calls made.
+
+    Coverage is extended for every range the provider answered, even
+    without bars (exchange holidays, dates before a listing or after a
+    delisting), and for ranges without any weekdays, so none of them is
+    requested again. Failed downloads (symbols missing from the provider's
+    answer) are retried on the next call.
+    """
+    by_range = defaultdict(list)
+    for security, start, end in requests:
+        for missing in missing_ranges(security, start, end):
+            by_range[missing].append(security)
+
+    inserted = defaultdict(int)
+    provider = get_provider()
+    calls = 0
+
+    for (range_start, range_end), group in by_range.items():
+        calls += 1
+        try:
+            frames = provider.download([security.symbol for security in group], range_start, range_end)
+        except Exception as e:
+            logger.error(f"Error downloading {len(group)} symbols {range_start} to {range_end}: {str(e)}")
+            continue
+
+        has_weekdays = np.busday_count(range_start, range_end) > 0
+
+        for security in group:
+            data = frames.get(security.symbol)
+            if data is None:
+                if has_weekdays:
+                    logger.warning(f"No data returned for {security.symbol} {range_start} to {range_end}")
+                    continue
+            elif not data.empty:
+                inserted[security.symbol] += store_prices(security, data)
+
+            _extend_coverage(security, range_start, range_end)
+
+    for symbol, count in inserted.items():
+        if count:
+            logger.info(f"Stored {count} new price rows for {symbol}")
+
+    return dict(inserted), calls
+
+
+def sync_security_prices(security: Security, start, end) -> int:
+    """Fetch and store the parts of ``[start, end)`` missing for one security"""
+    return sync_prices_batch([security], start, end).get(security.symbol, 0)
+
+
+def store_prices(security: Security, data: pd.DataFrame) -> int:
+    """Bulk insert OHLCV rows, skipping dates that are already stored"""
+    if data is None or data.empty or 'Close' not in data.columns:
+        return 0
+
+    data = data.dropna(subset=['Close']).reindex(columns=PRICE_COLUMNS)
+    values = data.to_numpy(dtype=float)
+
+    def optional(value):
+        return None if pd.isna(value) else float(value)
+
+    rows = []
+    for index, (open_, high, low, close, volume) in zip(data.index, values):
+        rows.append(PriceData(
+            security=security,
+            date=_as_date(index),
+            open=optional(open_),
+            high=optional(high),
+            low=optional(low),
+            close=float(close),
+            volume=int(volume) if not pd.isna(volume) else None
+        ))
+
+    with transaction.atomic():
+        before = PriceData.objects.filter(security=security).count()
+        PriceData.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+        return PriceData.objects.filter(security=security).count() - before
+
+
+def load_security_prices(security: Security, start, end) -> pd.DataFrame:
+    """Read stored bars in ``[start, end)`` as an OHLCV DataFrame indexed by date"""
+    rows = PriceData.objects.filter(
+        security=security,
+        date__gte=_as_date(start),
+        date__lt=_as_date(end)
+    ).order_by('date').values_list('date', 'open', 'high', 'low', 'close', 'volume')
+
+    data = pd.DataFrame.from_records(list(rows), columns=['Date'] + PRICE_COLUMNS)
+    data['Date'] = pd.to_datetime(data['Date'])
+    data = data.set_index('Date')
+    return data.astype(float)
+
+
+def get_price_histories(securities: Iterable[Security], start, end) -> Dict[str, pd.DataFrame]:
+    """
+    Daily OHLCV history for several securities, keyed by symbol.
+
+    Recently served ranges (or ranges inside them) come from the price
+    cache, and ranges covered by the memory-mapped price arrays are sliced
+    from them directly. The rest are synced with batched downloads and read
+    from PriceData; securities without any stored bars in the range are left
+    out. Arrays are rebuilt outside of requests (``refresh_stale_price_arrays``
+    in the backtest worker, or ``build_price_cache``).
+    """
+    securities = list(securities)
+    histories = {}
+    price_cache = get_price_cache()
+    array_store = get_array_store()
+
+    if price_cache:
+        remaining = []
+        for security in securities:
+            data = price_cache.get(security.symbol, start, end)
+            if data is None:
+                remaining.append(security)
+            else:
+                histories[security.symbol] = data
+        securities = remaining
+        if not securities:
+            return histories
+
+    if array_store:
+        remaining = []
+        for security in securities:
+            data = array_store.frame(security.symbol, start, end)
+            if data is None:
+                remaining.append(security)
+            elif not data.empty:
+                histories[security.symbol] = data
+                if price_cache:
+                    price_cache.set(security.symbol, start, end, data)
+        securities = remaining
+        if not securities:
+            return histories
+
+    try:
+        sync_prices_batch(securities, start, end)
+    except Exception as e:
+        logger.error(f"Error syncing prices for {len(securities)} securities: {str(e)}")
+
+    for security in securities:
+        data = load_security_prices(security, start, end)
+        if not data.empty:
+            histories[security.symbol] = data
+            if price_cache:
+                price_cache.set(security.symbol, start, end, data)
+    return histories
+
+
+def refresh_price_arrays(array_store, security: Security) -> bool:
+    """Rebuild a security's price arrays when the store's coverage has grown past them"""
+    if security.price_history_start is None or security.price_history_end is None:
+        return False
+
+    arrays = array_store.open(security.symbol)
+    if arrays is not None and arrays.matches_coverage(
+        security.price_history_start, security.price_history_end
+    ):
+        return False
+
+    try:
+        array_store.build_from_store(security)
+        return True
+    except Exception as e:
+        logger.error(f"Error building price arrays for {security.symbol}: {str(e)}")
+        return False
+
+
+def refresh_stale_price_arrays(securities: Iterable[Security]) -> int:
+    """
+    Rebuild the price arrays of every security whose stored coverage has
+    grown past its build. Returns the number of rebuilt securities.
+    """
+    array_store = get_array_store()
+    if array_store is None:
+        return 0
+    return sum(refresh_price_arrays(array_store, security) for security in securities)
+
+
+def get_price_history(security: Security, start, end) -> Optional[pd.DataFrame]:
+    """
+    Daily OHLCV history for ``[start, end)``, served from the local store.
+
+    Only date ranges the store has not covered yet trigger a download; a warm
+    store answers from the price arrays or with a single range query.
+    """
+    return get_price_histories([security], start, end).get(security.symbol)
@@ -0,0 +1,150 @@
+"""
+Backtest Result Persistence for AlgoAnchor
+Writes a backtest's metrics, trade log and daily series in one transaction with
+batched bulk inserts.
+"""
+
+from django.db import transaction
+from typing import Dict
+import logging
+import time
+
+from core.models import BacktestResult, TradeLog
+from core.services.series_store import append_series, save_chart_frames, save_series
+
+logger = logging.getLogger(__name__)
+
+# Scalar metrics copied from the engine's results dict onto BacktestResult
+RESULT_FIELDS = [
+    'cumulative_return', 'annualized_return', 'sharpe_ratio', 'sortino_ratio',
+    'win_rate', 'max_drawdown', 'volatility', 'avg_trade_return',
+    'avg_winning_trade', 'avg_losing_trade', 'value_at_risk_95', 'calmar_ratio',
+    'benchmark_return', 'alpha', 'beta', 'backtest_start_date', 'backtest_end_date',
+]
+COUNT_FIELDS = ['total_trades', 'winning_trades', 'losing_trades']
+
+
+class BacktestResultWriter:
+    """
+    Persists engine results as a BacktestResult plus its TradeLog rows and,
+    when the engine provides them, its packed BacktestSeries and chart frames.
+
+    Any existing result for the strategy is replaced inside the same
+    transaction, so readers see either the old result or the complete new one.
+    """
+
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+        self.stats = {}
+
+    def build_trades(self, backtest_result: BacktestResult, trade_log, notes: str = ''):
+        """Unsaved TradeLog instances for an engine trade log"""
+        return [
+            TradeLog(
+                backtest_result=backtest_result,
+                security=trade['security'],
+                trade_type=trade['type'],
+                date=trade['date'],
+                price=trade['price'],
+                quantity=trade['quantity'],
+                commission=trade['commission'],
+                signal_value=trade.get('signal_value'),
+                notes=notes
+            )
+            for trade in trade_log
+        ]
+
+    def write(self, strategy, results: Dict, notes: str = '') -> BacktestResult:
+        """Replace the strategy's result with ``results`` and bulk insert its trades"""
+        start = time.perf_counter()
+        trade_log = results.get('trade_log', [])
+
+        with transaction.atomic():
+            BacktestResult.objects.filter(strategy=strategy).delete()
+
+            backtest_result = BacktestResult.objects.create(
+                strategy=strategy,
+                **{field: results.get(field) for field in RESULT_FIELDS},
+                **{field: results.get(field, 0) for field in COUNT_FIELDS},
+                confidence_intervals=results.get('confidence_intervals'),
+                engine_state=results.get('engine_state')
+            )
+
+            TradeLog.objects.bulk_create(
+                self.build_trades(backtest_result, trade_log, notes),
+                batch_size=self.batch_size
+            )
+
+            if results.get('daily_series'):
+                save_series(backtest_result, results['daily_series'])
+
+            if results.get('chart_frames'):
+                save_chart_frames(backtest_result, results['chart_frames'])
+
+        seconds = time.perf_counter() - start
+        rows = len(trade_log) + 1
+        self.stats = {
+            'rows': rows,
+            'trades': len(trade_log),
+            'seconds': seconds,
+            'rows_per_second': rows / seconds if seconds > 0 else float('inf'),
+        }
+        logger.info(
+            f"Saved backtest for {strategy.name}: {rows} rows in {seconds:.3f}s "
+            f"({self.stats['rows_per_second']:,.0f} rows/s)"
+        )
+
+        return backtest_result
+
+    def advance(self, backtest_result: BacktestResult, results: Dict, notes: str = '') -> BacktestResult:
+        """
+        Apply an incremental run (see ``run_incremental_backtest``) to a stored
+        result in place: insert the new trades, append the new daily series rows
+        and update the metrics, end date and engine state. Stored chart frames
+        keep ending at the last full run.
+        """
+        start = time.perf_counter()
+        trade_log = results.get('trade_log', [])
+
+        for field in RESULT_FIELDS + COUNT_FIELDS:
+            if field in results:
+                setattr(backtest_result, field, results[field])
+        backtest_result.engine_state = results.get('engine_state', backtest_result.engine_state)
+
+        with transaction.atomic():
+            backtest_result.save()
+
+            TradeLog.objects.bulk_create(
+                self.build_trades(backtest_result, trade_log, notes),
+                batch_size=self.batch_size
+            )
+
+            if results.get('daily_series'):
+                append_series(backtest_result, results['daily_series'])
+
+        seconds = time.perf_counter() - start
+        self.stats = {
+            'rows': len(trade_log) + 1,
+            'trades': len(trade_log),
+            'new_bars': results.get('new_bars', 0),
+            'seconds': seconds,
+        }
+        logger.info(
+            f"Advanced backtest for {backtest_result.strategy.name}: "
+            f"{self.stats['new_bars']} bars, {len(trade_log)} trades in {seconds:.3f}s"
+        )
+
+        return backtest_result
+
+
+def save_backtest_results(strategy, results: Dict, notes: str = '',
+                          batch_size: int = 1000) -> BacktestResult:
+    """Persist engine results for a strategy, replacing any previous result"""
+    return BacktestResultWriter(batch_size=batch_size).write(strategy, results, notes)
+
+
+def advance_backtest_results(strategy, results: Dict, notes: str = '',
+                             batch_size: int = 1000) -> BacktestResult:
+    """Apply incremental engine results to the strategy's stored result"""
+    backtest_result = BacktestResult.objects.select_related('strategy').get(strategy=strategy)
+    return BacktestResultWriter(batch_size=batch_size).advance(backtest_result, results, notes)
@@ -0,0 +1,86 @@
+"""
+Rolling Statistics for AlgoAnchor
+Computes rolling means and standard deviations for any number of window
+lengths from one shared pair of cumulative sums.
+"""
+
+import numpy as np
+
+# Relative size of the cumulative sums' rounding error, below which a window's
+# variance is treated as 0
+FLAT_TOLERANCE = 64 * np.finfo(np.float64).eps
+
+
+class RollingWindowStats:
+    """
+    Rolling mean/std over a 1D series, or column-wise over a 2D (dates x
+    symbols) matrix, for arbitrary window lengths.
+
+    The cumulative sums of the (demeaned) values and their squares are built once;
+    every window length is then an O(n) difference of those sums instead of a
+    separate pandas ``rolling()`` pass. Positions without a full window of
+    non-NaN values are NaN, matching pandas' default ``min_periods``, so
+    columns that start or end at different dates are handled in the same pass.
+    """
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.values = values
+        self.shape = values.shape
+        self.length = values.shape[0]
+
+        observed = ~np.isnan(values)
+        # Demeaning keeps the cumulative sums small and limits cancellation error
+        counts = observed.sum(axis=0)
+        totals = np.where(observed, values, 0.0).sum(axis=0)
+        self._offset = np.where(counts > 0, totals / np.maximum(counts, 1), 0.0)
+        shifted = np.where(observed, values - self._offset, 0.0)
+
+        zeros = np.zeros((1,) + values.shape[1:])
+        self._csum = np.concatenate((zeros, np.cumsum(shifted, axis=0)))
+        self._csum_sq = np.concatenate((zeros, np.cumsum(shifted * shifted, axis=0)))
+        # Only needed when some window can hold a gap
+        self._ccount = None if observed.all() else np.concatenate(
+            (zeros, np.cumsum(observed, axis=0, dtype=np.float64))
+        )
+
+    def _window_sums(self, window: int):
+        sums = self._csum[window:] - self._csum[:-window]
+        sums_sq = self._csum_sq[window:] - self._csum_sq[:-window]
+        return sums, sums_sq
+
+    def _pad(self, window: int, values: np.ndarray) -> np.ndarray:
+        if self._ccount is not None:
+            full = (self._ccount[window:] - self._ccount[:-window]) == window
+            values = np.where(full, values, np.nan)
+        result = np.full(self.shape, np.nan)
+        result[window - 1:] = values
+        return result
+
+    def mean(self, window: int) -> np.ndarray:
+        """Rolling mean with a trailing window of ``window`` observations"""
+        if window < 1 or window > self.length:
+            return np.full(self.shape, np.nan)
+        sums, _ = self._window_sums(window)
+        return self._pad(window, sums / window + self._offset)
+
+    def std(self, window: int, ddof: int = 1) -> np.ndarray:
+        """Rolling standard deviation (sample std by default, like pandas)"""
+        if window <= ddof or window > self.length:
+            return np.full(self.shape, np.nan)
+        sums, sums_sq = self._window_sums(window)
+        variance = (sums_sq - sums * sums / window) / (window - ddof)
+        # Differencing the cumulative sums leaves rounding residue (positive or
+        # negative) of the order of their magnitude; on flat windows that is all
+        # there is, so it is snapped to an exact 0 like pandas reports
+        noise = (self._csum_sq[window:] + self._csum_sq[:-window]) * (FLAT_TOLERANCE / (window - ddof))
+        variance = np.where(variance <= noise, 0.0, variance)
+        return self._pad(window, np.sqrt(variance))
+
+    def z_score(self, window: int) -> np.ndarray:
+        """Distance of each value from its rolling mean in rolling std units"""
+        mean = self.mean(window)
+        std = self.std(window)
+        # Undefined on flat windows (pandas gives 0 / 0 = NaN there)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(std > 0, (self.values - mean) / std, np.nan)
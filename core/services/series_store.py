@@ -0,0 +1,147 @@
+"""
+Backtest Series Storage for AlgoAnchor
+Packs daily strategy/benchmark returns and the equity curve of a backtest, and
+the engine-prepared chart frames, into compact binary arrays and loads them
+back as NumPy arrays and DataFrames.
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import date
+from typing import Dict, Optional
+
+from core.models import BacktestChartFrame, BacktestSeries
+
+OFFSET_DTYPE = np.dtype('<i4')
+VALUE_DTYPE = np.dtype('<f4')
+# Chart frames keep prices exactly as the engine saw them
+FRAME_DTYPE = np.dtype('<f8')
+
+
+def pack_array(values, dtype: np.dtype) -> bytes:
+    """Serialize an array as little-endian bytes of ``dtype``"""
+    return np.ascontiguousarray(values, dtype=dtype).tobytes()
+
+
+def unpack_array(blob, dtype: np.dtype) -> np.ndarray:
+    """Read-only array view over a stored blob (no copy)"""
+    return np.frombuffer(blob, dtype=dtype)
+
+
+def build_series_fields(dates, strategy_returns, benchmark_returns) -> Dict:
+    """
+    Model field values for a daily series.
+
+    Dates are stored as day offsets from the first date; the equity curve is
+    the compounded strategy return series starting from 1.0.
+    """
+    days = np.asarray(dates, dtype='datetime64[D]')
+    strategy_returns = np.asarray(strategy_returns, dtype=np.float64)
+    benchmark_returns = np.asarray(benchmark_returns, dtype=np.float64)
+
+    start = days[0] if len(days) else np.datetime64(date.today(), 'D')
+    offsets = (days - start).astype(np.int64)
+
+    return {
+        'start_date': start.astype(date),
+        'length': len(days),
+        'date_offsets': pack_array(offsets, OFFSET_DTYPE),
+        'strategy_returns': pack_array(strategy_returns, VALUE_DTYPE),
+        'benchmark_returns': pack_array(benchmark_returns, VALUE_DTYPE),
+        'equity_curve': pack_array(np.cumprod(1 + strategy_returns), VALUE_DTYPE),
+    }
+
+
+def save_series(backtest_result, daily_series: Dict) -> BacktestSeries:
+    """Store the engine's ``daily_series`` output for a result"""
+    return BacktestSeries.objects.create(
+        backtest_result=backtest_result,
+        **build_series_fields(
+            daily_series['dates'],
+            daily_series['strategy_returns'],
+            daily_series['benchmark_returns']
+        )
+    )
+
+
+def append_series(backtest_result, daily_series: Dict) -> BacktestSeries:
+    """Extend a result's stored series with the new rows of an advanced backtest"""
+    existing = load_series(backtest_result)
+    if existing is None:
+        return save_series(backtest_result, daily_series)
+
+    fields = build_series_fields(
+        np.concatenate([existing['dates'], np.asarray(daily_series['dates'], dtype='datetime64[D]')]),
+        np.concatenate([existing['strategy_returns'], daily_series['strategy_returns']]),
+        np.concatenate([existing['benchmark_returns'], daily_series['benchmark_returns']])
+    )
+    BacktestSeries.objects.filter(backtest_result=backtest_result).update(**fields)
+    return BacktestSeries.objects.get(backtest_result=backtest_result)
+
+
+def load_series(backtest_result) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Stored daily series for a result (instance or id) as NumPy arrays.
+
+    Reads the blobs with a single ``values_list`` query, so no model instance
+    is built. Returns None when the result has no stored series.
+    """
+    result_id = getattr(backtest_result, 'pk', backtest_result)
+    row = BacktestSeries.objects.filter(backtest_result_id=result_id).values_list(
+        'start_date', 'date_offsets', 'strategy_returns', 'benchmark_returns', 'equity_curve'
+    ).first()
+
+    if row is None:
+        return None
+
+    start_date, offsets, strategy_returns, benchmark_returns, equity_curve = row
+    benchmark_returns = unpack_array(benchmark_returns, VALUE_DTYPE)
+
+    return {
+        'dates': np.datetime64(start_date, 'D') + unpack_array(offsets, OFFSET_DTYPE),
+        'strategy_returns': unpack_array(strategy_returns, VALUE_DTYPE),
+        'benchmark_returns': benchmark_returns,
+        'equity_curve': unpack_array(equity_curve, VALUE_DTYPE),
+        'benchmark_equity': np.cumprod(1 + benchmark_returns.astype(np.float64)),
+    }
+
+
+def build_chart_frame_fields(data: pd.DataFrame) -> Dict:
+    """Model field values for a chart frame indexed by date with numeric columns"""
+    days = data.index.values.astype('datetime64[D]')
+    start = days[0] if len(days) else np.datetime64(date.today(), 'D')
+    return {
+        'start_date': start.astype(date),
+        'length': len(days),
+        'date_offsets': pack_array((days - start).astype(np.int64), OFFSET_DTYPE),
+        'columns': [str(column) for column in data.columns],
+        'values': pack_array(data.to_numpy(dtype=np.float64), FRAME_DTYPE),
+    }
+
+
+def save_chart_frames(backtest_result, frames: Dict[str, pd.DataFrame]):
+    """Store a result's chart frames (see ``chart_data.prepare_chart_frames``), replacing older ones"""
+    BacktestChartFrame.objects.filter(backtest_result=backtest_result).delete()
+    BacktestChartFrame.objects.bulk_create([
+        BacktestChartFrame(backtest_result=backtest_result, name=name, **build_chart_frame_fields(data))
+        for name, data in frames.items()
+    ])
+
+
+def load_chart_frame(backtest_result, name: str) -> Optional[pd.DataFrame]:
+    """Stored chart frame of a result (instance or id), or None when it was not stored"""
+    result_id = getattr(backtest_result, 'pk', backtest_result)
+    row = BacktestChartFrame.objects.filter(backtest_result_id=result_id, name=name).values_list(
+        'start_date', 'length', 'date_offsets', 'columns', 'values'
+    ).first()
+
+    if row is None:
+        return None
+
+    start_date, length, offsets, columns, values = row
+    dates = np.datetime64(start_date, 'D') + unpack_array(offsets, OFFSET_DTYPE)
+    return pd.DataFrame(
+        unpack_array(values, FRAME_DTYPE).reshape(length, len(columns)),
+        index=pd.DatetimeIndex(dates.astype('datetime64[ns]'), name='Date'),
+        columns=columns
+    )
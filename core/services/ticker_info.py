@@ -0,0 +1,98 @@
+"""
+Ticker Info Lookups for AlgoAnchor
+Runs provider info calls (blocking HTTP requests for Yahoo) on a bounded
+thread pool for async views, with a timeout per call, and shares one
+upstream call between every caller asking for the same symbol at once.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+import asyncio
+import logging
+import threading
+
+from django.conf import settings
+
+from core.services.market_data import get_provider
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Upstream calls in flight, keyed by symbol
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def get_info_executor() -> ThreadPoolExecutor:
+    """The thread pool running info calls, sized by TICKER_INFO_WORKERS"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(getattr(settings, 'TICKER_INFO_WORKERS', 8), 1),
+                thread_name_prefix='ticker-info'
+            )
+        return _executor
+
+
+def set_info_executor(executor: Optional[ThreadPoolExecutor]):
+    """Replace the info thread pool (None creates a new one from settings when next needed)"""
+    global _executor
+    with _executor_lock:
+        _executor = executor
+
+
+def submit_info(symbol: str) -> Future:
+    """
+    Future of the provider's info for ``symbol``. Callers asking while a call
+    for the symbol is already queued or running get that call's future.
+    """
+    with _inflight_lock:
+        future = _inflight.get(symbol)
+        if future is not None:
+            return future
+        future = get_info_executor().submit(get_provider().get_info, symbol)
+        _inflight[symbol] = future
+
+    # Outside the lock: a call that already finished runs the callback right here
+    future.add_done_callback(lambda done: _finish(symbol, done))
+    return future
+
+
+def _finish(symbol: str, future: Future):
+    with _inflight_lock:
+        if _inflight.get(symbol) is future:
+            del _inflight[symbol]
+
+
+async def fetch_info(symbol: str, timeout: Optional[float] = None) -> Optional[Dict]:
+    """
+    Provider info for ``symbol`` ({} when unknown), or None when the call
+    failed or did not finish within ``timeout`` seconds (TICKER_INFO_TIMEOUT
+    by default).
+
+    A call that times out keeps its pool thread until the provider returns,
+    and later requests for the symbol wait on it instead of starting another.
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'TICKER_INFO_TIMEOUT', 5)
+
+    # Shielded, so a caller timing out never cancels a call other callers share
+    future = asyncio.wrap_future(submit_info(symbol))
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Info lookup for {symbol} timed out after {timeout}s")
+        return None
+    except Exception as e:
+        logger.warning(f"Info lookup for {symbol} failed: {str(e)}")
+        return None
+
+
+async def fetch_infos(symbols: Iterable[str], timeout: Optional[float] = None) -> Dict[str, Optional[Dict]]:
+    """Provider info of every symbol, looked up concurrently (see ``fetch_info``)"""
+    symbols = list(dict.fromkeys(symbols))
+    results = await asyncio.gather(*(fetch_info(symbol, timeout) for symbol in symbols))
+    return dict(zip(symbols, results))
@@ -0,0 +1,297 @@
+"""
+Walk-Forward Optimization for AlgoAnchor
+Splits a strategy's history into rolling train/test windows, picks the best
+lookback/entry threshold on each train window and evaluates it on the test
+window that follows, with folds running in parallel processes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import logging
+import time
+
+import numpy as np
+from django.db import connections, transaction
+
+from core.services.backtest_engine import RANK_METRICS, BacktestEngine
+from core.services.metrics import PerformanceAccumulator
+from core.services.portfolio import PricePanel, aggregate_returns, portfolio_weights
+from core.services.position_engine import mean_reversion_signals, mean_reversion_positions
+from core.services.rolling import RollingWindowStats
+
+logger = logging.getLogger(__name__)
+
+
+class WalkForwardContext:
+    """
+    Everything a fold needs, computed once for the whole history: the aligned
+    panel arrays plus z-scores and weights for every lookback in the grid.
+
+    Z-scores only look back, so a window slices them from the full-history
+    arrays instead of recomputing rolling statistics for each overlapping
+    window (and starts with warm indicators).
+    """
+
+    def __init__(self, panel: PricePanel, lookbacks: List[int], weighting='equal'):
+        self.dates = panel.dates
+        self.symbols = panel.symbols
+        self.closes = panel.closes
+        self.returns = panel.returns
+        self.active = panel.active
+
+        stats = RollingWindowStats(panel.closes)
+        self.z_scores = {lookback: stats.z_score(lookback) for lookback in lookbacks}
+        self.weights = {
+            lookback: portfolio_weights(panel, weighting, lookback) for lookback in lookbacks
+        }
+
+    def evaluate(self, lookback: int, entry_threshold: float, lo: int, hi: int) -> Tuple[Dict, PerformanceAccumulator]:
+        """
+        Metrics of one parameter pair traded over rows ``[lo, hi)``, starting
+        flat, and the accumulator holding the window's daily returns.
+        """
+        z_scores = self.z_scores[lookback][lo:hi]
+        positions = mean_reversion_positions(
+            mean_reversion_signals(z_scores, entry_threshold, entry_threshold * 0.5)
+        )
+        returns = self.returns[lo:hi]
+        active = self.active[lo:hi]
+
+        # Yesterday's position earns today's return; the window opens flat
+        strategy_returns = np.where(active, 0.0, np.nan)
+        strategy_returns[1:] = returns[1:] * positions[:-1]
+
+        engine = BacktestEngine(strategy=None)
+        dates = self.dates[lo:hi]
+        closes = self.closes[lo:hi]
+        trades = []
+        for column, symbol in enumerate(self.symbols):
+            observed = ~np.isnan(closes[:, column])
+            trades.extend(engine._trades_from_arrays(
+                symbol, None, dates[observed], closes[observed, column],
+                positions[observed, column], z_scores[observed, column]
+            ))
+
+        weights = self.weights[lookback][lo:hi]
+        accumulator = PerformanceAccumulator()
+        metrics = engine._calculate_performance_metrics(
+            aggregate_returns(strategy_returns, weights, active),
+            aggregate_returns(returns, weights, active),
+            trades,
+            accumulator
+        )
+        metrics.pop('trade_log', None)
+        return metrics, accumulator
+
+
+def fold_windows(length: int, train_bars: int, test_bars: int, warmup: int = 0) -> List[Tuple[int, int, int]]:
+    """
+    Row ranges ``(train_start, test_start, test_end)`` of rolling folds.
+
+    Train windows hold ``train_bars`` rows and are followed by ``test_bars``
+    test rows; the windows step forward by one test window, so test windows
+    tile the history without overlap. The first ``warmup`` rows are skipped
+    so every window starts with defined indicators.
+    """
+    folds = []
+    train_start = warmup
+    while train_start + train_bars + test_bars <= length:
+        test_start = train_start + train_bars
+        folds.append((train_start, test_start, test_start + test_bars))
+        train_start += test_bars
+    return folds
+
+
+def _score(metrics: Dict, rank_by: str) -> float:
+    value = metrics.get(rank_by)
+    return value if value is not None and np.isfinite(value) else -np.inf
+
+
+def run_fold(context: WalkForwardContext, fold: Tuple[int, int, int],
+             grid: List[Tuple[int, float]], rank_by: str) -> Dict:
+    """Optimize on a fold's train window and evaluate the winner on its test window"""
+    train_start, test_start, test_end = fold
+
+    best, best_score = None, -np.inf
+    for lookback, entry_threshold in grid:
+        metrics, _ = context.evaluate(lookback, entry_threshold, train_start, test_start)
+        score = _score(metrics, rank_by)
+        if best is None or score > best_score:
+            best, best_score = (lookback, entry_threshold), score
+
+    test_metrics, accumulator = context.evaluate(best[0], best[1], test_start, test_end)
+    return {
+        'train_start': context.dates[train_start].date(),
+        'train_end': context.dates[test_start - 1].date(),
+        'test_start': context.dates[test_start].date(),
+        'test_end': context.dates[test_end - 1].date(),
+        'lookback_days': best[0],
+        'entry_threshold': best[1],
+        'train_score': best_score if np.isfinite(best_score) else None,
+        'test_metrics': test_metrics,
+        'accumulator': accumulator.to_dict(),
+    }
+
+
+_context = None
+
+
+def _init_fold_worker(context: WalkForwardContext):
+    """Prepare a pool process: set up Django and keep the shared context for every fold"""
+    global _context
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+    _context = context
+
+
+def _run_fold_in_worker(fold, grid, rank_by) -> Dict:
+    return run_fold(_context, fold, grid, rank_by)
+
+
+def summarize_folds(folds: List[Dict], rank_by: str) -> Dict:
+    """
+    Fold statistics plus metrics of the stitched out-of-sample return series
+    (the test windows merged in time order).
+    """
+    if not folds:
+        return {}
+
+    stitched = PerformanceAccumulator()
+    for fold in folds:
+        stitched.merge(PerformanceAccumulator.from_dict(fold['accumulator']))
+
+    train_scores = [fold['train_score'] for fold in folds if fold['train_score'] is not None]
+    test_scores = [
+        fold['test_metrics'][rank_by] for fold in folds
+        if fold['test_metrics'].get(rank_by) is not None
+    ]
+    mean_train = float(np.mean(train_scores)) if train_scores else None
+    mean_test = float(np.mean(test_scores)) if test_scores else None
+
+    parameters = {}
+    for fold in folds:
+        key = f"{fold['lookback_days']}/{fold['entry_threshold']:g}"
+        parameters[key] = parameters.get(key, 0) + 1
+
+    return {
+        'folds': len(folds),
+        'out_of_sample': {key: float(value) for key, value in stitched.metrics().items()},
+        'mean_train_score': mean_train,
+        'mean_test_score': mean_test,
+        # Share of the in-sample score kept out of sample
+        'efficiency': mean_test / mean_train if mean_train and mean_test is not None and mean_train > 0 else None,
+        'profitable_folds': sum(
+            1 for fold in folds if fold['test_metrics'].get('cumulative_return', 0) > 0
+        ),
+        'parameters': parameters,
+    }
+
+
+def run_walk_forward(strategy, grid: List[Tuple[int, float]], train_bars: int = 504,
+                     test_bars: int = 126, days: int = 3650, rank_by: str = 'sharpe_ratio',
+                     workers: int = 1, weighting='equal') -> Dict:
+    """
+    Walk-forward optimization of a strategy's tickers over ``days`` calendar
+    days of history. Returns the per-fold results and their summary, or {}
+    when there is not enough data for a single fold. ``rank_by`` must be one
+    of RANK_METRICS (ValueError otherwise).
+    """
+    if rank_by not in RANK_METRICS:
+        raise ValueError(f"Unknown ranking metric '{rank_by}' (choose from {', '.join(RANK_METRICS)})")
+    if not grid:
+        return {}
+
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
+    engine = BacktestEngine(strategy)
+    if not engine.fetch_data(start_date, end_date):
+        logger.error(f"Failed to fetch data for walk-forward run of strategy {strategy.name}")
+        return {}
+
+    lookbacks = sorted({lookback for lookback, _ in grid})
+    panel = engine.build_panel(max(lookbacks))
+    if panel is None:
+        return {}
+
+    start = time.perf_counter()
+    context = WalkForwardContext(panel, lookbacks, weighting)
+    windows = fold_windows(len(panel), train_bars, test_bars, warmup=max(lookbacks))
+    if not windows:
+        logger.warning(
+            f"Not enough history for a {train_bars}+{test_bars} bar fold "
+            f"({len(panel)} bars) for strategy {strategy.name}"
+        )
+        return {}
+
+    if workers > 1 and len(windows) > 1:
+        # Forked workers must not share the parent's database connection
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(windows)),
+            initializer=_init_fold_worker,
+            initargs=(context,)
+        ) as pool:
+            folds = list(pool.map(
+                _run_fold_in_worker, windows, [grid] * len(windows), [rank_by] * len(windows)
+            ))
+    else:
+        folds = [run_fold(context, window, grid, rank_by) for window in windows]
+
+    seconds = time.perf_counter() - start
+    logger.info(
+        f"Walk-forward run for {strategy.name}: {len(folds)} folds x {len(grid)} "
+        f"combinations in {seconds:.2f}s"
+    )
+
+    return {
+        'folds': folds,
+        'summary': summarize_folds(folds, rank_by),
+        'start_date': panel.dates[0].date(),
+        'end_date': panel.dates[-1].date(),
+        'seconds': seconds,
+    }
+
+
+def save_walk_forward(strategy, results: Dict, grid: List[Tuple[int, float]], train_bars: int,
+                      test_bars: int, rank_by: str = 'sharpe_ratio'):
+    """Store a walk-forward run with one row per fold"""
+    from core.models import WalkForwardFold, WalkForwardRun
+
+    with transaction.atomic():
+        run = WalkForwardRun.objects.create(
+            strategy=strategy,
+            train_days=train_bars,
+            test_days=test_bars,
+            lookbacks=sorted({lookback for lookback, _ in grid}),
+            thresholds=sorted({threshold for _, threshold in grid}),
+            rank_by=rank_by,
+            start_date=results.get('start_date'),
+            end_date=results.get('end_date'),
+            summary=results.get('summary', {}),
+            seconds=results.get('seconds', 0.0),
+        )
+        WalkForwardFold.objects.bulk_create([
+            WalkForwardFold(
+                run=run,
+                index=index,
+                train_start=fold['train_start'],
+                train_end=fold['train_end'],
+                test_start=fold['test_start'],
+                test_end=fold['test_end'],
+                lookback_days=fold['lookback_days'],
+                entry_threshold=fold['entry_threshold'],
+                train_score=fold['train_score'],
+                cumulative_return=fold['test_metrics'].get('cumulative_return'),
+                sharpe_ratio=fold['test_metrics'].get('sharpe_ratio'),
+                max_drawdown=fold['test_metrics'].get('max_drawdown'),
+                total_trades=fold['test_metrics'].get('total_trades', 0),
+                test_metrics={key: float(value) for key, value in fold['test_metrics'].items()},
+            )
+            for index, fold in enumerate(results.get('folds', []), 1)
+        ])
+    return run
@@ -0,0 +1,46 @@
+// Polls backtest job status for elements marked with .backtest-job-status
+// and reloads the page once a queued or running backtest has finished.
+document.addEventListener("DOMContentLoaded", function () {
+  var POLL_INTERVAL_MS = 3000;
+
+  function describe(status) {
+    if (status.status === "RUNNING") {
+      var percent = Math.round((status.progress || 0) * 100);
+      return "Running" + (status.stage ? " (" + status.stage.replace(/_/g, " ") + ")" : "") + " " + percent + "%";
+    }
+    if (status.status === "QUEUED") {
+      return "Queued";
+    }
+    if (status.status === "FAILED") {
+      return "Failed";
+    }
+    return "Done";
+  }
+
+  document.querySelectorAll(".backtest-job-status[data-active='true']").forEach(function (element) {
+    var url = element.dataset.statusUrl;
+    var label = element.querySelector(".backtest-job-label") || element;
+
+    var timer = setInterval(function () {
+      fetch(url, { credentials: "same-origin" })
+        .then(function (response) {
+          return response.json();
+        })
+        .then(function (status) {
+          label.textContent = describe(status);
+          if (!status.active) {
+            clearInterval(timer);
+            if (status.status === "DONE") {
+              window.location.reload();
+            } else {
+              element.classList.remove("bg-secondary", "bg-info", "alert-info");
+              element.classList.add(element.classList.contains("alert") ? "alert-danger" : "bg-danger");
+            }
+          }
+        })
+        .catch(function () {
+          clearInterval(timer);
+        });
+    }, POLL_INTERVAL_MS);
+  });
+});
@@ -0,0 +1,1199 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from io import StringIO
+from types import SimpleNamespace
+import tempfile
+import threading
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.benchmarks.synthetic import synthetic_prices, synthetic_symbols
+from core.models import BacktestJob, BacktestResult, PriceData, Security, Strategy, TradeLog
+from core.services.backtest_engine import LEG_COLUMNS, BacktestEngine, build_sweep_grid, run_incremental_backtest
+from core.services.indicator_cache import rolling_indicators
+from core.services.batch_plan import BacktestPlan
+from core.services.bootstrap import (
+    BOOTSTRAP_METRICS, bootstrap_confidence_intervals, resampled_metrics, stationary_bootstrap_indices
+)
+from core.services.chart_data import get_chart_frame
+from core.services.job_queue import claim_next_job, enqueue_backtest, requeue_stale_jobs, run_job
+from core.services.market_data import (
+    FixtureMarketDataProvider, MarketDataProvider, YahooMarketDataProvider, set_provider
+)
+from core.services.metrics import PerformanceAccumulator, QuantileSketch, RunningCovariance
+from core.services.pairs import PairMoments, RollingRegression, pair_returns, screen_pairs
+from core.services.price_arrays import get_array_store
+from core.services.price_cache import PriceCache
+from core.services.price_store import (
+    get_price_histories, load_security_prices, missing_ranges, refresh_stale_price_arrays, sync_prices_batch,
+)
+from core.services.portfolio import PricePanel, aggregate_returns, portfolio_weights
+from core.services.position_engine import loop_positions, mean_reversion_positions, mean_reversion_signals
+from core.services.result_writer import RESULT_FIELDS, COUNT_FIELDS, advance_backtest_results, save_backtest_results
+from core.services.rolling import RollingWindowStats
+from core.services.series_store import load_series
+from core.services.ticker_info import fetch_info, fetch_infos, set_info_executor
+from core.services.walk_forward import WalkForwardContext, fold_windows, run_fold, summarize_folds
+
+# The default cache is file based; tests keep every cache in memory
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'algoanchor-tests'},
+    'prices': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'algoanchor-tests-prices'},
+}
+
+
+def pandas_signals(z_scores, entry_threshold, exit_threshold):
+    """Signal rules as the original per-symbol pandas implementation applied them"""
+    data = pd.DataFrame({'Z_Score': z_scores})
+    data['Signal'] = 0
+    data.loc[data['Z_Score'] < -entry_threshold, 'Signal'] = 1
+    data.loc[data['Z_Score'] > entry_threshold, 'Signal'] = -1
+    data.loc[data['Z_Score'].abs() < exit_threshold, 'Signal'] = 0
+    return data['Signal'].to_numpy()
+
+
+def random_z_scores(rng, length, entry_threshold, exit_threshold):
+    """Random z-scores with NaN runs and values exactly on the thresholds"""
+    z_scores = rng.normal(0, 1.5, length)
+    for _ in range(5):
+        start = rng.integers(0, length)
+        z_scores[start:start + rng.integers(1, 30)] = np.nan
+    ties = rng.choice(length, size=length // 10, replace=False)
+    z_scores[ties] = rng.choice(
+        [entry_threshold, -entry_threshold, exit_threshold, -exit_threshold], size=len(ties)
+    )
+    return z_scores
+
+
+class MeanReversionPositionTests(SimpleTestCase):
+    entry_threshold = 1.5
+    exit_threshold = 0.75
+
+    def test_signals_match_pandas_rules(self):
+        rng = np.random.default_rng(1)
+        for _ in range(20):
+            z_scores = random_z_scores(rng, 500, self.entry_threshold, self.exit_threshold)
+            np.testing.assert_array_equal(
+                mean_reversion_signals(z_scores, self.entry_threshold, self.exit_threshold),
+                pandas_signals(z_scores, self.entry_threshold, self.exit_threshold)
+            )
+
+    def test_positions_match_loop_state_machine(self):
+        rng = np.random.default_rng(2)
+        for _ in range(20):
+            z_scores = random_z_scores(rng, 500, self.entry_threshold, self.exit_threshold)
+            signals = mean_reversion_signals(z_scores, self.entry_threshold, self.exit_threshold)
+            expected = loop_positions(pd.DataFrame({'Signal': signals})).to_numpy()
+            np.testing.assert_array_equal(mean_reversion_positions(signals), expected)
+
+    def test_column_wise_positions_match_each_column(self):
+        rng = np.random.default_rng(3)
+        z_scores = np.column_stack([
+            random_z_scores(rng, 300, self.entry_threshold, self.exit_threshold) for _ in range(6)
+        ])
+        signals = mean_reversion_signals(z_scores, self.entry_threshold, self.exit_threshold)
+        positions = mean_reversion_positions(signals)
+        for column in range(signals.shape[1]):
+            np.testing.assert_array_equal(positions[:, column], mean_reversion_positions(signals[:, column]))
+
+    def test_edge_cases(self):
+        np.testing.assert_array_equal(mean_reversion_positions(np.array([], dtype=np.int64)), [])
+        # Opposite signals inside a run keep the run's first position
+        np.testing.assert_array_equal(mean_reversion_positions([1, -1, -1, 0, -1, 1, 0]), [1, 1, 1, 0, -1, -1, 0])
+
+
+class RollingWindowStatsTests(SimpleTestCase):
+    def test_matches_pandas_rolling(self):
+        rng = np.random.default_rng(4)
+        prices = 100 + np.cumsum(rng.normal(0, 1, (400, 3)), axis=0)
+        prices[:37, 1] = np.nan
+        stats = RollingWindowStats(prices)
+        frame = pd.DataFrame(prices)
+        for window in (2, 5, 20, 60):
+            rolling = frame.rolling(window)
+            np.testing.assert_allclose(stats.mean(window), rolling.mean().to_numpy(), rtol=1e-10)
+            np.testing.assert_allclose(stats.std(window), rolling.std().to_numpy(), rtol=1e-8, atol=1e-8)
+
+    def test_flat_windows_have_zero_std_and_undefined_z_score(self):
+        rng = np.random.default_rng(5)
+        prices = 5000 + np.cumsum(rng.normal(0, 25, 300))
+        # Forward-filled stretch, e.g. a suspended listing
+        prices[100:160] = prices[99]
+        stats = RollingWindowStats(prices)
+        expected_std = pd.Series(prices).rolling(20).std().to_numpy()
+        std = stats.std(20)
+        z_scores = stats.z_score(20)
+
+        flat = slice(119, 160)
+        np.testing.assert_array_equal(std[flat], 0.0)
+        self.assertTrue(np.isnan(z_scores[flat]).all())
+        np.testing.assert_allclose(std[200:], expected_std[200:], rtol=1e-8, atol=1e-8)
+        self.assertTrue(np.isfinite(z_scores[200:]).all())
+
+
+class SweepGridTests(SimpleTestCase):
+    def test_cartesian_product(self):
+        self.assertEqual(build_sweep_grid([10, 20], [1.5]), [(10, 1.5), (20, 1.5)])
+
+    def test_rejects_lookbacks_below_two(self):
+        with self.assertRaises(ValueError):
+            build_sweep_grid([1, 20], [1.5])
+
+
+def close_frame(dates, closes):
+    return pd.DataFrame({'Close': closes}, index=pd.DatetimeIndex(dates))
+
+
+class PricePanelTests(SimpleTestCase):
+    def setUp(self):
+        # AAA trades every day; BBB skips the 3rd (a holiday on its exchange),
+        # lists late on the 2nd and stops after the 5th
+        self.panel = PricePanel({
+            'AAA': close_frame(['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05',
+                                '2024-01-08'], [100.0, 101.0, 102.0, 103.0, 104.0, 105.0]),
+            'BBB': close_frame(['2024-01-02', '2024-01-04', '2024-01-05'], [50.0, 55.0, 44.0]),
+        })
+
+    def test_aligns_on_union_of_calendars(self):
+        self.assertEqual(list(self.panel.dates.strftime('%m-%d')), ['01-01', '01-02', '01-03', '01-04', '01-05', '01-08'])
+        np.testing.assert_array_equal(self.panel.rows['BBB'], [1, 3, 4])
+        np.testing.assert_array_equal(self.panel.closes[:, 0], [100, 101, 102, 103, 104, 105])
+
+    def test_forward_fills_only_inside_each_symbols_span(self):
+        # NaN before the listing and after the last bar, filled across the gap
+        np.testing.assert_array_equal(self.panel.closes[:, 1], [np.nan, 50, 50, 55, 44, np.nan])
+        np.testing.assert_allclose(self.panel.returns[:, 1], [np.nan, np.nan, 0.0, 0.1, -0.2, np.nan])
+        np.testing.assert_array_equal(self.panel.active[:, 1], [False, False, True, True, True, False])
+
+    def test_strategy_returns_use_previous_position(self):
+        positions = np.array([[1, 0], [1, -1], [0, -1], [-1, 1], [-1, 1], [0, 0]], dtype=np.float64)
+        strategy_returns = self.panel.strategy_returns(positions)
+        np.testing.assert_allclose(strategy_returns[1:, 0], self.panel.returns[1:, 0] * positions[:-1, 0])
+        np.testing.assert_allclose(strategy_returns[:, 1], [np.nan, np.nan, -0.0, -0.1, -0.2, np.nan])
+
+    def test_equal_weights_renormalize_over_trading_symbols(self):
+        weights = portfolio_weights(self.panel, 'equal')
+        combined = aggregate_returns(self.panel.returns, weights, self.panel.active)
+        aaa = self.panel.returns[:, 0]
+        bbb = self.panel.returns[:, 1]
+        expected = [0.0, aaa[1], (aaa[2] + bbb[2]) / 2, (aaa[3] + bbb[3]) / 2, (aaa[4] + bbb[4]) / 2, aaa[5]]
+        np.testing.assert_allclose(combined, expected)
+
+    def test_custom_weights(self):
+        weights = portfolio_weights(self.panel, {'AAA': 3, 'BBB': 1, 'CCC': 5})
+        combined = aggregate_returns(self.panel.returns, weights, self.panel.active)
+        aaa = self.panel.returns[:, 0]
+        bbb = self.panel.returns[:, 1]
+        self.assertAlmostEqual(combined[3], 0.75 * aaa[3] + 0.25 * bbb[3])
+        # Only AAA trades on the last day, so it carries the whole weight
+        self.assertAlmostEqual(combined[5], aaa[5])
+        # A symbol without weight contributes nothing, even when it is the only one trading
+        weights = portfolio_weights(self.panel, {'BBB': 1})
+        self.assertEqual(aggregate_returns(self.panel.returns, weights, self.panel.active)[5], 0.0)
+
+    def test_inverse_volatility_weights(self):
+        rng = np.random.default_rng(6)
+        dates = pd.bdate_range('2023-01-02', periods=120)
+        calm = 100 * np.cumprod(1 + rng.normal(0, 0.005, 120))
+        wild = 100 * np.cumprod(1 + rng.normal(0, 0.02, 80))
+        panel = PricePanel({
+            'CALM': close_frame(dates, calm),
+            'WILD': close_frame(dates[40:], wild),
+        })
+        weights = portfolio_weights(panel, 'inverse_volatility', lookback=20)
+
+        # Known at the previous close: trailing std of the returns up to yesterday
+        expected = 1 / pd.Series(panel.returns[:, 0]).rolling(20).std().shift(1).to_numpy()
+        np.testing.assert_allclose(weights[30:, 0], expected[30:], rtol=1e-8)
+        # Before the late listing has an estimate it gets the others' average weight
+        np.testing.assert_allclose(weights[45:61, 1], weights[45:61, 0])
+        self.assertTrue((weights[80:, 1] < weights[80:, 0]).all())
+
+        combined = aggregate_returns(panel.returns, weights, panel.active)
+        row = 100
+        share = weights[row] / weights[row].sum()
+        self.assertAlmostEqual(combined[row], share @ panel.returns[row])
+        np.testing.assert_allclose(combined[21:41], panel.returns[21:41, 0])
+
+
+@override_settings(CACHES=TEST_CACHES, PRICE_CACHE_MAX_BYTES=0, PRICE_ARRAY_DIR='')
+class IncrementalBacktestTests(TestCase):
+    def setUp(self):
+        symbols = synthetic_symbols(3)
+        set_provider(FixtureMarketDataProvider(synthetic_prices(symbols, 300)))
+        self.addCleanup(set_provider, None)
+
+        user = User.objects.create_user('tester', 'tester@example.com', 'tester')
+        self.strategy = Strategy.objects.create(
+            user=user, name='Mean reversion', lookback_days=20, entry_threshold=1.0, exit_rule='mean_revert'
+        )
+        self.strategy.tickers.set([Security.objects.create(symbol=symbol, name=symbol) for symbol in symbols])
+        self.end = datetime.combine(datetime.now().date(), datetime.min.time())
+        self.start = self.end - timedelta(days=250)
+
+    def run_full(self, end):
+        engine = BacktestEngine(self.strategy)
+        self.assertTrue(engine.fetch_data(self.start, end))
+        results = engine.run_strategy()
+        results['backtest_start_date'] = self.start.date()
+        results['backtest_end_date'] = end.date()
+        return engine, results
+
+    def stored(self):
+        backtest_result = BacktestResult.objects.get(strategy=self.strategy)
+        trades = sorted(TradeLog.objects.filter(backtest_result=backtest_result).values_list(
+            'security__symbol', 'trade_type', 'date', 'price', 'quantity', 'commission'
+        ))
+        return backtest_result, trades, load_series(backtest_result)
+
+    def boundary_with_open_position(self, engine):
+        """A date in the second half on which a position was held since the previous bar"""
+        for symbol, data in engine.data.items():
+            held = (data['Position'] != 0) & (data['Position'].shift(1) != 0)
+            dates = data.index[held & (data.index > data.index[len(data) // 2])]
+            if len(dates):
+                return dates[0].to_pydatetime()
+        self.fail('No position is held in the second half of the synthetic history')
+
+    def test_advancing_matches_full_rerun(self):
+        engine, _ = self.run_full(self.end)
+        boundary = self.boundary_with_open_position(engine)
+
+        _, partial = self.run_full(boundary)
+        self.assertTrue(any(partial['engine_state']['positions']))
+        save_backtest_results(self.strategy, partial)
+
+        advanced = run_incremental_backtest(self.strategy, end_date=self.end)
+        self.assertTrue(advanced['incremental'])
+        self.assertGreater(advanced['new_bars'], 0)
+        advance_backtest_results(self.strategy, advanced)
+        advanced_result, advanced_trades, advanced_series = self.stored()
+
+        _, full = self.run_full(self.end)
+        save_backtest_results(self.strategy, full)
+        full_result, full_trades, full_series = self.stored()
+
+        for field in RESULT_FIELDS:
+            expected = getattr(full_result, field)
+            if isinstance(expected, float):
+                self.assertAlmostEqual(getattr(advanced_result, field), expected, places=9, msg=field)
+            else:
+                self.assertEqual(getattr(advanced_result, field), expected, field)
+        for field in COUNT_FIELDS:
+            self.assertEqual(getattr(advanced_result, field), getattr(full_result, field), field)
+        self.assertEqual(advanced_trades, full_trades)
+        # The running accumulators only differ by rounding, which the metrics above cover
+        advanced_state = {**advanced_result.engine_state, 'metrics': None}
+        self.assertEqual(advanced_state, {**full_result.engine_state, 'metrics': None})
+
+        np.testing.assert_array_equal(advanced_series['dates'], full_series['dates'])
+        for name in ('strategy_returns', 'benchmark_returns'):
+            np.testing.assert_allclose(advanced_series[name], full_series[name], rtol=1e-12, atol=1e-15)
+
+
+def reference_metrics(returns, benchmark_returns):
+    """Return metrics as the original in-memory implementation computed them"""
+    equity = np.cumprod(1 + returns)
+    running_max = np.maximum.accumulate(equity)
+    downside = returns[returns < 0]
+    volatility = np.std(returns) * np.sqrt(252)
+    downside_deviation = np.std(downside) * np.sqrt(252) if len(downside) else 0
+    return {
+        'cumulative_return': np.prod(1 + returns) - 1,
+        'volatility': volatility,
+        'sharpe_ratio': np.mean(returns) * 252 / volatility if volatility > 0 else 0,
+        'sortino_ratio': np.mean(returns) * 252 / downside_deviation if downside_deviation > 0 else 0,
+        'max_drawdown': np.min((equity - running_max) / running_max),
+        'benchmark_return': np.prod(1 + benchmark_returns) - 1,
+        # Sample covariance over population variance, as the original did
+        'beta': np.cov(returns, benchmark_returns)[0, 1] / np.var(benchmark_returns),
+    }
+
+
+class PerformanceAccumulatorTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.benchmark = rng.normal(0.0004, 0.012, 1000)
+        self.returns = 0.6 * self.benchmark + rng.normal(0.0001, 0.01, 1000)
+        # A deep drawdown that starts in one partition and bottoms out in the next
+        self.returns[400:460] = -0.01
+        self.returns[::37] = 0.0
+
+    def assert_matches_reference(self, metrics, returns, benchmark_returns):
+        for name, expected in reference_metrics(returns, benchmark_returns).items():
+            self.assertAlmostEqual(metrics[name], expected, delta=1e-10 * max(1.0, abs(expected)), msg=name)
+
+    def test_single_pass_matches_reference(self):
+        metrics = PerformanceAccumulator().update(self.returns, self.benchmark).metrics()
+        self.assert_matches_reference(metrics, self.returns, self.benchmark)
+
+    def test_chunked_updates_match_reference(self):
+        metrics = PerformanceAccumulator().update_chunked(self.returns, self.benchmark, chunk_size=33).metrics()
+        self.assert_matches_reference(metrics, self.returns, self.benchmark)
+
+    def test_merged_partitions_match_reference(self):
+        for bounds in ([430], [100, 430, 431, 999], [1]):
+            edges = [0] + bounds + [len(self.returns)]
+            merged = PerformanceAccumulator()
+            for start, end in zip(edges, edges[1:]):
+                partition = PerformanceAccumulator().update(self.returns[start:end], self.benchmark[start:end])
+                # Partitions are stored as JSON between incremental runs
+                merged.merge(PerformanceAccumulator.from_dict(partition.to_dict()))
+            self.assert_matches_reference(merged.metrics(), self.returns, self.benchmark)
+            self.assertEqual(merged.quantiles.to_dict(), PerformanceAccumulator().update(
+                self.returns, self.benchmark).quantiles.to_dict())
+
+    def test_drawdown_after_recovery_and_new_peak(self):
+        returns = np.array([0.1, -0.2, 0.3, 0.05, -0.1, -0.1, 0.02, -0.3, 0.5])
+        for split in range(1, len(returns)):
+            accumulator = PerformanceAccumulator().update(returns[:split], returns[:split])
+            accumulator.merge(PerformanceAccumulator().update(returns[split:], returns[split:]))
+            self.assert_matches_reference(accumulator.metrics(), returns, returns)
+
+    def test_beta_mixes_sample_covariance_and_population_variance(self):
+        returns = np.array([0.01, -0.02, 0.015, 0.0, 0.03])
+        benchmark_returns = np.array([0.005, -0.01, 0.02, -0.005, 0.01])
+        covariance = RunningCovariance().update(returns[:2], benchmark_returns[:2])
+        covariance.merge(RunningCovariance().update(returns[2:], benchmark_returns[2:]))
+        self.assertAlmostEqual(covariance.covariance(ddof=1), np.cov(returns, benchmark_returns)[0, 1])
+        self.assertAlmostEqual(covariance.y.variance(), np.var(benchmark_returns))
+
+        beta = PerformanceAccumulator().update(returns, benchmark_returns).metrics()['beta']
+        self.assertAlmostEqual(beta, np.cov(returns, benchmark_returns)[0, 1] / np.var(benchmark_returns))
+        # The mix is deliberate: it is n / (n - 1) times the textbook beta
+        textbook = np.cov(returns, benchmark_returns)[0, 1] / np.var(benchmark_returns, ddof=1)
+        self.assertAlmostEqual(beta, textbook * 5 / 4)
+
+    def test_single_return(self):
+        metrics = PerformanceAccumulator().update([0.02], [0.01]).metrics()
+        self.assertAlmostEqual(metrics['cumulative_return'], 0.02)
+        self.assertEqual(metrics['beta'], 1)
+        self.assertEqual(PerformanceAccumulator().metrics(), {})
+
+
+class QuantileSketchTests(SimpleTestCase):
+    def test_quantiles_within_relative_error(self):
+        rng = np.random.default_rng(8)
+        values = np.concatenate([rng.normal(0, 0.02, 5000), rng.standard_t(3, 2000) * 0.01, np.zeros(50)])
+        alpha = 0.005
+        sketch = QuantileSketch(alpha)
+        for chunk in np.array_split(rng.permutation(values), 7):
+            sketch.merge(QuantileSketch(alpha).update(chunk))
+
+        ordered = np.sort(values)
+        for q in np.linspace(0, 1, 101):
+            expected = ordered[int(q * (len(values) - 1))]
+            bound = alpha * abs(expected) + QuantileSketch.MIN_VALUE
+            self.assertLessEqual(abs(sketch.quantile(q) - expected), bound, msg=f'q={q:.2f}')
+
+    def test_value_at_risk_close_to_percentile(self):
+        rng = np.random.default_rng(9)
+        returns = rng.normal(0.0005, 0.015, 2520)
+        var_95 = PerformanceAccumulator().update(returns, returns).metrics()['value_at_risk_95']
+        expected = np.percentile(returns, 5)
+        # Rank rounding plus the sketch's relative error
+        gap = np.diff(np.sort(returns))[int(0.05 * 2519)]
+        self.assertLessEqual(abs(var_95 - expected), 0.005 * abs(expected) + gap)
+
+    def test_ignores_nan_and_handles_empty(self):
+        sketch = QuantileSketch().update([np.nan, 0.01, np.nan])
+        self.assertEqual(sketch.count, 1)
+        self.assertAlmostEqual(sketch.quantile(0.5), 0.01, delta=0.01 * sketch.alpha)
+        self.assertEqual(QuantileSketch().quantile(0.05), 0.0)
+
+
+@override_settings(CACHES=TEST_CACHES, LEG_CACHE_ALIAS='default', INDICATOR_CACHE_MAX_BYTES=0)
+class BootstrapTests(SimpleTestCase):
+    def setUp(self):
+        self.returns = np.random.default_rng(12).normal(0.0004, 0.012, 500)
+
+    def test_same_seed_gives_identical_intervals(self):
+        first = bootstrap_confidence_intervals(self.returns, resamples=300, seed=7, batch_size=128)
+        self.assertEqual(bootstrap_confidence_intervals(self.returns, resamples=300, seed=7, batch_size=128), first)
+        self.assertNotEqual(bootstrap_confidence_intervals(self.returns, resamples=300, seed=8)['metrics'],
+                            first['metrics'])
+
+    def test_point_estimates_match_accumulator(self):
+        metrics = PerformanceAccumulator().update(self.returns, self.returns).metrics()
+        intervals = bootstrap_confidence_intervals(self.returns, resamples=50, seed=1)['metrics']
+        for metric in BOOTSTRAP_METRICS:
+            self.assertAlmostEqual(intervals[metric]['estimate'], metrics[metric], places=9, msg=metric)
+            self.assertLessEqual(intervals[metric]['lower'], intervals[metric]['upper'], metric)
+
+        identity = resampled_metrics(self.returns, np.arange(len(self.returns))[np.newaxis, :])
+        for metric in BOOTSTRAP_METRICS:
+            self.assertAlmostEqual(identity[metric][0], metrics[metric], places=9, msg=metric)
+
+    def test_blocks_wrap_around_the_series(self):
+        # Blocks far longer than the series: every row is one block wrapped at the end
+        indices = stationary_bootstrap_indices(np.random.default_rng(3), 10, 20, 1e9)
+        for row in indices:
+            np.testing.assert_array_equal(row, (row[0] + np.arange(10)) % 10)
+        self.assertGreater(len(set(indices[:, 0])), 1)
+
+    def test_mean_block_length(self):
+        length, block_length = 500, 8.0
+        indices = stationary_bootstrap_indices(np.random.default_rng(4), length, 400, block_length)
+        self.assertTrue(((indices >= 0) & (indices < length)).all())
+
+        # A block continues on the next row (wrapping); anything else starts a new one
+        continues = indices[:, 1:] == (indices[:, :-1] + 1) % length
+        blocks = indices.shape[0] + np.count_nonzero(~continues)
+        self.assertAlmostEqual(indices.size / blocks, block_length, delta=0.05 * block_length)
+
+    def test_short_series_has_no_intervals(self):
+        self.assertEqual(bootstrap_confidence_intervals([0.01]), {})
+        self.assertEqual(bootstrap_confidence_intervals([0.01, np.nan]), {})
+
+
+class LegCacheTests(SimpleTestCase):
+    lookback = 20
+
+    def setUp(self):
+        caches['default'].clear()
+        self.prices = synthetic_prices(synthetic_symbols(3), 300)
+        self.strategy = SimpleNamespace(entry_threshold=1.0, exit_rule='mean_revert')
+
+    def panel(self, prices=None):
+        return PricePanel({symbol: data[['Close']] for symbol, data in (prices or self.prices).items()})
+
+    def legs(self, panel, strategy=None, lookback=None):
+        """Legs and the symbols that had to be computed"""
+        engine = BacktestEngine(strategy or self.strategy)
+        with mock.patch('core.services.backtest_engine.rolling_indicators', wraps=rolling_indicators) as spy:
+            legs = engine.mean_reversion_legs(panel, lookback or self.lookback)
+        return legs, [symbol for call in spy.call_args_list for symbol in call.args[0]]
+
+    def fresh_legs(self, panel, strategy=None, lookback=None):
+        with override_settings(LEG_CACHE_ALIAS=''):
+            return self.legs(panel, strategy, lookback)[0]
+
+    def assert_legs_equal(self, legs, expected):
+        self.assertEqual(sorted(legs), sorted(expected))
+        for symbol, leg in expected.items():
+            self.assertEqual(legs[symbol]['trades'], leg['trades'])
+            for name in LEG_COLUMNS:
+                np.testing.assert_array_equal(legs[symbol][name], leg[name], err_msg=f'{symbol} {name}')
+
+    def test_hit_returns_legs_of_fresh_computation(self):
+        panel = self.panel()
+        _, computed = self.legs(panel)
+        self.assertEqual(computed, panel.symbols)
+
+        legs, computed = self.legs(self.panel())
+        self.assertEqual(computed, [])
+        self.assert_legs_equal(legs, self.fresh_legs(panel))
+
+    def test_changed_parameters_miss(self):
+        panel = self.panel()
+        self.legs(panel)
+        for strategy, lookback in (
+            (SimpleNamespace(entry_threshold=1.5, exit_rule='mean_revert'), None),
+            (SimpleNamespace(entry_threshold=1.0, exit_rule='stop_loss'), None),
+            (None, 30),
+        ):
+            legs, computed = self.legs(panel, strategy, lookback)
+            self.assertEqual(computed, panel.symbols)
+            self.assert_legs_equal(legs, self.fresh_legs(panel, strategy, lookback))
+
+    def test_changed_bar_misses_only_its_symbol(self):
+        self.legs(self.panel())
+        symbol = synthetic_symbols(3)[1]
+        prices = dict(self.prices)
+        prices[symbol] = prices[symbol].copy()
+        prices[symbol].iloc[150, prices[symbol].columns.get_loc('Close')] *= 1.01
+        panel = self.panel(prices)
+
+        legs, computed = self.legs(panel)
+        self.assertEqual(computed, [symbol])
+        self.assert_legs_equal(legs, self.fresh_legs(panel))
+
+
+@override_settings(CACHES=TEST_CACHES, PRICE_CACHE_MAX_BYTES=0, PRICE_ARRAY_DIR='')
+class PriceStoreTests(TestCase):
+    def setUp(self):
+        self.prices = synthetic_prices(['AAA', 'BBB'], 600, end=date(2025, 3, 31))
+        self.provider = FixtureMarketDataProvider(self.prices)
+        set_provider(self.provider)
+        self.addCleanup(set_provider, None)
+        self.security = Security.objects.create(symbol='AAA', name='AAA')
+
+    def stored_dates(self, security):
+        return set(PriceData.objects.filter(security=security).values_list('date', flat=True))
+
+    def test_disjoint_range_fetches_the_gap(self):
+        sync_prices_batch([self.security], date(2024, 1, 1), date(2024, 4, 1))
+        requested = sync_prices_batch([self.security], date(2025, 1, 2), date(2025, 2, 21))
+
+        self.assertEqual(self.provider.calls[-1], (['AAA'], date(2024, 4, 1), date(2025, 2, 21)))
+        self.assertEqual(self.security.price_history_start, date(2024, 1, 1))
+        self.assertEqual(self.security.price_history_end, date(2025, 2, 20))
+        # Everything marked as covered is actually stored
+        expected = {day.date() for day in self.prices['AAA'].loc['2024-01-01':'2025-02-20'].index}
+        self.assertEqual(self.stored_dates(self.security), expected)
+        self.assertEqual(requested['AAA'], len(self.prices['AAA'].loc['2024-04-01':'2025-02-20']))
+
+    def test_disjoint_range_before_the_coverage_fetches_the_gap(self):
+        sync_prices_batch([self.security], date(2025, 1, 2), date(2025, 2, 1))
+        sync_prices_batch([self.security], date(2024, 6, 3), date(2024, 7, 1))
+        self.assertEqual(self.provider.calls[-1], (['AAA'], date(2024, 6, 3), date(2025, 1, 2)))
+        self.assertEqual(missing_ranges(self.security, date(2024, 6, 3), date(2025, 2, 1)), [])
+
+    def test_second_sync_requests_only_the_missing_range(self):
+        first = sync_prices_batch([self.security], date(2024, 1, 1), date(2024, 4, 1))
+        second = sync_prices_batch([self.security], date(2024, 1, 1), date(2024, 6, 1))
+        third = sync_prices_batch([self.security], date(2024, 2, 1), date(2024, 5, 1))
+
+        self.assertEqual(self.provider.calls, [
+            (['AAA'], date(2024, 1, 1), date(2024, 4, 1)),
+            (['AAA'], date(2024, 4, 1), date(2024, 6, 1)),
+        ])
+        self.assertEqual(first['AAA'] + second['AAA'], len(self.prices['AAA'].loc['2024-01-01':'2024-05-31']))
+        self.assertEqual(third, {})
+
+    def test_securities_missing_the_same_range_share_one_call(self):
+        other = Security.objects.create(symbol='BBB', name='BBB')
+        sync_prices_batch([self.security, other], date(2024, 1, 1), date(2024, 4, 1))
+        sync_prices_batch([self.security], date(2024, 1, 1), date(2024, 5, 1))
+        sync_prices_batch([self.security, other], date(2024, 1, 1), date(2024, 5, 1))
+
+        self.assertEqual(self.provider.calls, [
+            (['AAA', 'BBB'], date(2024, 1, 1), date(2024, 4, 1)),
+            (['AAA'], date(2024, 4, 1), date(2024, 5, 1)),
+            (['BBB'], date(2024, 4, 1), date(2024, 5, 1)),
+        ])
+
+    def test_range_answered_without_bars_is_covered(self):
+        # An exchange holiday stretch: weekdays without any bars
+        holidays = pd.bdate_range('2024-12-24', '2024-12-27')
+        self.provider.frames['AAA'] = self.prices['AAA'].drop(holidays)
+        sync_prices_batch([self.security], date(2024, 12, 1), date(2024, 12, 24))
+        self.assertEqual(sync_prices_batch([self.security], date(2024, 12, 1), date(2024, 12, 28)), {})
+        sync_prices_batch([self.security], date(2024, 12, 1), date(2024, 12, 28))
+
+        self.assertEqual(len(self.provider.calls), 2)
+        self.assertEqual(self.security.price_history_end, date(2024, 12, 27))
+        self.assertEqual(missing_ranges(self.security, date(2024, 12, 1), date(2024, 12, 28)), [])
+
+    def test_weekend_range_is_covered(self):
+        sync_prices_batch([self.security], date(2024, 3, 4), date(2024, 3, 9))
+        sync_prices_batch([self.security], date(2024, 3, 4), date(2024, 3, 11))
+        self.assertEqual(self.security.price_history_end, date(2024, 3, 10))
+        sync_prices_batch([self.security], date(2024, 3, 4), date(2024, 3, 11))
+        self.assertEqual(len(self.provider.calls), 2)
+
+    def test_failed_download_is_retried(self):
+        unknown = Security.objects.create(symbol='ZZZ', name='ZZZ')
+        sync_prices_batch([self.security, unknown], date(2024, 1, 1), date(2024, 2, 1))
+        sync_prices_batch([self.security, unknown], date(2024, 1, 1), date(2024, 2, 1))
+
+        self.assertIsNone(unknown.price_history_end)
+        self.assertEqual(self.provider.calls[-1], (['ZZZ'], date(2024, 1, 1), date(2024, 2, 1)))
+
+    def test_histories_from_price_arrays_and_cache(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with override_settings(PRICE_ARRAY_DIR=directory.name, PRICE_CACHE_MAX_BYTES=16 * 1024 * 1024):
+            start, end = date(2024, 1, 1), date(2024, 7, 1)
+            expected = get_price_histories([self.security], start, end)['AAA']
+            self.assertEqual(refresh_stale_price_arrays([self.security]), 1)
+            self.assertEqual(refresh_stale_price_arrays([self.security]), 0)
+
+            arrays = get_array_store().frame('AAA', date(2024, 2, 1), date(2024, 3, 1))
+            pd.testing.assert_frame_equal(arrays, expected.loc['2024-02-01':'2024-02-29'], check_freq=False)
+            # Outside the built coverage the arrays do not answer
+            self.assertIsNone(get_array_store().frame('AAA', date(2024, 6, 1), date(2024, 8, 1)))
+
+            histories = get_price_histories([self.security], date(2024, 3, 1), date(2024, 4, 1))
+            pd.testing.assert_frame_equal(histories['AAA'], expected.loc['2024-03-01':'2024-03-31'], check_freq=False)
+            self.assertEqual(len(self.provider.calls), 1)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class PriceCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches['prices'].clear()
+        self.data = synthetic_prices(['AAA'], 120, end=date(2024, 6, 28))['AAA']
+
+    def test_superset_hit_and_miss(self):
+        cache = PriceCache(alias='prices')
+        cache.set('AAA', date(2024, 1, 1), date(2024, 7, 1), self.data)
+
+        sliced = cache.get('AAA', date(2024, 3, 1), date(2024, 4, 1))
+        pd.testing.assert_frame_equal(sliced, self.data.loc['2024-03-01':'2024-03-31'])
+        self.assertIsNone(cache.get('AAA', date(2023, 12, 1), date(2024, 4, 1)))
+        self.assertIsNone(cache.get('AAA', date(2024, 3, 1), date(2024, 4, 1), adjusted=False))
+        self.assertEqual((cache.hits, cache.superset_hits, cache.misses), (1, 1, 2))
+
+    def test_entries_are_shared_between_processes(self):
+        PriceCache(alias='prices').set('AAA', date(2024, 1, 1), date(2024, 7, 1), self.data)
+        other = PriceCache(alias='prices')
+        pd.testing.assert_frame_equal(other.get('AAA', date(2024, 1, 1), date(2024, 7, 1)), self.data)
+        self.assertEqual(other.stats()['entries'], 1)
+
+    def test_evicts_least_recently_used_over_budget(self):
+        nbytes = int(self.data.memory_usage(index=True, deep=True).sum())
+        cache = PriceCache(alias='prices', max_bytes=int(nbytes * 2.5))
+        for symbol in ('AAA', 'BBB'):
+            cache.set(symbol, date(2024, 1, 1), date(2024, 7, 1), self.data)
+        cache.get('AAA', date(2024, 1, 1), date(2024, 7, 1))
+        cache.set('CCC', date(2024, 1, 1), date(2024, 7, 1), self.data)
+
+        self.assertIsNotNone(cache.get('AAA', date(2024, 1, 1), date(2024, 7, 1)))
+        self.assertIsNone(cache.get('BBB', date(2024, 1, 1), date(2024, 7, 1)))
+        self.assertLessEqual(cache.bytes, cache.max_bytes)
+
+
+def yahoo_batch(frames, index):
+    """``yf.download(..., group_by='ticker')`` shaped frame, all-NaN for ``None``"""
+    columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+    parts = {
+        symbol: (frame[columns] if frame is not None
+                 else pd.DataFrame(np.nan, index=index, columns=columns))
+        for symbol, frame in frames.items()
+    }
+    return pd.concat(parts, axis=1, names=['Ticker', 'Price'])
+
+
+class YahooProviderTests(SimpleTestCase):
+    def setUp(self):
+        self.data = synthetic_prices(['AAA'], 20, end=date(2024, 6, 28))['AAA']
+        self.provider = YahooMarketDataProvider(threads=False)
+
+    def test_all_nan_column_in_answered_batch_is_empty(self):
+        batch = yahoo_batch({'AAA': self.data, 'BBB': None}, self.data.index)
+        with mock.patch('core.services.market_data.yf.download', return_value=batch) as download:
+            frames = self.provider.download(['AAA', 'BBB'], date(2024, 6, 1), date(2024, 7, 1))
+
+        self.assertEqual(download.call_count, 1)
+        self.assertEqual(len(frames['AAA']), len(self.data))
+        self.assertTrue(frames['BBB'].empty)
+
+    def test_batch_without_bars_is_retried_and_left_missing(self):
+        batch = yahoo_batch({'AAA': None, 'BBB': None}, self.data.index)
+        with mock.patch('core.services.market_data.yf.download', return_value=batch) as download:
+            frames = self.provider.download(['AAA', 'BBB'], date(2024, 6, 1), date(2024, 7, 1))
+
+        self.assertEqual(frames, {})
+        self.assertEqual(download.call_count, 3)
+
+    def test_base_provider_is_abstract(self):
+        with self.assertRaises(TypeError):
+            MarketDataProvider()
+
+
+@override_settings(CACHES=TEST_CACHES, PRICE_CACHE_MAX_BYTES=0, PRICE_ARRAY_DIR='')
+class StrategyChartTests(TestCase):
+    def setUp(self):
+        self.provider = FixtureMarketDataProvider(synthetic_prices(['AAA'], 300))
+        set_provider(self.provider)
+        self.addCleanup(set_provider, None)
+
+        self.user = User.objects.create_user('tester', 'tester@example.com', 'tester')
+        self.strategy = Strategy.objects.create(
+            user=self.user, name='Mean reversion', lookback_days=20, entry_threshold=1.0, exit_rule='mean_revert'
+        )
+        self.strategy.tickers.set([Security.objects.create(symbol='AAA', name='AAA')])
+        self.client.force_login(self.user)
+
+    def test_page_queues_a_backtest_instead_of_computing(self):
+        response = self.client.get(f'/strategies/{self.strategy.id}/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['charts_pending'])
+        self.assertFalse(response.context['has_charts'])
+        self.assertEqual(self.provider.calls, [])
+        self.assertEqual(BacktestJob.objects.filter(strategy=self.strategy, status=BacktestJob.STATUS_QUEUED).count(), 1)
+
+        # Another view while the job waits reuses it
+        self.client.get(f'/strategies/{self.strategy.id}/')
+        self.assertEqual(BacktestJob.objects.filter(strategy=self.strategy).count(), 1)
+
+    def test_charts_render_from_the_stored_frames(self):
+        BacktestJob.objects.create(strategy=self.strategy)
+        self.assertTrue(run_job(claim_next_job('test')))
+        frame = get_chart_frame(self.strategy)
+        self.assertEqual(list(frame.columns[:4]), ['Open', 'High', 'Low', 'Close'])
+        self.assertIn('Z_Score', frame.columns)
+        calls = len(self.provider.calls)
+
+        response = self.client.get(f'/strategies/{self.strategy.id}/')
+        self.assertTrue(response.context['has_charts'])
+        self.assertEqual(len(self.provider.calls), calls)
+        self.assertEqual(BacktestJob.objects.filter(strategy=self.strategy).count(), 1)
+
+
+@override_settings(CACHES=TEST_CACHES, PRICE_CACHE_MAX_BYTES=0, PRICE_ARRAY_DIR='')
+class BacktestPlanTests(TestCase):
+    def setUp(self):
+        self.provider = FixtureMarketDataProvider(synthetic_prices(['LONG', 'SHORT', 'BOTH'], 600))
+        set_provider(self.provider)
+        self.addCleanup(set_provider, None)
+
+        user = User.objects.create_user('tester', 'tester@example.com', 'tester')
+        securities = {symbol: Security.objects.create(symbol=symbol, name=symbol) for symbol in self.provider.frames}
+        self.long = Strategy.objects.create(
+            user=user, name='Long', lookback_days=60, entry_threshold=1.0, exit_rule='mean_revert'
+        )
+        self.long.tickers.set([securities['LONG'], securities['BOTH']])
+        self.short = Strategy.objects.create(
+            user=user, name='Short', lookback_days=5, entry_threshold=1.0, exit_rule='mean_revert'
+        )
+        self.short.tickers.set([securities['SHORT'], securities['BOTH']])
+        self.end = datetime.combine(date.today(), datetime.min.time())
+
+    def test_symbols_sync_over_their_own_widest_range(self):
+        plan = BacktestPlan([self.long, self.short], self.end).load()
+        long_start = (self.end - timedelta(days=600)).date()
+        short_start = (self.end - timedelta(days=50)).date()
+
+        calls = sorted((sorted(symbols), start, end) for symbols, start, end in self.provider.calls)
+        self.assertEqual(calls, [
+            (['BOTH', 'LONG'], long_start, self.end.date()),
+            (['SHORT'], short_start, self.end.date()),
+        ])
+        summary = plan.summary()
+        self.assertEqual(summary['network_calls'], 2)
+        self.assertEqual(summary['expected_network_calls'], 2)
+        self.assertEqual(summary['expected_naive_network_calls'], 2)
+        self.assertEqual(PriceData.objects.filter(security__symbol='SHORT', date__lt=short_start).count(), 0)
+
+        # A short strategy's request is served from the plan
+        histories = plan.histories(self.short.tickers.all(), short_start, self.end.date())
+        self.assertEqual(sorted(histories), ['BOTH', 'SHORT'])
+
+        # Once stored, a new plan needs no downloads
+        plan = BacktestPlan([self.long, self.short], self.end).load()
+        self.assertEqual(plan.summary()['network_calls'], 0)
+        self.assertEqual(len(self.provider.calls), 2)
+
+
+class ParameterSweepApiTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('tester', 'tester@example.com', 'tester')
+        self.strategy = Strategy.objects.create(
+            user=user, name='Mean reversion', lookback_days=20, entry_threshold=1.0, exit_rule='mean_revert'
+        )
+        self.url = f'/strategies/{self.strategy.id}/sweep/'
+        self.client.force_login(user)
+
+    def test_requires_post(self):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+    def test_rejects_invalid_requests(self):
+        for data in (
+            {'rank_by': 'trade_log'},
+            {'lookbacks': '1,20'},
+            {'lookbacks': ','.join(map(str, range(2, 40))), 'thresholds': '1,2'},
+        ):
+            response = self.client.post(self.url, data)
+            self.assertEqual(response.status_code, 400, data)
+            self.assertIn('error', response.json())
+
+
+def cointegrated_log_prices(rng, length):
+    """Log prices of Y = 0.8 * X + stationary noise, X and an unrelated Z"""
+    x = np.cumsum(rng.normal(0, 0.01, length)) + 4.0
+    noise = np.zeros(length)
+    for day in range(1, length):
+        noise[day] = 0.7 * noise[day - 1] + rng.normal(0, 0.005)
+    z = np.cumsum(rng.normal(0, 0.01, length)) + 4.0
+    return np.column_stack((0.8 * x + 1.0 + noise, x, z))
+
+
+def window_regression(x, y, window, end):
+    """OLS of the window ending at ``end`` solved directly, or None when it has a gap"""
+    xs, ys = x[end - window + 1:end + 1], y[end - window + 1:end + 1]
+    if np.isnan(xs).any() or np.isnan(ys).any():
+        return None
+    beta, alpha = np.polyfit(xs, ys, 1)
+    residual_std = np.sqrt(np.sum((ys - alpha - beta * xs) ** 2) / (window - 2))
+    return beta, alpha, (y[end] - alpha - beta * x[end]) / residual_std
+
+
+class PairsTests(SimpleTestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(11)
+        self.log_prices = cointegrated_log_prices(self.rng, 400)
+
+    def test_rolling_regression_matches_polyfit_per_window(self):
+        x, y = self.log_prices[:, 1].copy(), self.log_prices[:, 0].copy()
+        x[50:53] = np.nan
+        y[200] = np.nan
+        regression = RollingRegression(x, y)
+
+        for window in (5, 20, 60):
+            beta, z_scores = regression.regression(window)
+            np.testing.assert_array_equal(beta, regression.beta(window))
+            alpha = regression.alpha(window)
+            self.assertTrue(np.isnan(beta[:window - 1]).all())
+            for end in range(window - 1, len(x)):
+                expected = window_regression(x, y, window, end)
+                if expected is None:
+                    self.assertTrue(np.isnan(beta[end]), (window, end))
+                    self.assertTrue(np.isnan(z_scores[end]), (window, end))
+                    continue
+                np.testing.assert_allclose(
+                    (beta[end], alpha[end], z_scores[end]), expected, rtol=1e-6, atol=1e-9,
+                    err_msg=f"window {window} ending at {end}"
+                )
+
+    def test_rolling_regression_columns_match_single_series(self):
+        x = self.log_prices[:, [1, 2]]
+        y = self.log_prices[:, [0, 0]]
+        beta, z_scores = RollingRegression(x, y).regression(30)
+        for column in range(2):
+            single_beta, single_z = RollingRegression(x[:, column], y[:, column]).regression(30)
+            np.testing.assert_allclose(beta[:, column], single_beta, rtol=1e-12)
+            np.testing.assert_allclose(z_scores[:, column], single_z, rtol=1e-12)
+
+    def test_pair_moments_match_explicit_regressions(self):
+        moments = PairMoments(self.log_prices)
+        y, x = np.array([0, 0, 1]), np.array([1, 2, 2])
+        statistics = moments.statistics(y, x)
+
+        for pair, (y_column, x_column) in enumerate(zip(y, x)):
+            y_prices, x_prices = self.log_prices[:, y_column], self.log_prices[:, x_column]
+            # Engle-Granger step one: OLS with intercept
+            hedge, intercept = np.polyfit(x_prices, y_prices, 1)
+            residuals = y_prices - intercept - hedge * x_prices
+            # Step two: Dickey-Fuller regression without intercept on the residual
+            lagged, differences = residuals[:-1], np.diff(residuals)
+            (gamma,), _, _, _ = np.linalg.lstsq(lagged[:, None], differences, rcond=None)
+            residual_variance = np.sum((differences - gamma * lagged) ** 2) / (len(differences) - 1)
+            adf_stat = gamma / np.sqrt(residual_variance / np.sum(lagged ** 2))
+            correlation = np.corrcoef(np.diff(y_prices), np.diff(x_prices))[0, 1]
+
+            self.assertAlmostEqual(statistics['hedge_ratio'][pair], hedge, places=9)
+            self.assertAlmostEqual(statistics['adf_stat'][pair], adf_stat, places=7)
+            self.assertAlmostEqual(statistics['correlation'][pair], correlation, places=9)
+            if -1 < gamma < 0:
+                self.assertAlmostEqual(statistics['half_life'][pair], np.log(0.5) / np.log(1 + gamma), places=7)
+            else:
+                self.assertTrue(np.isnan(statistics['half_life'][pair]))
+
+    def test_pair_returns_sign_conventions(self):
+        y_returns = np.array([np.nan, 0.02, 0.01, -0.01, 0.03, np.nan])
+        x_returns = np.array([np.nan, 0.01, 0.03, 0.02, -0.01, 0.01])
+        hedge_ratios = np.array([np.nan, 0.5, 2.0, 1.0, 1.0, 1.0])
+        positions = np.array([0, 1, -1, 0, 1, 1])
+
+        returns = pair_returns(y_returns, x_returns, hedge_ratios, positions)
+
+        # Long y / short 0.5 x, then short y / long 2 x, each per unit of gross exposure
+        expected = [np.nan, 0.0, (0.01 - 0.5 * 0.03) / 1.5, -(-0.01 - 2.0 * 0.02) / 3.0, 0.0, np.nan]
+        np.testing.assert_allclose(returns, expected)
+
+    def test_screen_pairs_ranks_the_cointegrated_pair_first(self):
+        pairs = screen_pairs(np.exp(self.log_prices), ['Y', 'X', 'Z'], lookback=30)
+
+        self.assertEqual(len(pairs), 3)
+        self.assertEqual((pairs[0]['y'], pairs[0]['x']), ('Y', 'X'))
+        self.assertTrue(pairs[0]['cointegrated'])
+        self.assertAlmostEqual(pairs[0]['hedge_ratio'], 0.8, delta=0.05)
+        self.assertEqual([pair['adf_stat'] for pair in pairs], sorted(pair['adf_stat'] for pair in pairs))
+        chunked = screen_pairs(np.exp(self.log_prices), ['Y', 'X', 'Z'], lookback=30, chunk_size=1)
+        self.assertEqual([(pair['y'], pair['x']) for pair in chunked], [(pair['y'], pair['x']) for pair in pairs])
+        np.testing.assert_allclose([pair['adf_stat'] for pair in chunked], [pair['adf_stat'] for pair in pairs])
+
+        correlated = screen_pairs(
+            np.exp(self.log_prices), ['Y', 'X', 'Z'], lookback=30, min_correlation=0.5
+        )
+        self.assertEqual([(pair['y'], pair['x']) for pair in correlated], [('Y', 'X')])
+
+
+@override_settings(CACHES=TEST_CACHES, PRICE_CACHE_MAX_BYTES=0, PRICE_ARRAY_DIR='')
+class PairsStrategyTests(TestCase):
+    def setUp(self):
+        self.symbols = synthetic_symbols(3)
+        set_provider(FixtureMarketDataProvider(synthetic_prices(self.symbols, 200)))
+        self.addCleanup(set_provider, None)
+
+        user = User.objects.create_user('tester', 'tester@example.com', 'tester')
+        self.strategy = Strategy.objects.create(
+            user=user, name='Pairs', lookback_days=20, entry_threshold=1.0,
+            exit_rule='mean_revert', strategy_type='pairs'
+        )
+        self.strategy.tickers.set([Security.objects.create(symbol=symbol, name=symbol) for symbol in self.symbols])
+
+    def test_pair_legs_and_portfolio_returns(self):
+        engine = BacktestEngine(self.strategy)
+        end = datetime.combine(datetime.now().date(), datetime.min.time())
+        self.assertTrue(engine.fetch_data(end - timedelta(days=250), end))
+        results = engine.run_strategy()
+
+        self.assertEqual(len(engine.pair_frames), 3)
+        for name, frame in engine.pair_frames.items():
+            y_symbol, x_symbol = name.split('/')
+            y_closes = engine.data[y_symbol]['Close'].reindex(frame.index).to_numpy()
+            x_closes = engine.data[x_symbol]['Close'].reindex(frame.index).to_numpy()
+            hedge = frame['Hedge_Ratio'].to_numpy()
+            position = frame['Position'].to_numpy()
+            self.assertTrue((position != 0).any(), name)
+
+            # Hedge ratio of the log price regression of the first ticker on the second
+            end_row = len(frame) - 1
+            beta, _, z_score = window_regression(np.log(x_closes), np.log(y_closes), 20, end_row)
+            self.assertAlmostEqual(hedge[end_row], beta, places=8)
+            self.assertAlmostEqual(frame['Spread_Z'].iloc[-1], z_score, places=6)
+
+            y_returns = y_closes[1:] / y_closes[:-1] - 1
+            x_returns = x_closes[1:] / x_closes[:-1] - 1
+            held, ratio = position[:-1], np.nan_to_num(hedge[:-1])
+            expected = held * (y_returns - ratio * x_returns) / (1 + np.abs(ratio))
+            np.testing.assert_allclose(frame['Strategy_Returns'].to_numpy()[1:], expected, atol=1e-15)
+
+            # Long spread buys the first ticker and sells the second on the same date
+            entry = np.flatnonzero(position != 0)[0]
+            entry_date = frame.index[entry].date()
+            on_entry = {(trade['symbol'], trade['type']) for trade in results['trade_log']
+                        if trade['date'] == entry_date}
+            long_y = position[entry] > 0
+            self.assertIn((y_symbol, 'BUY' if long_y else 'SELL'), on_entry)
+            self.assertIn((x_symbol, 'SELL' if long_y else 'BUY'), on_entry)
+
+        pair_matrix = np.column_stack([frame['Strategy_Returns'].to_numpy() for frame in engine.pair_frames.values()])
+        # Pairs weigh equally; the first date has no returns and earns nothing
+        expected = np.nan_to_num(pair_matrix.mean(axis=1))
+        np.testing.assert_allclose(results['daily_series']['strategy_returns'], expected, atol=1e-15)
+
+
+@override_settings(CACHES=TEST_CACHES, PRICE_CACHE_MAX_BYTES=0, PRICE_ARRAY_DIR='')
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('tester', 'tester@example.com', 'tester')
+        # The backtest queued on commit never runs inside the test transaction
+        self.strategy = Strategy.objects.create(user=self.user, name='Queue', lookback_days=20, entry_threshold=1.0)
+
+    def test_enqueue_reuses_waiting_job(self):
+        job = enqueue_backtest(self.strategy)
+        self.assertEqual(enqueue_backtest(self.strategy), job)
+        self.assertEqual(claim_next_job('worker-a'), job)
+        # A running job may already have read older data, so a new one is queued
+        self.assertNotEqual(enqueue_backtest(self.strategy), job)
+        self.assertEqual(BacktestJob.objects.count(), 2)
+
+    def test_claims_oldest_job_once(self):
+        first = enqueue_backtest(self.strategy)
+        second = BacktestJob.objects.create(strategy=self.strategy, stage='queued')
+
+        self.assertEqual(claim_next_job('worker-a'), first)
+        claimed = claim_next_job('worker-b')
+        self.assertEqual((claimed, claimed.worker, claimed.status), (second, 'worker-b', BacktestJob.STATUS_RUNNING))
+        self.assertIsNone(claim_next_job('worker-c'))
+        self.assertEqual(BacktestJob.objects.get(id=first.id).worker, 'worker-a')
+
+    def test_claim_skips_job_taken_by_another_worker(self):
+        first = enqueue_backtest(self.strategy)
+        second = BacktestJob.objects.create(strategy=self.strategy, stage='queued')
+        update = QuerySet.update
+        raced = []
+
+        def racing_update(queryset, **kwargs):
+            # Another worker claims the first job between our read and our update
+            if not raced:
+                raced.append(True)
+                BacktestJob.objects.filter(id=first.id).update(
+                    status=BacktestJob.STATUS_RUNNING, worker='worker-b'
+                )
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', racing_update):
+            claimed = claim_next_job('worker-a')
+
+        self.assertEqual(claimed, second)
+        self.assertEqual(BacktestJob.objects.get(id=first.id).worker, 'worker-b')
+
+    def test_requeues_only_stale_running_jobs(self):
+        stale = BacktestJob.objects.create(
+            strategy=self.strategy, status=BacktestJob.STATUS_RUNNING, worker='dead',
+            started_at=timezone.now() - timedelta(hours=2)
+        )
+        running = BacktestJob.objects.create(
+            strategy=self.strategy, status=BacktestJob.STATUS_RUNNING, worker='alive',
+            started_at=timezone.now()
+        )
+
+        self.assertEqual(requeue_stale_jobs(timedelta(hours=1)), 1)
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.worker, stale.started_at), (BacktestJob.STATUS_QUEUED, '', None))
+        self.assertEqual(BacktestJob.objects.get(id=running.id).status, BacktestJob.STATUS_RUNNING)
+
+    def test_worker_requeues_stale_jobs_and_drains_queue(self):
+        stale = BacktestJob.objects.create(
+            strategy=self.strategy, status=BacktestJob.STATUS_RUNNING, worker='dead',
+            started_at=timezone.now() - timedelta(hours=2)
+        )
+        stdout = StringIO()
+        call_command('backtest_worker', '--once', stdout=stdout)
+
+        self.assertIn('Requeued 1 stale jobs', stdout.getvalue())
+        stale.refresh_from_db()
+        # The strategy has no tickers, so the rerun fails, but it did run again
+        self.assertEqual(stale.status, BacktestJob.STATUS_FAILED)
+        self.assertNotEqual(stale.worker, 'dead')
+
+    def test_creating_a_strategy_queues_one_backtest(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            strategy = Strategy.objects.create(
+                user=self.user, name='Created', lookback_days=20, entry_threshold=1.0
+            )
+            strategy.save()
+        self.assertEqual(list(BacktestJob.objects.filter(strategy=strategy).values_list('status', flat=True)),
+                         [BacktestJob.STATUS_QUEUED])
+
+
+class WalkForwardTests(SimpleTestCase):
+    def setUp(self):
+        self.panel = PricePanel(synthetic_prices(synthetic_symbols(3), 420, end=date(2024, 6, 28)))
+        self.grid = build_sweep_grid([10, 20], [1.0, 1.5])
+        self.context = WalkForwardContext(self.panel, [10, 20])
+
+    def test_fold_windows_boundaries(self):
+        self.assertEqual(fold_windows(100, 40, 20, warmup=10), [(10, 50, 70), (30, 70, 90)])
+        # A last test window ending exactly on the final row is kept
+        self.assertEqual(fold_windows(110, 40, 20, warmup=10)[-1], (50, 90, 110))
+        self.assertEqual(fold_windows(69, 40, 20, warmup=10), [])
+
+        folds = fold_windows(420, 150, 50, warmup=20)
+        for (_, _, test_end), (_, next_test_start, _) in zip(folds, folds[1:]):
+            self.assertEqual(test_end, next_test_start)
+
+    def test_run_fold_picks_best_train_parameters(self):
+        fold = fold_windows(len(self.panel), 150, 50, warmup=20)[0]
+        result = run_fold(self.context, fold, self.grid, 'sharpe_ratio')
+
+        scores = {
+            parameters: self.context.evaluate(*parameters, fold[0], fold[1])[0]['sharpe_ratio']
+            for parameters in self.grid
+        }
+        best = max(scores, key=scores.get)
+        self.assertEqual((result['lookback_days'], result['entry_threshold']), best)
+        self.assertAlmostEqual(result['train_score'], scores[best])
+        self.assertEqual(result['test_metrics'], self.context.evaluate(*best, fold[1], fold[2])[0])
+        self.assertEqual(result['test_start'], self.panel.dates[fold[1]].date())
+
+    def test_stitched_folds_match_one_run_over_test_windows(self):
+        windows = fold_windows(len(self.panel), 150, 50, warmup=20)
+        folds = [run_fold(self.context, window, self.grid, 'sharpe_ratio') for window in windows]
+        summary = summarize_folds(folds, 'sharpe_ratio')
+
+        strategy_returns, benchmark_returns = [], []
+        for (_, lo, hi), fold in zip(windows, folds):
+            lookback, entry_threshold = fold['lookback_days'], fold['entry_threshold']
+            positions = mean_reversion_positions(mean_reversion_signals(
+                self.context.z_scores[lookback][lo:hi], entry_threshold, entry_threshold * 0.5
+            ))
+            returns = self.panel.returns[lo:hi]
+            active = self.panel.active[lo:hi]
+            # Every test window opens flat
+            window_returns = np.where(active, 0.0, np.nan)
+            window_returns[1:] = returns[1:] * positions[:-1]
+            weights = np.ones(returns.shape)
+            strategy_returns.append(aggregate_returns(window_returns, weights, active))
+            benchmark_returns.append(aggregate_returns(returns, weights, active))
+
+        expected = PerformanceAccumulator().update(
+            np.concatenate(strategy_returns), np.concatenate(benchmark_returns)
+        ).metrics()
+        self.assertEqual(summary['folds'], len(windows))
+        self.assertEqual(set(summary['out_of_sample']), set(expected))
+        for key, value in expected.items():
+            self.assertAlmostEqual(summary['out_of_sample'][key], value, places=9, msg=key)
+
+
+class TickerInfoTests(SimpleTestCase):
+    def setUp(self):
+        self.provider = FixtureMarketDataProvider(info={'AAA': {'longName': 'Alpha'}, 'BBB': {'longName': 'Beta'}})
+        set_provider(self.provider)
+        self.addCleanup(set_provider, None)
+        executor = ThreadPoolExecutor(max_workers=4)
+        set_info_executor(executor)
+        self.addCleanup(set_info_executor, None)
+        self.addCleanup(executor.shutdown)
+
+        # Info calls block until released, so concurrent callers overlap
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+        get_info = self.provider.get_info
+
+        def blocking_get_info(symbol):
+            self.release.wait(5)
+            return get_info(symbol)
+
+        self.get_info = mock.patch.object(self.provider, 'get_info', side_effect=blocking_get_info).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_concurrent_lookups_share_one_call(self):
+        async def lookups():
+            pending = asyncio.gather(fetch_infos(['AAA', 'AAA', 'BBB']), fetch_info('AAA'))
+            await asyncio.sleep(0.05)
+            self.release.set()
+            return await pending
+
+        infos, info = async_to_sync(lookups)()
+
+        self.assertEqual(infos, {'AAA': {'longName': 'Alpha'}, 'BBB': {'longName': 'Beta'}})
+        self.assertEqual(info, {'longName': 'Alpha'})
+        self.assertEqual(sorted(call.args[0] for call in self.get_info.call_args_list), ['AAA', 'BBB'])
+
+    def test_timed_out_call_is_shared_by_later_callers(self):
+        self.assertIsNone(async_to_sync(fetch_info)('AAA', timeout=0.05))
+
+        async def retry():
+            pending = asyncio.ensure_future(fetch_info('AAA', timeout=5))
+            await asyncio.sleep(0.05)
+            self.release.set()
+            return await pending
+
+        self.assertEqual(async_to_sync(retry)(), {'longName': 'Alpha'})
+        self.assertEqual(self.get_info.call_count, 1)
+
+    def test_failed_call_returns_none(self):
+        self.release.set()
+        self.get_info.side_effect = RuntimeError('provider down')
+        self.assertEqual(async_to_sync(fetch_infos)(['AAA']), {'AAA': None})
+
+
+@override_settings(CACHES=TEST_CACHES)
+class StrategyCreateTests(TestCase):
+    def setUp(self):
+        self.provider = FixtureMarketDataProvider(info={'AAA': {'longName': 'Alpha', 'sector': 'Tech'}})
+        set_provider(self.provider)
+        self.addCleanup(set_provider, None)
+        self.user = User.objects.create_user('tester', 'tester@example.com', 'tester')
+        self.client.force_login(self.user)
+
+    def test_create_looks_up_duplicate_symbols_once_and_queues_backtest(self):
+        with mock.patch.object(self.provider, 'get_info', wraps=self.provider.get_info) as get_info, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('strategy_create'), {
+                'name': 'Created', 'strategy_type': 'mean_reversion', 'lookback_days': 20,
+                'entry_threshold': 1.5, 'exit_rule': 'mean_revert', 'skip_days': 0,
+                'holding_days': 21, 'top_n': 1, 'tickers': 'AAA, aaa, BBB',
+            })
+
+        self.assertRedirects(response, reverse('dashboard'), fetch_redirect_response=False)
+        self.assertEqual(sorted(call.args[0] for call in get_info.call_args_list), ['AAA', 'BBB'])
+        strategy = Strategy.objects.get(user=self.user, name='Created')
+        self.assertEqual(
+            sorted(strategy.tickers.values_list('symbol', 'name', 'sector')),
+            [('AAA', 'Alpha', 'Tech'), ('BBB', 'BBB', None)]
+        )
+        self.assertEqual(BacktestJob.objects.filter(strategy=strategy).count(), 1)
+
+    def test_invalid_form_is_rendered_again(self):
+        response = self.client.post(reverse('strategy_create'), {'name': 'Invalid', 'tickers': ''})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Strategy.objects.filter(name='Invalid').exists())
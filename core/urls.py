@@ -20,12 +20,16 @@ urlpatterns = [
     path('strategies/<int:pk>/edit/', strategy_views.strategy_edit, name='strategy_edit'),
     path('strategies/<int:pk>/rename/', strategy_views.strategy_rename, name='strategy_rename'),
     path('strategies/<int:pk>/delete/', strategy_views.strategy_delete, name='strategy_delete'),
+    path('strategies/<int:pk>/backtest/status/', strategy_views.strategy_backtest_status, name='strategy_backtest_status'),
 
     # Backtest URLs
     path('strategies/<int:strategy_id>/backtest/', backtest_views.backtest_detail, name='backtest_detail'),
     path('strategies/<int:strategy_id>/backtest/rerun/', backtest_views.rerun_backtest, name='rerun_backtest'),
     path('strategies/<int:strategy_id>/backtest/api/', backtest_views.backtest_api, name='backtest_api'),
+    path('strategies/<int:strategy_id>/sweep/', backtest_views.parameter_sweep_api, name='parameter_sweep_api'),
     path('backtests/compare/', backtest_views.compare_strategies, name='compare_strategies'),
+    path('backtests/jobs/<int:job_id>/', backtest_views.backtest_job_status, name='backtest_job_status'),
+    path('backtests/jobs/<int:job_id>/events/', backtest_views.backtest_job_events, name='backtest_job_events'),
 
     # Profile
     path('profile/', profile_views.profile_view, name='profile'),
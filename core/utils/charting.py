@@ -8,10 +8,11 @@ from plotly.subplots import make_subplots
 import plotly.express as px
 import pandas as pd
 import numpy as np
-import yfinance as yf
-from datetime import datetime, timedelta
 from core.models import Strategy, BacktestResult, TradeLog
+from core.services.chart_data import chart_frame_name, chart_indicator, get_chart_frame
+from core.services.series_store import load_series
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -22,38 +23,25 @@ class StrategyChartGenerator:
     def __init__(self, strategy):
         self.strategy = strategy
         self.data = None
+        self.indicator, self.indicator_label = chart_indicator(strategy)
+        self.frame_name = chart_frame_name(strategy)
         
-    def fetch_chart_data(self, days=252):
-        """Fetch data for charting (1 year default)"""
+    def fetch_chart_data(self):
+        """Load the engine-prepared price, indicator and position frame for charting"""
         try:
-            tickers = self.strategy.tickers.all()
-            if not tickers:
-                return None
-                
             # For now, focus on single ticker strategies
-            ticker = tickers[0]
-            
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            
-            # Fetch data
-            data = yf.download(
-                ticker.symbol,
-                start=start_date,
-                end=end_date,
-                progress=False,
-                auto_adjust=True
-            )
+            data = get_chart_frame(self.strategy, self.frame_name)
             
-            if data.empty:
+            if data is None or data.empty:
                 return None
                 
-            # Handle MultiIndex columns
-            if hasattr(data.columns, 'levels'):
-                data.columns = data.columns.droplevel(1)
-                
-            # Calculate technical indicators
-            data = self._calculate_technical_indicators(data)
+            # Chart overlays derived from the engine's columns
+            data = data.copy()
+            if 'Rolling_Mean' in data.columns:
+                data['Upper_Band'] = data['Rolling_Mean'] + (2 * data['Rolling_Std'])
+                data['Lower_Band'] = data['Rolling_Mean'] - (2 * data['Rolling_Std'])
+            data['Buy_Points'] = data['Close'].where(data['Signal'] == 1)
+            data['Sell_Points'] = data['Close'].where(data['Signal'] == -1)
             
             self.data = data
             return data
@@ -62,33 +50,6 @@ class StrategyChartGenerator:
             logger.error(f"Error fetching chart data: {str(e)}")
             return None
     
-    def _calculate_technical_indicators(self, data):
-        """Calculate technical indicators for the strategy"""
-        lookback = self.strategy.lookback_days
-        entry_threshold = self.strategy.entry_threshold
-        exit_threshold = entry_threshold * 0.5  # Default exit threshold
-        
-        # Rolling statistics
-        data['SMA'] = data['Close'].rolling(window=lookback).mean()
-        data['STD'] = data['Close'].rolling(window=lookback).std()
-        data['Upper_Band'] = data['SMA'] + (2 * data['STD'])
-        data['Lower_Band'] = data['SMA'] - (2 * data['STD'])
-        
-        # Z-Score calculation
-        data['Z_Score'] = (data['Close'] - data['SMA']) / data['STD']
-        
-        # Entry/Exit signals
-        data['Buy_Signal'] = data['Z_Score'] < -entry_threshold
-        data['Sell_Signal'] = data['Z_Score'] > entry_threshold
-        data['Exit_Signal'] = data['Z_Score'].abs() < exit_threshold
-        
-        # Mark signal points
-        data['Buy_Points'] = data['Close'].where(data['Buy_Signal'])
-        data['Sell_Points'] = data['Close'].where(data['Sell_Signal'])
-        data['Exit_Points'] = data['Close'].where(data['Exit_Signal'])
-        
-        return data
-    
     def generate_price_chart(self):
         """Generate main price chart with signals"""
         if self.data is None:
@@ -99,8 +60,10 @@ class StrategyChartGenerator:
             shared_xaxes=True,
             vertical_spacing=0.02,
             subplot_titles=(
-                f"{self.strategy.tickers.first().symbol} Price with Strategy Signals",
-                "Z-Score", 
+                f"{self.frame_name.split('/')[0]} Price with Strategy Signals" + (
+                    f" ({self.frame_name} spread)" if '/' in self.frame_name else ""
+                ),
+                self.indicator_label,
                 "Volume"
             ),
             row_heights=[0.6, 0.25, 0.15]
@@ -121,43 +84,44 @@ class StrategyChartGenerator:
             row=1, col=1
         )
         
-        # Simple Moving Average
-        fig.add_trace(
-            go.Scatter(
-                x=self.data.index,
-                y=self.data['SMA'],
-                mode='lines',
-                name=f'SMA ({self.strategy.lookback_days})',
-                line=dict(color='blue', width=2)
-            ),
-            row=1, col=1
-        )
+        if 'Rolling_Mean' in self.data.columns:
+            # Simple Moving Average
+            fig.add_trace(
+                go.Scatter(
+                    x=self.data.index,
+                    y=self.data['Rolling_Mean'],
+                    mode='lines',
+                    name=f'SMA ({self.strategy.lookback_days})',
+                    line=dict(color='blue', width=2)
+                ),
+                row=1, col=1
+            )
         
-        # Bollinger Bands
-        fig.add_trace(
-            go.Scatter(
-                x=self.data.index,
-                y=self.data['Upper_Band'],
-                mode='lines',
-                name='Upper Band',
-                line=dict(color='gray', width=1, dash='dash'),
-                showlegend=False
-            ),
-            row=1, col=1
-        )
+            # Bollinger Bands
+            fig.add_trace(
+                go.Scatter(
+                    x=self.data.index,
+                    y=self.data['Upper_Band'],
+                    mode='lines',
+                    name='Upper Band',
+                    line=dict(color='gray', width=1, dash='dash'),
+                    showlegend=False
+                ),
+                row=1, col=1
+            )
         
-        fig.add_trace(
-            go.Scatter(
-                x=self.data.index,
-                y=self.data['Lower_Band'],
-                mode='lines',
-                name='Lower Band',
-                line=dict(color='gray', width=1, dash='dash'),
-                fill='tonexty',
-                fillcolor='rgba(128,128,128,0.1)'
-            ),
-            row=1, col=1
-        )
+            fig.add_trace(
+                go.Scatter(
+                    x=self.data.index,
+                    y=self.data['Lower_Band'],
+                    mode='lines',
+                    name='Lower Band',
+                    line=dict(color='gray', width=1, dash='dash'),
+                    fill='tonexty',
+                    fillcolor='rgba(128,128,128,0.1)'
+                ),
+                row=1, col=1
+            )
         
         # Buy signals
         buy_points = self.data.dropna(subset=['Buy_Points'])
@@ -195,42 +159,31 @@ class StrategyChartGenerator:
                 row=1, col=1
             )
         
-        # Z-Score subplot
+        # Indicator subplot
         fig.add_trace(
             go.Scatter(
                 x=self.data.index,
-                y=self.data['Z_Score'],
+                y=self.data[self.indicator],
                 mode='lines',
-                name='Z-Score',
+                name=self.indicator_label,
                 line=dict(color='purple', width=2)
             ),
             row=2, col=1
         )
         
-        # Z-Score thresholds
-        fig.add_hline(
-            y=self.strategy.entry_threshold,
-            line_dash="dash",
-            line_color="red",
-            annotation_text="Sell Threshold",
-            row=2, col=1
-        )
-        
-        fig.add_hline(
-            y=-self.strategy.entry_threshold,
-            line_dash="dash",
-            line_color="green",
-            annotation_text="Buy Threshold",
-            row=2, col=1
-        )
+        if 'Hedge_Ratio' in self.data.columns:
+            fig.add_trace(
+                go.Scatter(
+                    x=self.data.index,
+                    y=self.data['Hedge_Ratio'],
+                    mode='lines',
+                    name='Hedge Ratio',
+                    line=dict(color='orange', width=1, dash='dot')
+                ),
+                row=2, col=1
+            )
         
-        fig.add_hline(
-            y=0,
-            line_dash="solid",
-            line_color="black",
-            line_width=1,
-            row=2, col=1
-        )
+        self._add_thresholds(fig)
         
         # Volume subplot
         colors = ['red' if close < open else 'green' 
@@ -258,76 +211,48 @@ class StrategyChartGenerator:
         
         # Update y-axis labels
         fig.update_yaxes(title_text="Price ($)", row=1, col=1)
-        fig.update_yaxes(title_text="Z-Score", row=2, col=1)
+        fig.update_yaxes(title_text=self.indicator_label, row=2, col=1)
         fig.update_yaxes(title_text="Volume", row=3, col=1)
         
         return fig
     
+    def _add_thresholds(self, fig):
+        """Entry thresholds of the strategy on the indicator subplot"""
+        threshold = self.strategy.entry_threshold
+        if self.strategy.strategy_type == 'momentum':
+            # Cross-sectional momentum holds the top N and has no threshold
+            if not self.strategy.top_n:
+                fig.add_hline(y=threshold, line_dash="dash", line_color="green",
+                              annotation_text="Long Threshold", row=2, col=1)
+                fig.add_hline(y=-threshold, line_dash="dash", line_color="red",
+                              annotation_text="Short Threshold", row=2, col=1)
+        else:
+            fig.add_hline(y=threshold, line_dash="dash", line_color="red",
+                          annotation_text="Sell Threshold", row=2, col=1)
+            fig.add_hline(y=-threshold, line_dash="dash", line_color="green",
+                          annotation_text="Buy Threshold", row=2, col=1)
+        
+        fig.add_hline(
+            y=0,
+            line_dash="solid",
+            line_color="black",
+            line_width=1,
+            row=2, col=1
+        )
+    
     def generate_performance_chart(self):
-        """Generate performance comparison chart"""
-        try:
-            backtest_result = self.strategy.backtestresult
-        except:
+        """Generate performance comparison chart from the stored backtest series"""
+        backtest_result = getattr(self.strategy, 'backtestresult', None)
+        if not backtest_result:
             return None
             
-        if not backtest_result or self.data is None:
+        series = load_series(backtest_result)
+        if series is None or len(series['dates']) == 0:
             return None
             
-        # Calculate strategy returns vs benchmark
-        returns = self.data['Close'].pct_change().fillna(0)
-        
-        # Simple buy-and-hold benchmark
-        benchmark_cumulative = (1 + returns).cumprod()
-        
-        # For strategy performance, we'd need to implement the actual strategy
-        # For now, create a mock strategy performance
-        strategy_returns = returns.copy()
-        
-        # Apply basic mean reversion logic
-        z_scores = self.data['Z_Score'].fillna(0)
-        position = np.where(z_scores < -self.strategy.entry_threshold, 1,
-                           np.where(z_scores > self.strategy.entry_threshold, -1, 0))
-        
-        # Forward fill positions
-        position = pd.Series(position, index=self.data.index)
-        position = position.replace(0, np.nan).ffill().fillna(0)
-        
-        strategy_returns = returns * position.shift(1)
-        strategy_cumulative = (1 + strategy_returns.fillna(0)).cumprod()
-        
-        fig = go.Figure()
-        
-        # Benchmark performance
-        fig.add_trace(
-            go.Scatter(
-                x=self.data.index,
-                y=benchmark_cumulative,
-                mode='lines',
-                name='Buy & Hold',
-                line=dict(color='blue', width=2)
-            )
+        return build_equity_figure(
+            {'Strategy': series}, title="Strategy Performance vs Buy & Hold"
         )
-        
-        # Strategy performance
-        fig.add_trace(
-            go.Scatter(
-                x=self.data.index,
-                y=strategy_cumulative,
-                mode='lines',
-                name='Strategy',
-                line=dict(color='green', width=2)
-            )
-        )
-        
-        fig.update_layout(
-            title="Strategy Performance vs Buy & Hold",
-            xaxis_title="Date",
-            yaxis_title="Cumulative Returns",
-            height=400,
-            hovermode='x unified'
-        )
-        
-        return fig
     
     def generate_stats_summary(self):
         """Generate summary statistics"""
@@ -339,10 +264,11 @@ class StrategyChartGenerator:
             
             stats = {
                 'data_points': len(self.data),
-                'avg_z_score': self.data['Z_Score'].mean(),
-                'z_score_std': self.data['Z_Score'].std(),
-                'current_z_score': self.data['Z_Score'].iloc[-1] if len(self.data) > 0 else 0,
-                'price_volatility': self.data['Close'].pct_change().std() * np.sqrt(252),
+                'indicator_label': self.indicator_label,
+                'avg_z_score': self.data[self.indicator].mean(),
+                'z_score_std': self.data[self.indicator].std(),
+                'current_z_score': self.data[self.indicator].iloc[-1] if len(self.data) > 0 else 0,
+                'price_volatility': self.data['Returns'].std() * np.sqrt(252),
                 'current_price': self.data['Close'].iloc[-1] if len(self.data) > 0 else 0,
                 'avg_volume': self.data['Volume'].mean(),
                 'backtest_return': backtest.cumulative_return if backtest else None,
@@ -356,9 +282,92 @@ class StrategyChartGenerator:
             return {}
 
 
+def build_equity_figure(series_by_name, title="Equity Curves", include_benchmark=True):
+    """
+    Equity curve figure from stored backtest series.
+    
+    ``series_by_name`` maps a trace name to a ``load_series`` result. The
+    buy-and-hold curve is drawn once, from the first series.
+    """
+    fig = go.Figure()
+    colors = px.colors.qualitative.Plotly
+    
+    for i, (name, series) in enumerate(series_by_name.items()):
+        if include_benchmark and i == 0:
+            fig.add_trace(
+                go.Scatter(
+                    x=series['dates'],
+                    y=series['benchmark_equity'],
+                    mode='lines',
+                    name='Buy & Hold',
+                    line=dict(color='blue', width=2, dash='dot' if len(series_by_name) > 1 else 'solid')
+                )
+            )
+        
+        fig.add_trace(
+            go.Scatter(
+                x=series['dates'],
+                y=series['equity_curve'],
+                mode='lines',
+                name=name,
+                line=dict(color='green' if len(series_by_name) == 1 else colors[i % len(colors)], width=2)
+            )
+        )
+    
+    fig.update_layout(
+        title=title,
+        xaxis_title="Date",
+        yaxis_title="Cumulative Returns",
+        height=400,
+        hovermode='x unified'
+    )
+    
+    return fig
+
+
+def generate_equity_chart_html(backtest_result, div_id="equity-chart"):
+    """HTML equity chart for a single backtest result, or None without a stored series"""
+    try:
+        series = load_series(backtest_result)
+        if series is None or len(series['dates']) == 0:
+            return None
+            
+        fig = build_equity_figure(
+            {'Strategy': series}, title="Strategy Performance vs Buy & Hold"
+        )
+        return fig.to_html(include_plotlyjs='cdn', div_id=div_id)
+        
+    except Exception as e:
+        logger.error(f"Error generating equity chart: {str(e)}")
+        return None
+
+
+def generate_comparison_chart_html(strategies, div_id="comparison-chart"):
+    """HTML chart overlaying the stored equity curves of several strategies"""
+    try:
+        series_by_name = {}
+        for strategy in strategies:
+            series = load_series(strategy.backtestresult)
+            if series is not None and len(series['dates']):
+                series_by_name[strategy.name] = series
+                
+        if not series_by_name:
+            return None
+            
+        fig = build_equity_figure(
+            series_by_name, title="Strategy Equity Curves", include_benchmark=False
+        )
+        return fig.to_html(include_plotlyjs='cdn', div_id=div_id)
+        
+    except Exception as e:
+        logger.error(f"Error generating comparison chart: {str(e)}")
+        return None
+
+
 def generate_strategy_chart_html(strategy):
     """Generate HTML for strategy charts"""
     try:
+        start = time.perf_counter()
         generator = StrategyChartGenerator(strategy)
         
         data = generator.fetch_chart_data()
@@ -381,6 +390,9 @@ def generate_strategy_chart_html(strategy):
             div_id="performance-chart"
         ) if performance_chart else None
         
+        stats['render_seconds'] = time.perf_counter() - start
+        logger.info(f"Rendered charts for {strategy.name} in {stats['render_seconds']:.3f}s")
+        
         return price_chart_html, performance_chart_html, stats
         
     except Exception as e:
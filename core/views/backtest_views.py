@@ -5,15 +5,60 @@ Provides views for displaying and managing backtest results.
 
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.views.decorators.http import require_POST
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.core.paginator import Paginator
 from django.db.models import Q
-from core.models import Strategy, BacktestResult, TradeLog
-from core.services.backtest_engine import run_comprehensive_backtest
+from django.urls import reverse
+from core.models import Strategy, BacktestJob, BacktestResult, TradeLog
+from core.services.backtest_engine import RANK_METRICS, build_sweep_grid, run_parameter_sweep
+from core.services.job_queue import enqueue_backtest, job_status
+from core.services.series_store import load_series
+from core.utils.charting import generate_equity_chart_html, generate_comparison_chart_html
+import asyncio
+import json
+import math
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on grid size for sweeps run inside a web request; larger grids
+# belong to the sweep_parameters command
+MAX_SWEEP_COMBINATIONS = 50
+
+# Seconds between job status events, and how long one event stream stays open
+JOB_EVENTS_INTERVAL = 0.5
+JOB_EVENTS_TIMEOUT = 300
+
+# Bootstrapped metrics shown on the detail page: (key, label, shown as percentage)
+CONFIDENCE_METRICS = [
+    ('sharpe_ratio', 'Sharpe Ratio', False),
+    ('sortino_ratio', 'Sortino Ratio', False),
+    ('max_drawdown', 'Max Drawdown', True),
+    ('cumulative_return', 'Total Return', True),
+]
+
+
+def confidence_interval_rows(backtest_result):
+    """Formatted bootstrap interval rows for the detail template"""
+    intervals = (backtest_result.confidence_intervals or {}).get('metrics') if backtest_result else None
+    if not intervals:
+        return []
+
+    def fmt(value, percent):
+        return f"{value:.2%}" if percent else f"{value:.2f}"
+
+    return [
+        {
+            'label': label,
+            'estimate': fmt(intervals[key]['estimate'], percent),
+            'lower': fmt(intervals[key]['lower'], percent),
+            'upper': fmt(intervals[key]['upper'], percent),
+            'std_error': fmt(intervals[key]['std_error'], percent),
+        }
+        for key, label, percent in CONFIDENCE_METRICS if key in intervals
+    ]
+
 
 @login_required
 def backtest_detail(request, strategy_id):
@@ -38,6 +83,8 @@ def backtest_detail(request, strategy_id):
         'backtest_result': backtest_result,
         'trades': trades,
         'has_results': backtest_result is not None,
+        'equity_chart_html': generate_equity_chart_html(backtest_result) if backtest_result else None,
+        'confidence_rows': confidence_interval_rows(backtest_result),
     }
     
     return render(request, 'backtests/detail.html', context)
@@ -45,77 +92,78 @@ def backtest_detail(request, strategy_id):
 
 @login_required
 def rerun_backtest(request, strategy_id):
-    """Re-run backtest for a strategy (AJAX endpoint)"""
+    """
+    Queue a re-run of a strategy's backtest (AJAX endpoint).
+
+    Returns at once with the job handle; the backtest worker runs the job and
+    the previous result stays visible until the new one replaces it in a
+    single transaction. Progress is served by ``backtest_job_status`` and
+    ``backtest_job_events``.
+    """
     if request.method != 'POST':
         return JsonResponse({'error': 'POST method required'}, status=405)
     
     strategy = get_object_or_404(Strategy, id=strategy_id, user=request.user)
     
     try:
-        # Delete existing results
-        BacktestResult.objects.filter(strategy=strategy).delete()
-        
-        # Run new backtest
-        results = run_comprehensive_backtest(strategy)
-        
-        if not results:
-            return JsonResponse({
-                'success': False,
-                'error': 'Failed to generate backtest results'
-            })
-        
-        # Create new BacktestResult
-        backtest_result = BacktestResult.objects.create(
-            strategy=strategy,
-            cumulative_return=results.get('cumulative_return'),
-            annualized_return=results.get('annualized_return'),
-            sharpe_ratio=results.get('sharpe_ratio'),
-            sortino_ratio=results.get('sortino_ratio'),
-            win_rate=results.get('win_rate'),
-            max_drawdown=results.get('max_drawdown'),
-            volatility=results.get('volatility'),
-            total_trades=results.get('total_trades', 0),
-            winning_trades=results.get('winning_trades', 0),
-            losing_trades=results.get('losing_trades', 0),
-            avg_trade_return=results.get('avg_trade_return'),
-            avg_winning_trade=results.get('avg_winning_trade'),
-            avg_losing_trade=results.get('avg_losing_trade'),
-            value_at_risk_95=results.get('value_at_risk_95'),
-            calmar_ratio=results.get('calmar_ratio'),
-            benchmark_return=results.get('benchmark_return'),
-            alpha=results.get('alpha'),
-            beta=results.get('beta'),
-            backtest_start_date=results.get('backtest_start_date'),
-            backtest_end_date=results.get('backtest_end_date')
-        )
-        
-        # Create trade logs
-        trade_log = results.get('trade_log', [])
-        for trade in trade_log:
-            TradeLog.objects.create(
-                backtest_result=backtest_result,
-                security=trade['security'],
-                trade_type=trade['type'],
-                date=trade['date'],
-                price=trade['price'],
-                quantity=trade['quantity'],
-                commission=trade['commission'],
-                signal_value=trade.get('signal_value'),
-                notes="Manually re-run by user"
-            )
-        
-        return JsonResponse({
-            'success': True,
-            'results': backtest_result.get_performance_summary(),
-            'message': 'Backtest completed successfully'
-        })
-        
+        job = enqueue_backtest(strategy)
     except Exception as e:
-        logger.error(f'Error re-running backtest for strategy {strategy.name}: {str(e)}')
+        logger.error(f'Error queueing backtest for strategy {strategy.name}: {str(e)}')
         return JsonResponse({
             'success': False,
-            'error': f'Backtest failed: {str(e)}'
+            'error': f'Could not queue backtest: {str(e)}'
         })
+    
+    return JsonResponse({
+        'success': True,
+        'job_id': job.id,
+        'status_url': reverse('backtest_job_status', args=[job.id]),
+        'events_url': reverse('backtest_job_events', args=[job.id]),
+        'message': 'Backtest queued'
+    }, status=202)
+
+
+@login_required
+def backtest_job_status(request, job_id):
+    """Current status of a backtest job (polling fallback for the event stream)"""
+    job = get_object_or_404(BacktestJob, id=job_id, strategy__user=request.user)
+    return JsonResponse(job_status(job))
+
+
+@login_required
+async def backtest_job_events(request, job_id):
+    """
+    Server-sent events with a backtest job's status until it finishes.
+
+    An async view, so under the ASGI app each open stream only holds a
+    coroutine between polls instead of a worker thread.
+    """
+    user = await request.auser()
+    job = await BacktestJob.objects.filter(id=job_id, strategy__user=user).afirst()
+    if job is None:
+        raise Http404('Backtest job not found')
+    
+    async def stream():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + JOB_EVENTS_TIMEOUT
+        current = job
+        while True:
+            status = job_status(current)
+            yield f"event: progress\ndata: {json.dumps(status)}\n\n"
+            if not status['active']:
+                yield f"event: done\ndata: {json.dumps(status)}\n\n"
+                return
+            if loop.time() >= deadline:
+                # Clients reconnect (EventSource does so automatically)
+                return
+            await asyncio.sleep(JOB_EVENTS_INTERVAL)
+            current = await BacktestJob.objects.aget(id=job_id)
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Keep proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @login_required
@@ -143,12 +191,12 @@ def backtest_api(request, strategy_id):
                 'signal_value': trade.signal_value,
             })
         
-        return JsonResponse({
+        response = {
             'strategy': {
                 'name': strategy.name,
                 'lookback_days': strategy.lookback_days,
                 'entry_threshold': strategy.entry_threshold,
-                'exit_threshold': strategy.exit_threshold,
+                'exit_rule': strategy.exit_rule,
             },
             'performance': {
                 'cumulative_return': backtest_result.cumulative_return,
@@ -166,12 +214,25 @@ def backtest_api(request, strategy_id):
                 'alpha': backtest_result.alpha,
                 'beta': backtest_result.beta,
             },
+            'confidence_intervals': backtest_result.confidence_intervals,
             'trades': trade_data,
             'backtest_period': {
                 'start_date': backtest_result.backtest_start_date.isoformat() if backtest_result.backtest_start_date else None,
                 'end_date': backtest_result.backtest_end_date.isoformat() if backtest_result.backtest_end_date else None,
             }
-        })
+        }
+        
+        # Daily series are opt-in (?series=1) since they dominate the payload
+        if request.GET.get('series') in ('1', 'true'):
+            series = load_series(backtest_result)
+            response['series'] = {
+                'dates': series['dates'].astype(str).tolist(),
+                'strategy_returns': series['strategy_returns'].tolist(),
+                'benchmark_returns': series['benchmark_returns'].tolist(),
+                'equity_curve': series['equity_curve'].tolist(),
+            } if series is not None else None
+        
+        return JsonResponse(response)
         
     except BacktestResult.DoesNotExist:
         return JsonResponse({
@@ -179,6 +240,66 @@ def backtest_api(request, strategy_id):
         }, status=404)
 
 
+@require_POST
+@login_required
+def parameter_sweep_api(request, strategy_id):
+    """
+    Run a lookback x entry-threshold sweep for a strategy and return ranked
+    results as JSON. It runs inside the request, so it is POST only and
+    limited to MAX_SWEEP_COMBINATIONS.
+    """
+    strategy = get_object_or_404(Strategy, id=strategy_id, user=request.user)
+    
+    try:
+        lookbacks = [int(v) for v in request.POST.get('lookbacks', '10,20,30,50').split(',') if v.strip()]
+        thresholds = [float(v) for v in request.POST.get('thresholds', '1.0,1.5,2.0').split(',') if v.strip()]
+    except ValueError:
+        return JsonResponse({'error': 'lookbacks and thresholds must be comma-separated numbers'}, status=400)
+    
+    try:
+        grid = build_sweep_grid(lookbacks, thresholds)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    if not grid:
+        return JsonResponse({'error': 'The parameter grid is empty'}, status=400)
+    if len(grid) > MAX_SWEEP_COMBINATIONS:
+        return JsonResponse({
+            'error': f'Grid too large ({len(grid)} combinations, max {MAX_SWEEP_COMBINATIONS})'
+        }, status=400)
+    
+    rank_by = request.POST.get('rank_by', 'sharpe_ratio')
+    if rank_by not in RANK_METRICS:
+        return JsonResponse({
+            'error': f"Unknown rank_by '{rank_by}' (choose from {', '.join(RANK_METRICS)})"
+        }, status=400)
+    
+    try:
+        rows = run_parameter_sweep(strategy, grid, rank_by=rank_by)
+    except Exception as e:
+        logger.error(f'Error running parameter sweep for strategy {strategy.name}: {str(e)}')
+        return JsonResponse({'error': f'Parameter sweep failed: {str(e)}'}, status=500)
+    
+    # JSON has no NaN/inf, so report undefined metrics as null
+    results = [
+        {
+            key: (None if isinstance(value, float) and not math.isfinite(value) else value)
+            for key, value in row.items()
+        }
+        for row in rows
+    ]
+    
+    return JsonResponse({
+        'strategy': {
+            'id': strategy.id,
+            'name': strategy.name,
+            'tickers': strategy.get_tickers_display(),
+        },
+        'rank_by': rank_by,
+        'combinations': len(grid),
+        'results': results,
+    })
+
+
 @login_required
 def compare_strategies(request):
     """Compare multiple strategies' backtest results"""
@@ -210,6 +331,9 @@ def compare_strategies(request):
     context = {
         'comparison_data': comparison_data,
         'all_strategies': Strategy.objects.filter(user=request.user),
+        'comparison_chart_html': generate_comparison_chart_html(
+            [item['strategy'] for item in comparison_data]
+        ),
     }
     
     return render(request, 'backtests/compare.html', context)
@@ -1,7 +1,7 @@
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render
-from core.models import Strategy, BacktestResult
-from django.db.models import Count
+from core.models import Strategy, BacktestResult, BacktestJob
+from django.db.models import Count, Max
 
 def home(request):
     """Public home page"""
@@ -10,7 +10,14 @@ def home(request):
 @login_required
 def dashboard(request):
     """Dashboard showing user's strategies with performance data"""
-    strategies = Strategy.objects.filter(user=request.user).select_related('backtestresult').prefetch_related('tickers').order_by('-created_at')
+    strategies = Strategy.objects.filter(user=request.user).select_related('backtestresult').prefetch_related('tickers').annotate(
+        latest_job_id=Max('backtest_jobs__id')
+    ).order_by('-created_at')
+    
+    # Attach each strategy's latest backtest job with one extra query
+    latest_jobs = BacktestJob.objects.in_bulk([s.latest_job_id for s in strategies if s.latest_job_id])
+    for strategy in strategies:
+        strategy.latest_job = latest_jobs.get(strategy.latest_job_id)
     
     # Calculate summary statistics
     total_strategies = strategies.count()
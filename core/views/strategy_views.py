@@ -1,8 +1,13 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import get_object_or_404, redirect, render
 from django.contrib import messages
+from django.db import transaction
+from django.http import JsonResponse
 from core.models import Strategy
 from core.forms import StrategyForm
 from core.utils.charting import generate_strategy_chart_html, generate_trade_markers_data
+from core.services.chart_data import request_chart_frames
+from core.services.job_queue import latest_job, job_status
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 import logging
@@ -17,27 +22,46 @@ def strategy_list(request):
 
 # Create Strategy
 @login_required
-def strategy_create(request):
+async def strategy_create(request):
+    """
+    Create a strategy and queue its backtest.
+
+    Async, so under the ASGI app the ticker lookups only wait on the bounded
+    info pool instead of holding the thread sync views share; validation and
+    the database writes run in ``sync_to_async``.
+    """
     if request.method == 'POST':
         form = StrategyForm(request.POST)
-        if form.is_valid():
-            strategy = form.save(commit=False)
-            strategy.user = request.user
-            strategy.save()
-            form.save_m2m()  # Save many-to-many relationships
+        if await sync_to_async(form.is_valid)():
+            # Ticker lookups are network calls; keep them out of the transaction
+            # so it never holds the database write lock the backtest worker needs
+            await form.aresolve_tickers()
+            user = await request.auser()
+            strategy = await sync_to_async(_save_strategy)(form, user)
             
-            # Manually handle ticker assignment since it's a custom field
-            if hasattr(strategy, '_pending_tickers'):
-                strategy.tickers.set(strategy._pending_tickers)
-                del strategy._pending_tickers
-                
-            messages.success(request, f"Strategy '{strategy.name}' created successfully!")
+            messages.success(request, f"Strategy '{strategy.name}' created successfully! Backtest queued.")
             return redirect('dashboard')
         else:
             messages.error(request, "Please correct the errors below.")
     else:
         form = StrategyForm()
-    return render(request, 'strategies/create.html', {'form': form})
+    return await sync_to_async(render)(request, 'strategies/create.html', {'form': form})
+
+
+def _save_strategy(form, user) -> Strategy:
+    # One transaction, so the backtest queued on commit (see
+    # run_backtest_on_save) only becomes visible once tickers are set
+    with transaction.atomic():
+        strategy = form.save(commit=False)
+        strategy.user = user
+        strategy.save()
+        form.save_m2m()  # Save many-to-many relationships
+        
+        # Manually handle ticker assignment since it's a custom field
+        if hasattr(strategy, '_pending_tickers'):
+            strategy.tickers.set(strategy._pending_tickers)
+            del strategy._pending_tickers
+    return strategy
 
 # Strategy Detail
 @login_required
@@ -49,10 +73,11 @@ def strategy_detail(request, pk):
     performance_chart_html = None
     stats = {}
     trade_markers = []
+    charts_pending = False
     
     try:
         if strategy.tickers.exists():
-            # Generate interactive charts
+            # Generate interactive charts from the frames stored with the backtest result
             price_chart_html, performance_chart_html, stats = generate_strategy_chart_html(strategy)
             
             # Generate trade markers for overlay
@@ -60,8 +85,12 @@ def strategy_detail(request, pk):
             
             if price_chart_html:
                 messages.success(request, "Charts generated successfully!")
+            elif request_chart_frames(strategy):
+                # Prepared by the backtest worker, never inside this request
+                charts_pending = True
+                messages.info(request, "Charts are being prepared by a backtest; they appear once it finishes.")
             else:
-                messages.warning(request, "Unable to generate charts - insufficient data or network issues.")
+                messages.warning(request, "Unable to generate charts - the last backtest failed.")
                 
     except Exception as e:
         logger.error(f"Error generating charts for strategy {strategy.name}: {str(e)}")
@@ -69,14 +98,24 @@ def strategy_detail(request, pk):
 
     context = {
         'strategy': strategy,
+        'backtest_job': latest_job(strategy),
         'price_chart_html': price_chart_html,
         'performance_chart_html': performance_chart_html,
         'stats': stats,
         'trade_markers': trade_markers,
         'has_charts': price_chart_html is not None,
+        'charts_pending': charts_pending,
     }
     return render(request, 'strategies/detail.html', context)
 
+# Backtest Job Status (polled by the detail and dashboard pages)
+@login_required
+def strategy_backtest_status(request, pk):
+    strategy = get_object_or_404(Strategy, pk=pk, user=request.user)
+    status = job_status(latest_job(strategy))
+    status['has_results'] = strategy.has_backtest_results()
+    return JsonResponse(status)
+
 # Edit Strategy
 @login_required
 def strategy_edit(request, pk):
@@ -2,7 +2,8 @@ from django.http import JsonResponse
 from django.shortcuts import render
 from django.db.models import Q
 from core.models import Security
-import yfinance as yf
+from core.services.market_data import get_provider, has_security_info
+from core.services.ticker_info import fetch_info
 import json
 
 def tickers_by_sector(request):
@@ -139,8 +140,13 @@ def ticker_info(request, symbol):
     except Security.DoesNotExist:
         return JsonResponse({'error': 'Security not found'}, status=404)
 
-def ticker_validate(request):
-    """Validate a ticker symbol using yfinance"""
+async def ticker_validate(request):
+    """
+    Validate a ticker symbol with the market data provider.
+
+    Async, so under the ASGI app a slow provider only holds a thread of the
+    bounded info pool, and concurrent checks of a symbol share one call.
+    """
     symbol = request.GET.get('symbol', '').strip().upper()
     
     if not symbol:
@@ -148,8 +154,8 @@ def ticker_validate(request):
     
     try:
         # Check if we have it in our database first
-        try:
-            security = Security.objects.get(symbol=symbol, is_active=True)
+        security = await Security.objects.filter(symbol=symbol, is_active=True).afirst()
+        if security is not None:
             return JsonResponse({
                 'valid': True,
                 'source': 'database',
@@ -157,17 +163,16 @@ def ticker_validate(request):
                 'name': security.name,
                 'sector': security.sector,
             })
-        except Security.DoesNotExist:
-            pass
         
-        # Validate with yfinance
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
+        # Validate with the market data provider
+        info = await fetch_info(symbol)
         
-        if info.get('symbol') or info.get('shortName') or info.get('longName'):
+        if info is None:
+            return JsonResponse({'valid': False, 'error': 'Ticker lookup failed or timed out, please try again'})
+        if has_security_info(info):
             return JsonResponse({
                 'valid': True,
-                'source': 'yfinance',
+                'source': get_provider().name,
                 'symbol': symbol,
                 'name': info.get('longName') or info.get('shortName', ''),
                 'sector': info.get('sector', ''),